@@ -22,6 +22,7 @@ package org.mulesoft.restx;
 
 import java.util.Map;
 
+import org.mulesoft.restx.component.api.AccessRequest;
 import org.mulesoft.restx.component.api.HttpMethod;
 import org.mulesoft.restx.component.api.HttpResult;
 import org.mulesoft.restx.component.api.MakeResourceResult;
@@ -29,6 +30,7 @@ import org.mulesoft.restx.component.api.MakeResourceResult;
 public interface ResourceAccessorInterface
 {
     public HttpResult         accessResourceProxy(String uri, String input, Map<?,?> params, HttpMethod method);
+    public HttpResult[]       accessResourcesProxy(AccessRequest[] requests, int timeout);
     public MakeResourceResult makeResourceProxy(String componentClassName, String suggestedResourceName,
                                                 String resourceDescription, Map<?,?> resourceParameters);
 }
@@ -43,6 +43,7 @@ public abstract class RestxHttpRequest
     public abstract Headers getRequestHeaders();   // We return a dict() for Python. Python doesn't care.
     public abstract String  getRequestQuery();
     public abstract String  getRequestBody();
+    public abstract Object  getRequestBodyStream();  // File-like object (Python) for reading large bodies
     public abstract void    sendResponseHeaders();
     public abstract void    sendResponseBody();
     public abstract void    sendResponse();
@@ -62,6 +62,31 @@ public abstract class BaseComponent
     private      HashMap<String, ArrayList<String>>   paramOrder;
     private      HashMap<String, ArrayList<Class<?>>> paramTypes;
     
+    /*
+     * The information gathered from the annotations does not change for a given
+     * component class. Parsing it requires a lot of reflection, so we do it only
+     * once per class and share the result between all instances. The cached
+     * information must therefore be treated as read-only.
+     */
+    private static class AnnotationInfo
+    {
+        public final ComponentDescriptor                  componentDescriptor;
+        public final HashMap<String, ArrayList<String>>   paramOrder;
+        public final HashMap<String, ArrayList<Class<?>>> paramTypes;
+        
+        public AnnotationInfo(ComponentDescriptor                  componentDescriptor,
+                              HashMap<String, ArrayList<String>>   paramOrder,
+                              HashMap<String, ArrayList<Class<?>>> paramTypes)
+        {
+            this.componentDescriptor = componentDescriptor;
+            this.paramOrder          = paramOrder;
+            this.paramTypes          = paramTypes;
+        }
+    }
+    
+    private static final HashMap<Class<?>, AnnotationInfo> annotationCache =
+                                                        new HashMap<Class<?>, AnnotationInfo>();
+    
     public BaseComponent()
     {
         this.resourceName     = null;
@@ -126,6 +151,22 @@ public abstract class BaseComponent
     {
         return resourceAccessor.accessResourceProxy(uri, input, params, method);
     }
+
+    public HttpResult[] accessResources(AccessRequest[] requests)
+    {
+        return accessResources(requests, 0);
+    }
+
+    /*
+     * Access several resources concurrently. The results are returned in the
+     * order of the requests. A request that failed has an error status in its
+     * result, one that took longer than 'timeout' seconds (if the timeout is
+     * greater than 0) has the status HTTP.GATEWAY_TIMEOUT.
+     */
+    public HttpResult[] accessResources(AccessRequest[] requests, int timeout)
+    {
+        return resourceAccessor.accessResourcesProxy(requests, timeout);
+    }
     
     public MakeResourceResult makeResource(String componentClassName, String suggestedResourceName,
                                            String resourceDescription, Map<?,?> resourceParameters) throws RestxException
@@ -133,8 +174,8 @@ public abstract class BaseComponent
         return resourceAccessor.makeResourceProxy(componentClassName, suggestedResourceName, resourceDescription, resourceParameters);
     }
     
-    private ParameterDef createParamDefType(Class<?> paramType, String desc,
-                                            boolean required, String defaultVal)
+    private static ParameterDef createParamDefType(Class<?> paramType, String desc,
+                                                   boolean required, String defaultVal)
     {
         ParameterDef pdef = null;
         if (paramType == String.class) {
@@ -160,11 +201,35 @@ public abstract class BaseComponent
         }
         Class<? extends BaseComponent> myclass = this.getClass();
         
+        AnnotationInfo info;
+        synchronized (annotationCache) {
+            info = annotationCache.get(myclass);
+        }
+        if (info == null) {
+            // Two threads may end up parsing the same class at the same time,
+            // which is harmless: Both produce the same information.
+            info = parseAnnotations(myclass);
+            synchronized (annotationCache) {
+                annotationCache.put(myclass, info);
+            }
+        }
+        componentDescriptor       = info.componentDescriptor;
+        paramOrder                = info.paramOrder;
+        paramTypes                = info.paramTypes;
+        annotationsHaveBeenParsed = true;
+    }
+    
+    private static AnnotationInfo parseAnnotations(Class<? extends BaseComponent> myclass) throws RestxException
+    {
+        ComponentDescriptor                  componentDescriptor;
+        HashMap<String, ArrayList<String>>   paramOrder;
+        HashMap<String, ArrayList<Class<?>>> paramTypes;
+        
         /*
          * Examine the class annotations to get information about the
          * component.
          */
-        ComponentInfo ci = this.getClass().getAnnotation(ComponentInfo.class);
+        ComponentInfo ci = myclass.getAnnotation(ComponentInfo.class);
         if (ci == null) {
             throw new RestxException("Component does not have a ComponentInfo annotation");
         }
@@ -244,7 +309,7 @@ public abstract class BaseComponent
                 componentDescriptor.addService(m.getName(), sd);
             }
         }
-        annotationsHaveBeenParsed = true;
+        return new AnnotationInfo(componentDescriptor, paramOrder, paramTypes);
     }
     
     public HashMap<String, ArrayList<String>> getParameterOrder() throws RestxException
@@ -263,6 +328,20 @@ public abstract class BaseComponent
         return paramTypes;
     }
     
+    public boolean isPoolable()
+    {
+        // Poolable components announce themselves with the @Poolable annotation
+        return this.getClass().isAnnotationPresent(Poolable.class);
+    }
+    
+    public void resetRequestState()
+    {
+        // Called before a pooled instance is handed back to the pool. Components
+        // that override this should call the base implementation as well.
+        this.httpRequest      = null;
+        this.baseCapabilities = null;
+    }
+    
     public String getMyResourceName()
     {
         return resourceName;
@@ -431,6 +510,10 @@ public abstract class BaseComponent
                 ret.put(name, thisService);
                 HashMap<String, Object> params = (HashMap<String, Object>)thisService.get("params");
                 if (params != null) {
+                    // The parameter map belongs to the shared component descriptor,
+                    // so we convert a copy of it.
+                    params = new HashMap<String, Object>(params);
+                    thisService.put("params", params);
                     for (String pname: params.keySet()) {
                         Object param = params.get(pname);
                         if (param instanceof ParameterDef) {
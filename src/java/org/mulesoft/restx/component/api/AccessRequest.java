@@ -0,0 +1,53 @@
+/*      
+ *  RESTx: Sane, simple and effective data publishing and integration. 
+ *  
+ *  Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com 
+ *  
+ *  This program is free software: you can redistribute it and/or modify 
+ *  it under the terms of the GNU General Public License as published by 
+ *  the Free Software Foundation, either version 3 of the License, or 
+ *  (at your option) any later version. 
+ * 
+ *  This program is distributed in the hope that it will be useful, 
+ *  but WITHOUT ANY WARRANTY; without even the implied warranty of 
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+ *  GNU General Public License for more details. 
+ * 
+ *  You should have received a copy of the GNU General Public License 
+ *  along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+ */ 
+
+package org.mulesoft.restx.component.api;
+
+import java.util.Map;
+
+/**
+ * Describes one resource access in a batch of accesses.
+ *
+ * See {@link org.mulesoft.restx.component.BaseComponent#accessResources}.
+ */
+public class AccessRequest
+{
+    public String     uri;
+    public String     input;
+    public Map<?,?>   params;
+    public HttpMethod method;
+
+    public AccessRequest(String uri)
+    {
+        this(uri, null, null, HTTP.GET);
+    }
+
+    public AccessRequest(String uri, Map<?,?> params)
+    {
+        this(uri, null, params, HTTP.GET);
+    }
+
+    public AccessRequest(String uri, String input, Map<?,?> params, HttpMethod method)
+    {
+        this.uri    = uri;
+        this.input  = input;
+        this.params = params;
+        this.method = method;
+    }
+}
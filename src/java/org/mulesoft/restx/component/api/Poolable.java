@@ -0,0 +1,37 @@
+/*      
+ *  RESTx: Sane, simple and effective data publishing and integration. 
+ *  
+ *  Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com 
+ *  
+ *  This program is free software: you can redistribute it and/or modify 
+ *  it under the terms of the GNU General Public License as published by 
+ *  the Free Software Foundation, either version 3 of the License, or 
+ *  (at your option) any later version. 
+ * 
+ *  This program is distributed in the hope that it will be useful, 
+ *  but WITHOUT ANY WARRANTY; without even the implied warranty of 
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+ *  GNU General Public License for more details. 
+ * 
+ *  You should have received a copy of the GNU General Public License 
+ *  along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+ */ 
+
+
+
+package org.mulesoft.restx.component.api;
+
+import java.lang.annotation.*; 
+
+/*
+ * Marks a component as poolable.
+ *
+ * Instances of poolable components are reused across requests to the same
+ * resource. Such components may not keep any per-request state, other than
+ * the request and base capabilities, which are reset by the framework.
+ */
+@Retention(RetentionPolicy.RUNTIME)
+@Target(ElementType.TYPE)
+public @interface Poolable
+{    
+}
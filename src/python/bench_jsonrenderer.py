@@ -0,0 +1,123 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+#
+# Run this one with Jython
+#
+# Benchmark for the JSON renderer: Compares the default (pretty printed and
+# sorted) output with the compact output, and the rendering of lists with the
+# incremental rendering of iterators, on large resource outputs.
+#
+# Usage: bench_jsonrenderer.py [<number of elements> [<repetitions>]]
+#
+
+import sys
+import time
+
+from restx.render.jsonrenderer import JsonRenderer
+
+from org.mulesoft.restx.util import Url
+
+
+def make_resource_list(num):
+    """
+    Create a list that looks like the output of a large resource listing.
+
+    """
+    out = list()
+    for i in xrange(num):
+        out.append({
+            "name"   : "resource_%d" % i,
+            "uri"    : Url("/resource/resource_%d" % i),
+            "desc"   : "Description of resource number %d, which is used for benchmarking" % i,
+            "params" : {
+                "filename"   : "/var/log/apache2/access_%d.log" % i,
+                "count_only" : False,
+                "limit"      : i,
+            },
+            "services" : [ "subset", "files", "search" ],
+        })
+    return out
+
+def make_log_lines(num):
+    """
+    Create a list of strings, similar to the output of the log file component.
+
+    """
+    return [ '127.0.0.1 - - [10/Oct/2010:13:%02d:%02d +0100] "GET /resource/foo_%d HTTP/1.1" 200 %d' % \
+                                                                    (i % 60, i % 60, i, i) for i in xrange(num) ]
+
+def run(name, func, repetitions):
+    """
+    Run one benchmark and print the results.
+
+    For incremental rendering, the time until the first chunk was available
+    is shown as well.
+
+    """
+    best_total = None
+    best_first = None
+    size       = 0
+    for i in xrange(repetitions):
+        start = time.time()
+        out   = func()
+        first = None
+        if type(out) in [ str, unicode ]:
+            size = len(out)
+        else:
+            size = 0
+            for chunk in out:
+                if first is None:
+                    first = time.time() - start
+                size += len(chunk)
+        total = time.time() - start
+        if best_total is None  or  total < best_total:
+            best_total = total
+            best_first = first
+    if best_first is not None:
+        first_str = "%8.1f ms" % (best_first * 1000)
+    else:
+        first_str = "%11s" % "-"
+    print "    %-34s %8.1f ms   first chunk: %s   %10d bytes" % (name, best_total * 1000, first_str, size)
+
+def bench(title, data, repetitions):
+    print "%s (%d elements):" % (title, len(data))
+    pretty  = JsonRenderer(dict())
+    compact = JsonRenderer(dict(compact=True))
+    nosort  = JsonRenderer(dict(compact=True, sort_keys=False))
+    run("pretty, one-shot",           lambda: pretty.render(data),                   repetitions)
+    run("pretty, from iterator",      lambda: pretty.render(iter(data)),             repetitions)
+    run("compact, one-shot",          lambda: compact.render(data),                  repetitions)
+    run("compact unsorted, one-shot", lambda: nosort.render(data),                   repetitions)
+    run("compact, from iterator",     lambda: compact.render(iter(data)),            repetitions)
+    print
+
+
+if __name__ == '__main__':
+    num         = 20000
+    repetitions = 5
+    if len(sys.argv) > 1:
+        num = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+
+    bench("Resource list", make_resource_list(num), repetitions)
+    bench("Log lines", make_log_lines(num * 5), repetitions)
+
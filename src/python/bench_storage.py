@@ -0,0 +1,150 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+
+#
+# Run this one with Jython
+#
+# Benchmark for the storage backends, which components use for their data:
+# Compares FileStorage (one file per item, flat and sharded layout) with
+# LogStorage (all items in one log file), for items of 1KB, 64KB and 1MB.
+# For each backend, the items are stored, read in random order, overwritten,
+# listed and deleted. The disk space used after the first round of writes is
+# shown as well.
+#
+# The benchmark works in a temporary directory, an existing storageDB is
+# not touched.
+#
+# Usage: bench_storage.py [<scale>]
+#
+#        scale:    Multiplies the number of items per size (default: 1)
+#
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+import restx.settings as settings
+
+from restx.storageabstraction.file_storage         import FileStorage, flushWriteBehind
+from restx.storageabstraction.sharded_file_storage import ShardedFileStorage
+from restx.storageabstraction.log_storage          import LogStorage
+
+BACKENDS = [ ("flat files",    FileStorage),
+             ("sharded files", ShardedFileStorage),
+             ("log",           LogStorage) ]
+
+# Item size and number of items
+SIZES = [ (1024,        5000),
+          (64*1024,     500),
+          (1024*1024,   50) ]
+
+
+def disk_usage(location):
+    """
+    Return number of files and bytes used on disk below a directory.
+
+    """
+    files = 0
+    used  = 0
+    for dir_name, dir_names, file_names in os.walk(location):
+        for name in file_names:
+            st     = os.stat(os.path.join(dir_name, name))
+            files += 1
+            if hasattr(st, "st_blocks"):
+                used += st.st_blocks * 512
+            else:
+                used += st.st_size
+    return files, used
+
+
+def timed(func, num):
+    """
+    Call a function and return the achieved number of operations per second.
+
+    """
+    start = time.time()
+    func()
+    duration = time.time() - start
+    if not duration:
+        return 0.0
+    return num / duration
+
+
+def bench(title, storage_class, size, num):
+    """
+    Run the benchmark for one backend and item size and print the results.
+
+    """
+    root_dir = tempfile.mkdtemp()
+    settings.ROOT_DIR = root_dir + "/"
+    try:
+        storage = storage_class(storage_location=settings.STORAGEDB_LOCATION, unique_prefix="bench")
+        names   = [ "item_%d" % i for i in xrange(num) ]
+        data    = "x" * size
+        order   = names[:]
+        random.shuffle(order)
+
+        def store():
+            for name in names:
+                storage.storeFile(name, data)
+            flushWriteBehind()
+        def load():
+            for name in order:
+                storage.loadFile(name)
+        def overwrite():
+            for name in order:
+                storage.storeFile(name, data)
+            flushWriteBehind()
+        def list_files():
+            for i in xrange(10):
+                storage.listFiles()
+        def delete():
+            for name in names:
+                storage.deleteFile(name)
+
+        store_rate        = timed(store, num)
+        files, used       = disk_usage(root_dir)
+        load_rate         = timed(load, num)
+        overwrite_rate    = timed(overwrite, num)
+        list_rate         = timed(list_files, 10)
+        delete_rate       = timed(delete, num)
+        print "    %-14s store %8.0f/s   load %8.0f/s   overwrite %8.0f/s   list %7.1f/s   delete %8.0f/s" % \
+                        (title, store_rate, load_rate, overwrite_rate, list_rate, delete_rate)
+        print "    %-14s %d files, %.1f MB on disk (%.1f MB of data)" % \
+                        ("", files, used / 1048576.0, size * num / 1048576.0)
+    finally:
+        shutil.rmtree(root_dir, True)
+
+
+if __name__ == '__main__':
+    scale = 1
+    if len(sys.argv) > 1:
+        scale = float(sys.argv[1])
+
+    for size, num in SIZES:
+        num = max(1, int(num * scale))
+        print "%d items of %d KB:" % (num, size / 1024)
+        for title, storage_class in BACKENDS:
+            bench(title, storage_class, size, num)
+        print
@@ -0,0 +1,156 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+#
+# Run this one with Python (2.6 or later)
+#
+# Load test for a running RESTx server: A number of client processes send
+# requests for a URL as fast as they can, for a fixed time. At the end, the
+# throughput and latencies are reported.
+#
+# To see how the pre-fork mode of the Python server scales, start the server
+# with 'starter.py --workers <n>' for different values of n (for example
+# 1, 2 and the number of cores) and run the same load test against each of
+# them. Use a URL that makes the server do some work, such as rendering a
+# large resource result.
+#
+# To see what persistent connections gain, run the test with '-a': It is
+# run twice, without and with keep-alive, and the throughput is compared.
+#
+# Usage: loadtest.py [-c <clients>] [-d <seconds>] [-k | -a] [<url>]
+#
+#        -c:    Number of concurrent client processes (default: 8)
+#        -d:    Duration of the test in seconds (default: 10)
+#        -k:    Keep connections open between requests (HTTP/1.1 keep-alive)
+#        -a:    Run the test without and with keep-alive and compare
+#
+import sys
+import time
+import getopt
+import httplib
+import urlparse
+import multiprocessing
+
+DEFAULT_URL = "http://localhost:8001/code"
+
+
+def _client(url, duration, keep_alive, results):
+    """
+    Send requests until the time is up, report the latencies.
+
+    """
+    scheme, netloc, path, query, fragment = urlparse.urlsplit(url)
+    if query:
+        path += "?" + query
+    latencies = list()
+    errors    = 0
+    conn      = None
+    end_time  = time.time() + duration
+    while time.time() < end_time:
+        start = time.time()
+        try:
+            if conn is None:
+                conn = httplib.HTTPConnection(netloc)
+            conn.request("GET", path, headers={ "Accept" : "application/json" })
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors += 1
+            if not keep_alive  or  resp.will_close:
+                conn.close()
+                conn = None
+        except Exception:
+            errors += 1
+            conn    = None
+            continue
+        latencies.append(time.time() - start)
+    results.put((latencies, errors))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values)-1, int(len(sorted_values) * fraction))]
+
+
+def _run(url, num_clients, duration, keep_alive):
+    """
+    Run the load test and print the results.
+
+    @return:    Number of requests per second.
+    @rtype:     float
+
+    """
+    print "Load test: %s, %d clients, %d seconds%s" % (url, num_clients, duration,
+                                                       keep_alive and ", keep-alive" or "")
+    results = multiprocessing.Queue()
+    clients = [ multiprocessing.Process(target=_client, args=(url, duration, keep_alive, results))
+                    for i in range(num_clients) ]
+    for c in clients:
+        c.start()
+    latencies = list()
+    errors    = 0
+    for c in clients:
+        l, e       = results.get()
+        latencies += l
+        errors    += e
+    for c in clients:
+        c.join()
+
+    latencies.sort()
+    throughput = len(latencies) / float(duration)
+    print "Requests:       %d (%d errors)" % (len(latencies), errors)
+    print "Throughput:     %.1f requests/s" % throughput
+    print "Latency:        median %.1fms, 90%% %.1fms, 99%% %.1fms" % \
+                                    (_percentile(latencies, 0.5)  * 1000,
+                                     _percentile(latencies, 0.9)  * 1000,
+                                     _percentile(latencies, 0.99) * 1000)
+    return throughput
+
+
+if __name__ == '__main__':
+    opts, args = getopt.getopt(sys.argv[1:], "c:d:ka")
+    num_clients = 8
+    duration    = 10
+    keep_alive  = False
+    compare     = False
+    for o, a in opts:
+        if o == "-c":
+            num_clients = int(a)
+        elif o == "-d":
+            duration = int(a)
+        elif o == "-k":
+            keep_alive = True
+        elif o == "-a":
+            compare = True
+    if args:
+        url = args[0]
+    else:
+        url = DEFAULT_URL
+
+    if compare:
+        without = _run(url, num_clients, duration, False)
+        print
+        with_ka = _run(url, num_clients, duration, True)
+        print
+        print "Keep-alive:     %.1f requests/s vs. %.1f requests/s without (%.2fx)" % \
+                                    (with_ka, without, without and with_ka / without or 0.0)
+    else:
+        _run(url, num_clients, duration, keep_alive)
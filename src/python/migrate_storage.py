@@ -0,0 +1,182 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+#
+# Run this one with Python (2.5 or later) or Jython, while the server is stopped.
+#
+# Converts the storage directory (storageDB) between the flat layout, in which
+# all files are kept in one directory with names like '<resource>__<file>',
+# and the sharded layout, which has a directory per resource (see
+# restx/storageabstraction/sharding.py). Set STORAGE_LAYOUT in settings.py
+# accordingly after the conversion.
+#
+# In the flat layout, the resource a file belongs to is found by looking at
+# the resources in resourceDB. Files of resources, which have been deleted,
+# are left where they are. Components can use namespaces within their
+# resource's storage ('<resource>__<namespace>__<file>'), which can't be told
+# apart from file names that contain '__'. Specify those namespaces with -n.
+#
+# Usage: migrate_storage.py [-r <rootdir>] [-n <namespace>]... [-u] [-d]
+#
+#        -r:    RESTx root directory (default: current directory)
+#        -n:    A namespace used by components (can be repeated)
+#        -u:    Convert back from the sharded to the flat layout
+#        -d:    Dry run: only print what would be done
+#
+import os
+import sys
+import getopt
+
+from restx.storageabstraction.sharding import *
+
+RESOURCEDB_LOCATION = "resourceDB"
+STORAGEDB_LOCATION  = "storageDB"
+
+
+def _move(old_name, new_name, dry_run):
+    """
+    Move a file, creating the target directory if needed.
+
+    """
+    print "%s -> %s" % (old_name, new_name)
+    if dry_run:
+        return
+    if os.path.exists(new_name):
+        raise Exception("Target file '%s' exists already" % new_name)
+    dir_name = os.path.dirname(new_name)
+    if not os.path.isdir(dir_name):
+        os.makedirs(dir_name)
+    os.rename(old_name, new_name)
+
+
+def _get_resource_names(root_dir):
+    """
+    Return the names of all resources, longest names first.
+
+    """
+    names = [ name for name in os.listdir(os.path.join(root_dir, RESOURCEDB_LOCATION))
+                        if not name.startswith(".")  and  not name.startswith("_") ]
+    names.sort(key=len, reverse=True)
+    return names
+
+
+def to_sharded(root_dir, namespaces, dry_run):
+    """
+    Move the files of the flat layout into the sharded layout.
+
+    @return:    Number of files moved and number of files left alone.
+    @rtype:     tuple
+
+    """
+    storage_location = os.path.join(root_dir, STORAGEDB_LOCATION)
+    resource_names   = _get_resource_names(root_dir)
+    moved            = 0
+    skipped          = 0
+    for name in os.listdir(storage_location):
+        full_name = os.path.join(storage_location, name)
+        if name.startswith(".")  or  not os.path.isfile(full_name):
+            # Temporary files and the directories of the sharded layout
+            continue
+        for resource_name in resource_names:
+            if name.startswith(resource_name + "__"):
+                break
+        else:
+            print "Skipping '%s': Not owned by any resource" % name
+            skipped += 1
+            continue
+        prefix    = resource_name
+        file_name = name[len(resource_name)+2:]
+        for namespace in namespaces:
+            if file_name.startswith(namespace + "__"):
+                prefix    = "%s__%s" % (resource_name, namespace)
+                file_name = file_name[len(namespace)+2:]
+                break
+        _move(full_name, shardedFileName(storage_location, prefix, file_name), dry_run)
+        moved += 1
+    return moved, skipped
+
+
+def to_flat(root_dir, dry_run):
+    """
+    Move the files of the sharded layout back into the flat layout.
+
+    @return:    Number of files moved and number of files left alone.
+    @rtype:     tuple
+
+    """
+    storage_location = os.path.join(root_dir, STORAGEDB_LOCATION)
+    moved            = 0
+    skipped          = 0
+    for space in os.listdir(storage_location):
+        space_location = os.path.join(storage_location, space)
+        if space.startswith(".")  or  not os.path.isdir(space_location):
+            continue
+        if space == DEFAULT_SPACE_NAME:
+            prefix = ""
+        else:
+            prefix = decodeName(space) + "__"
+        for bucket in os.listdir(space_location):
+            bucket_location = os.path.join(space_location, bucket)
+            if not os.path.isdir(bucket_location):
+                continue
+            for name in os.listdir(bucket_location):
+                file_name = decodeName(name)
+                if name.startswith(".")  or  "/" in file_name  or  os.sep in file_name:
+                    print "Skipping '%s': Not a valid file name in the flat layout" % os.path.join(bucket_location, name)
+                    skipped += 1
+                    continue
+                _move(os.path.join(bucket_location, name), os.path.join(storage_location, prefix + file_name), dry_run)
+                moved += 1
+            if not dry_run  and  not os.listdir(bucket_location):
+                os.rmdir(bucket_location)
+        if not dry_run  and  not os.listdir(space_location):
+            os.rmdir(space_location)
+    return moved, skipped
+
+
+if __name__ == '__main__':
+    opts, args = getopt.getopt(sys.argv[1:], "r:n:ud")
+    root_dir   = "."
+    namespaces = list()
+    unshard    = False
+    dry_run    = False
+    for o, a in opts:
+        if o == "-r":
+            root_dir = a
+        elif o == "-n":
+            namespaces.append(a)
+        elif o == "-u":
+            unshard = True
+        elif o == "-d":
+            dry_run = True
+    if args  or  not os.path.isdir(os.path.join(root_dir, STORAGEDB_LOCATION)):
+        print "Usage: migrate_storage.py [-r <rootdir>] [-n <namespace>]... [-u] [-d]"
+        sys.exit(1)
+
+    if unshard:
+        moved, skipped = to_flat(root_dir, dry_run)
+        layout         = "flat"
+    else:
+        moved, skipped = to_sharded(root_dir, namespaces, dry_run)
+        layout         = "sharded"
+    print "Moved %d files, skipped %d." % (moved, skipped)
+    if not dry_run:
+        print "Set STORAGE_LAYOUT = \"%s\" in settings.py before starting the server." % layout
@@ -0,0 +1,309 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Simple in-memory caches.
+
+The caches in here are safe to be used from multiple threads at
+the same time. Each cache can be registered under a name, in which
+case its hit and miss counters are reported with the server's
+run-time statistics.
+
+"""
+import time
+import threading
+
+from restx.stats import register_stats_provider
+
+
+def copy_struct(obj):
+    """
+    Return a copy of a structure of dictionaries and lists.
+
+    Only dictionaries and lists are copied, all other objects (strings,
+    numbers, etc.) are shared with the original. This is all we need for
+    the JSON-like structures we keep in our caches and it is considerably
+    faster than copy.deepcopy().
+
+    @param obj:     The structure to be copied.
+    @type  obj:     object
+
+    @return:        Copy of the structure.
+    @rtype:         object
+
+    """
+    obj_type = type(obj)
+    if obj_type is dict:
+        return dict([ (key, copy_struct(value)) for key, value in obj.iteritems() ])
+    elif obj_type is list:
+        return [ copy_struct(elem) for elem in obj ]
+    else:
+        return obj
+
+
+class LruCache(object):
+    """
+    A bounded cache, which evicts the least recently used entries.
+
+    When the cache grows beyond its maximum size, a batch of the least
+    recently used entries is removed at once. That way, the cost of
+    finding those entries is shared by many insertions.
+
+    """
+    EVICTION_BATCH = 0.1    # Fraction of the maximum size that is evicted at once
+
+    def __init__(self, max_size, name=None):
+        """
+        Create a new cache.
+
+        @param max_size:    Maximum number of entries in the cache.
+        @type  max_size:    int
+
+        @param name:        If specified, the statistics of this cache
+                            are reported under this name.
+        @type  name:        string
+
+        """
+        self.max_size    = max_size
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+        self.__lock      = threading.Lock()
+        self.__entries   = dict()     # Key -> [ value, time of last use ]
+        self.__tick      = 0
+        if name:
+            register_stats_provider(name, self.getStats)
+
+    def get(self, key, is_valid=None):
+        """
+        Return the value stored for a key.
+
+        @param key:         The key of the entry.
+        @type  key:         object
+
+        @param is_valid:    Optional function, which is called with the stored
+                            value. If it returns False, the entry is considered
+                            stale: It is removed and we report a miss.
+        @type  is_valid:    function
+
+        @return:            The stored value or None if not found.
+        @rtype:             object
+
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(key)
+            if entry is not None  and  is_valid is not None  and  not is_valid(entry[0]):
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits    += 1
+            self.__tick  += 1
+            entry[1]      = self.__tick
+            return entry[0]
+        finally:
+            self.__lock.release()
+
+    def put(self, key, value):
+        """
+        Store a value in the cache.
+
+        @param key:         The key of the entry.
+        @type  key:         object
+
+        @param value:       The value to be stored.
+        @type  value:       object
+
+        """
+        self.__lock.acquire()
+        try:
+            replaced             = key in self.__entries
+            self.__tick         += 1
+            self.__entries[key]  = [ value, self.__tick ]
+            # Replacing an existing entry doesn't make the cache grow
+            if not replaced  and  len(self.__entries) > self.max_size:
+                self.__evict()
+        finally:
+            self.__lock.release()
+
+    def remove(self, key):
+        """
+        Remove an entry from the cache, if it exists.
+
+        @param key:         The key of the entry.
+        @type  key:         object
+
+        """
+        self.__lock.acquire()
+        try:
+            if key in self.__entries:
+                del self.__entries[key]
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__entries = dict()
+        finally:
+            self.__lock.release()
+
+    def getStats(self):
+        """
+        Return the usage statistics of this cache.
+
+        @return:    Dictionary with size, hits, misses and evictions.
+        @rtype:     dict
+
+        """
+        return dict(size      = len(self.__entries),
+                    max_size  = self.max_size,
+                    hits      = self.hits,
+                    misses    = self.misses,
+                    evictions = self.evictions)
+
+    def __evict(self):
+        """
+        Remove a batch of least recently used entries.
+
+        Only entries removed here count as evictions. Stale entries and
+        replaced values are not counted.
+
+        Needs to be called with the lock held.
+
+        """
+        num = max(1, int(self.max_size * self.EVICTION_BATCH))
+        by_age = [ (entry[1], key) for key, entry in self.__entries.iteritems() ]
+        by_age.sort()
+        victims = by_age[:num]
+        for last_use, key in victims:
+            del self.__entries[key]
+        self.evictions += len(victims)
+
+
+
+class MemoCache(object):
+    """
+    A bounded cache for the results of expensive calls.
+
+    Each result is kept for a time-to-live, which is specified when the
+    result is computed. If several threads ask for the same missing key at
+    the same time, only one of them computes the result. The others wait
+    for it and then take the result from the cache ('single flight'). If
+    that takes too long, they compute the result themselves.
+
+    """
+    def __init__(self, max_size, name=None, wait_timeout=None):
+        """
+        Create a new cache.
+
+        @param max_size:        Maximum number of entries in the cache.
+        @type  max_size:        int
+
+        @param name:            If specified, the statistics of this cache
+                                are reported under this name.
+        @type  name:            string
+
+        @param wait_timeout:    Max. number of seconds a thread waits for
+                                another thread that computes the same result,
+                                or None to wait forever.
+        @type  wait_timeout:    float
+
+        """
+        self.wait_timeout = wait_timeout
+        self.__cache      = LruCache(max_size, name)
+        self.__lock       = threading.Lock()
+        self.__flights    = dict()     # Key -> event of the thread computing the result
+
+    def call(self, key, ttl, func, is_valid=None):
+        """
+        Return the result for a key, calling the function if necessary.
+
+        @param key:         The key of the entry.
+        @type  key:         object
+
+        @param ttl:         Number of seconds for which a new result is kept.
+        @type  ttl:         int
+
+        @param func:        Function without arguments, which computes the
+                            result. It returns a tuple of the result and a flag,
+                            which indicates whether the result may be cached.
+        @type  func:        function
+
+        @param is_valid:    Optional function, which is called with a stored
+                            result. If it returns False, the result is stale.
+        @type  is_valid:    function
+
+        @return:            The (possibly cached) result.
+        @rtype:             object
+
+        """
+        def check(entry):
+            return entry[1] > time.time()  and  (is_valid is None  or  is_valid(entry[0]))
+
+        entry = self.__cache.get(key, check)
+        if entry is not None:
+            return entry[0]
+
+        self.__lock.acquire()
+        try:
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if leader:
+                flight               = threading.Event()
+                self.__flights[key]  = flight
+        finally:
+            self.__lock.release()
+
+        if not leader:
+            # Someone else is computing the result already. If that fails,
+            # takes too long or the result can't be cached, we compute it
+            # ourselves.
+            flight.wait(self.wait_timeout)
+            entry = self.__cache.get(key, check)
+            if entry is not None:
+                return entry[0]
+            return func()[0]
+
+        try:
+            value, cacheable = func()
+            if cacheable:
+                self.__cache.put(key, (value, time.time() + ttl))
+            return value
+        finally:
+            self.__lock.acquire()
+            try:
+                del self.__flights[key]
+            finally:
+                self.__lock.release()
+            flight.set()
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+
+        """
+        self.__cache.clear()
@@ -73,6 +73,7 @@ class BaseComponent(object):
         DESCRIPTION
         DOCUMENTATION
         SERVICES
+        POOLABLE
         
     A component specifies 'sub-SERVICES'. To do so, implement any number of services
     methods. Then list those methods in the 'SERVICES' dictionary (use any name as
@@ -81,6 +82,26 @@ class BaseComponent(object):
     like this: <resource_uri>/<sub_service_method>/....
 
     The name of the sub-service method is directly specified in the URI.
+
+    A component may set 'POOLABLE' to True if its instances can be reused across
+    requests to the same resource. Such a component may not keep any per-request
+    state in its attributes, other than the request and base capabilities, which
+    are reset by the framework (see resetRequestState()).
+
+    Service methods may return an iterator (for example a generator) as the
+    result data. The elements are then rendered and sent to the client one by
+    one, without building the entire result in memory. The iterator is consumed
+    after the service method has returned, so it should not rely on the request
+    or base capabilities of the component anymore.
+
+    A service definition may contain a 'cache' entry, for example
+    { "ttl" : 3600 }, if its GET results stay valid for that many seconds.
+    The server then keeps the rendered response in its response cache and
+    sends a matching Cache-Control header to clients. In addition, the
+    service method is not called again for the same parameters until the
+    result has expired, even when the service is accessed by other
+    components. If the result only depends on some of the parameters, list
+    their names in a "vary" entry: { "ttl" : 300, "vary" : [ "query" ] }.
     
     """
     LANGUAGE         = "PYTHON"
@@ -95,6 +116,8 @@ class BaseComponent(object):
     """Longer, man-page style documentation."""
     SERVICES         = None
     """A dictionary keying method name to docstring for exposed sub-service methods. May be left empty."""
+    POOLABLE         = False
+    """Set to True if instances of the component may be reused across requests."""
     
     def __init__(self):
         self.__resource_name     = None
@@ -110,6 +133,15 @@ class BaseComponent(object):
     def setRequest(self, request):
         self.__http_request = request
         
+    def isPoolable(self):
+        return self.POOLABLE
+
+    def resetRequestState(self):
+        # Called before a pooled instance is handed back to the pool. Components
+        # that override this should call the base implementation as well.
+        self.__http_request      = None
+        self.__base_capabilities = None
+
     def getRequestUri(self):
         return self.__http_request.getRequestURI()
 
@@ -103,8 +103,10 @@ class CombinerComponent(BaseComponent):
 
     def combined_results(self, method, input):
         return Result.ok("foo")
-        code, pr_contacts    = accessResource("/resource/PR_contacts/for_websites")
-        code, search_results = accessResource("/resource/AboutUs/search", params={"num":"50"})
+        # Both resources are accessed at the same time
+        (code, pr_contacts), (code, search_results) = \
+                    accessResources([ "/resource/PR_contacts/for_websites",
+                                      ("/resource/AboutUs/search", { "num" : "50" }) ])
 
         result = list()
         for res in search_results:
@@ -55,6 +55,7 @@ class GpsWalkerComponent(BaseComponent):
                            "city" : {
                                 "desc"  : "Return coordinates for the specified city: 'SanFrancisco', 'London', 'Valletta', 'Auckland'",
                                 "allow_params_in_body" : True,
+                                "cache"  : { "ttl" : 3600 },
                                 "params" : {
                                     "name"       : ParameterDef(PARAM_STRING, "Name of the city", required=True)
                                 }
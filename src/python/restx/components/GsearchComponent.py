@@ -46,9 +46,11 @@ class GsearchComponent(BaseComponent):
                         the default search term, specified during resource
                         creation time, is used.
                         """
+    POOLABLE         = True
     SERVICES         = {
                            "search" :   {
                                "desc"   : "Provide 'query' as attribute to GET a search result. A 'num'ber of results can optionally be specified as well.",
+                               "cache"  : { "ttl" : 300, "vary" : [ "query", "num" ] },
                                "params" : {
                                     "query" : ParameterDef(PARAM_STRING, "The search query",
                                                            required=False, default=""),
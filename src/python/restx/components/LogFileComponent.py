@@ -117,6 +117,36 @@ def getdata(handle, bufsize):
     return (linedate, line)
 
 
+def matching_lines(handle, bufsize, linedate, line, searchend, must_contain_1, must_contain_2, must_not_contain):
+    """
+    Generator, which returns the lines up to the end of the search range.
+
+    Starts with the line that was read last (its date is passed in as well),
+    and applies the text filters (must and must-not contain) to each line.
+    The file handle is closed when the generator is done.
+
+    """
+    try:
+        try:
+            while linedate <= searchend:
+                old_line = line
+                linedate, line = getdata(handle, bufsize)
+
+                # Check whether the text filters apply (must and must-not contain)
+                if must_contain_1 and must_contain_1 not in old_line:
+                    continue
+                if must_contain_2 and must_contain_2 not in old_line:
+                    continue
+                if must_not_contain and must_not_contain in old_line:
+                    continue
+
+                yield old_line
+        except SignalException, e:
+            pass
+    finally:
+        handle.close()
+
+
 class LogFileComponent(BaseComponent):
 
     # Name, description and doc string of the component as it should appear to the user.
@@ -132,6 +162,7 @@ class LogFileComponent(BaseComponent):
                        }
     
     # A dictionary with information about each exposed service method (sub-resource).
+    POOLABLE         = True
     SERVICES         = {
                           "subset" : {
                                "desc" : "Accesses a region of lines from the logfile, based on start and end time. " + \
@@ -192,10 +223,6 @@ class LogFileComponent(BaseComponent):
 
         pos1 = pos2  = 0
 
-        if count_only:
-            out = 0
-        else:
-            out = list()
         try:
             # Seek using binary search
             while pos1 != endrange and oldmidrange != 0 and linedate != searchstart:
@@ -231,30 +258,25 @@ class LogFileComponent(BaseComponent):
             while linedate < searchstart:
                 linedate, line = getdata(handle, bufsize)
 
-            # Now that the preliminaries are out of the way, we just loop,
-            # reading lines and storing them in a list (or counting) until they
-            # are beyond the end of the range we want
-            while linedate <= searchend:
-                old_line = line
-                linedate, line = getdata(handle, bufsize)
-
-                # Check whether the text filters apply (must and must-not contain)
-                if self.mustContain_1 and self.mustContain_1 not in old_line:
-                    continue
-                if self.mustContain_2 and self.mustContain_2 not in old_line:
-                    continue
-                if self.mustNotContain and self.mustNotContain in old_line:
-                    continue
-                        
-                if count_only:
-                    out += 1
-                else:
-                    out.append(old_line)
-
         except SignalException, e:
-            pass
-
-        handle.close()
+            # Reached the end of the file before the search range
+            handle.close()
+            if count_only:
+                return Result.ok(0)
+            else:
+                return Result.ok(list())
+
+        # Now that the preliminaries are out of the way, we just loop,
+        # reading lines until they are beyond the end of the range we want.
+        # The lines are produced by a generator, so that they can be streamed
+        # to the client without holding them all in memory.
+        lines = matching_lines(handle, bufsize, linedate, line, searchend,
+                               self.mustContain_1, self.mustContain_2, self.mustNotContain)
+        if count_only:
+            out = 0
+            for l in lines:
+                out += 1
+            return Result.ok(out)
       
-        return Result.ok(out)
+        return Result.ok(lines)
 
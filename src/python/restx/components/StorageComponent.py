@@ -27,6 +27,7 @@ import urllib
 
 # RESTx imports
 from restx.components.api import *
+from restx.fileentity     import guessContentType
 
 class StorageComponent(BaseComponent):
     NAME             = "StorageComponent"
@@ -44,29 +45,60 @@ class StorageComponent(BaseComponent):
                         'name' is also allowed as a positional parameter. This means you can access the same
                         file like this: .../resourcename/files/<name>
 
+                        Without a name, the list of stored files is returned. Use 'offset' and 'limit'
+                        to retrieve a long list in pages.
+
+                        Stored data is normally rendered like any other result (for example as a JSON
+                        string). With 'raw' set, it is returned exactly as it was stored, with a content
+                        type that is derived from the file name. Large files are then sent directly from
+                        storage, and clients can request parts of them (HTTP Range requests).
+
                         """
+    POOLABLE         = True
     SERVICES         = {
                            "files" :   {
                                "desc"   : "Provide the name of the storaged item as parameter and use 'PUT' or 'GET'.",
                                "params" : {
                                     "name" : ParameterDef(PARAM_STRING, "Name of the stored data item", required=False,
                                                           default=""),
+                                    "offset" : ParameterDef(PARAM_NUMBER, "Number of files to skip when listing files",
+                                                            required=False, default=0),
+                                    "limit" : ParameterDef(PARAM_NUMBER, "Max. number of files to list (0: no limit)",
+                                                           required=False, default=0),
+                                    "raw" : ParameterDef(PARAM_BOOL, "Return stored data as it is, without rendering",
+                                                         required=False, default=False),
                                },
-                               "positional_params" : [ "name" ]
+                               "positional_params" : [ "name" ],
+                               "stream_input"      : True
                            }
                        }
     
             
-    def files(self, method, input, name):
+    def files(self, method, input, name, offset, limit, raw):
         """
         Stored or retrieves data from the storage bucket.
         
         @param method:     The HTTP request method.
         @type method:      string
         
-        @param input:      Any data that came in the body of the request.
-        @type input:       string
+        @param input:      Any data that came in the body of the request. Since the
+                           service asks for streamed input, this is normally a
+                           file-like object, which allows us to store large files
+                           without reading them into memory first.
+        @type input:       file-like object or string
         
+        @param name:       Name of the stored data item.
+        @type name:        string
+
+        @param offset:     Number of files to skip when listing files.
+        @type offset:      number
+
+        @param limit:      Max. number of files to list, 0 for no limit.
+        @type limit:       number
+
+        @param raw:        Return stored data without rendering it.
+        @type raw:         boolean
+
         @return:           The output data of this service.
         @rtype:            string
         
@@ -77,7 +109,7 @@ class StorageComponent(BaseComponent):
         if not name:
             # User didn't specify a specific file, which means we should generate
             # a list of all the files in that namespace.
-            data = storage.listFiles()
+            data = storage.listFiles(max(0, int(offset)), max(0, int(limit)) or None)
 
             # We want to prepend the resource name and service name, so that the user
             # gets complete URIs for each file
@@ -89,11 +121,47 @@ class StorageComponent(BaseComponent):
                 storage.deleteFile(name)
                 data = "File deleted"
             else:
-                if input:
+                if hasattr(input, "isEmpty"):
+                    # Streamed request body
+                    if not input.isEmpty():
+                        storage.storeFileFromStream(name, input)
+                        data = "Successfully stored"
+                    else:
+                        return self.__load(storage, name, raw)
+                elif input:
                     storage.storeFile(name, input)
                     data = "Successfully stored"
                 else:
-                    data = storage.loadFile(name)
+                    return self.__load(storage, name, raw)
 
         return Result.ok(data)
 
+    def __load(self, storage, name, raw):
+        """
+        Return the result with the contents of a stored file.
+
+        Raw data is returned as a file entity, if the storage supports that.
+        The file is then not read into memory.
+
+        @param storage:    The storage bucket.
+        @type storage:     FileStore
+
+        @param name:       Name of the stored data item.
+        @type name:        string
+
+        @param raw:        Flag indicating whether the data is returned raw.
+        @type raw:         boolean
+
+        @return:           The result.
+        @rtype:            Result
+
+        """
+        if not raw:
+            return Result.ok(storage.loadFile(name))
+        if hasattr(storage, "loadFileEntity"):
+            return Result.ok(storage.loadFileEntity(name))
+        res = Result.ok(storage.loadFile(name))
+        # Setting the content type means that the data is not rendered
+        res.addHeader("Content-type", guessContentType(name))
+        return res
+
@@ -88,19 +88,19 @@ class TimeRange(BaseComponent):
     def today(self, method, input, count_only):
         now   = datetime.now()
         start = datetime(now.year, now.month, now.day, 0, 0, 0)
-        status, data = accessResource(self.base_resource, params=self.__make_start_end_params(start, now, count_only))
+        status, data = getServiceHandle(self.base_resource)(params=self.__make_start_end_params(start, now, count_only))
         return Result(status, data)
 
     def yesterday(self, method, input, count_only):
         end   = datetime.now()-timedelta(1)
         start = end-timedelta(7)
-        status, data = accessResource(self.base_resource, params=self.__make_start_end_params(start, end, count_only))
+        status, data = getServiceHandle(self.base_resource)(params=self.__make_start_end_params(start, end, count_only))
         return Result(status, data)
 
     def last7days(self, method, input, count_only):
         now   = datetime.now()
         start = now-timedelta(7)
-        status, data = accessResource(self.base_resource, params=self.__make_start_end_params(start, now, count_only))
+        status, data = getServiceHandle(self.base_resource)(params=self.__make_start_end_params(start, now, count_only))
         return Result(status, data)
 
        
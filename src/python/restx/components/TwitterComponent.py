@@ -51,6 +51,7 @@ To create the resource, the Twitter account name and password need to be specifi
                          "status" :   { "desc" : "You can GET the status or POST a new status to it." },
                          "timeline" : {
                                          "desc" : "You can GET the timeline of the user.",
+                                         "cache" : { "ttl" : 60 },
                                          "params" : {
                                             "count"  : ParameterDef(PARAM_NUMBER, "Number of results", required=False, default=20),
                                             "filter" : ParameterDef(PARAM_BOOL,   "If set, only 'important' fields are returned", required=False, default=True),
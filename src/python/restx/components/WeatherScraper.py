@@ -116,6 +116,7 @@ page, you should be fine setting a 'search_length' of around
     SERVICES         = {
                            "current" : {
                                "desc" : "Provide current weather information",
+                               "cache" : { "ttl" : 600 },
                            }
                        }
         
@@ -24,7 +24,7 @@ Expose the complete API for component authors.
 """
 from restx.components.BaseComponent   import BaseComponent
 from restx.core.parameter             import *
-from restx.resources.resource_runner  import accessResource
+from restx.resources.resource_runner  import accessResource, accessResources, getResourceHandle, getServiceHandle
 from restx.resources                  import makeResource
 
 from org.mulesoft.restx.exception     import *
@@ -22,12 +22,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Defines a base class for all components.
 
 """
-# Python imports
-import urllib, urllib2, socket
-
 import restx.settings as settings
 
-from restx.storageabstraction.file_storage import FileStorage
+from restx.httpclient                      import getHttpClient
+from restx.platform_specifics              import FileStorageClass
 
 from org.mulesoft.restx.component        import BaseComponentCapabilities
 from org.mulesoft.restx.component.api    import HttpResult, HTTP
@@ -69,31 +67,12 @@ class BaseCapabilities(BaseComponentCapabilities):
                 unique_namespace = "%s__%s" % (self.__my_component.getMyResourceName(), namespace)
             else:
                 unique_namespace = self.__my_component.getMyResourceName()
-            storage = FileStorage(storage_location=settings.STORAGEDB_LOCATION, unique_prefix=unique_namespace)
+            storage = FileStorageClass(storage_location=settings.STORAGEDB_LOCATION, unique_prefix=unique_namespace)
             return storage
         else:
             # Cannot get storage object when I am not running as a resource
             return None
     
-    def __get_http_opener(self, url):
-        """
-        Return an HTTP handler class, with credentials enabled if specified.
-        
-        @param url:    URL that needs to be fetched.
-        @type url:     string
-        
-        @return:       HTTP opener (from urllib2)
-        
-        """
-        if self.__accountname  and  self.__password:
-            passman = urllib2.HTTPPasswordMgrWithDefaultRealm()
-            passman.add_password(None, url, self.__accountname, self.__password)
-            authhandler = urllib2.HTTPBasicAuthHandler(passman)
-            opener = urllib2.build_opener(authhandler)
-        else:
-            opener = urllib2.build_opener()
-        return opener
-        
     def httpSetCredentials(self, accountname, password):
         """
         The component author can set credentials for sites that require authentication.
@@ -125,55 +104,27 @@ class BaseCapabilities(BaseComponentCapabilities):
         @rtype:            tuple
         
         """
-        #
-        # For some reason, under Jython we are REALLY slow in handling the kind
-        # of host names where we get more than one DNS hit back.
-        #
-        # As a stop gap measure:
-        # 1. Extract the host name from the URI
-        # 2. Do a normal DNS lookup for the name, using the socket library
-        # 3. Replace the host name in the URI with the IP address string
-        # 4. Add a 'Host' header with the original host name to the request
-        #
-        # Wish I wouldn't have to do that...
-        #
-        try:
-            start_of_hostname = url.index("//")
-            host_port, path   = urllib.splithost(url[start_of_hostname:])  # Wants URL starting at '//'
-            host, port        = urllib.splitport(host_port)
-            ipaddr            = socket.gethostbyname(host)                # One of the possible IP addresses for this host
-            url               = url.replace(host, ipaddr, 1)              # Replace only first occurence of host name with IP addr
-            add_headers = { "Host" : host }                               # Will add a proper host header
-        except Exception, e:
-            # Can't parse URI? Just leave it be and let itself sort out.
-            add_headers = None
-            pass
-
-        opener = self.__get_http_opener(url)
-        # Add any custom headers we might have (list of tuples)
-        if headers:
-            if type(headers) is not type(dict):
-                # If this was called from Java then the headers are
-                # defined in a HashMap. We need to translate that to
-                # a Python dictionary.
-                header_dict = dict()
-                header_dict.update(headers)
-                headers = header_dict
-
-            opener.addheaders.append(headers.items())
-
-        request = urllib2.Request(url)
-
-        if add_headers:
-            for name, value in add_headers.items():
-                request.add_header(name, value)
+        # Add any custom headers we might have
+        if headers  and  type(headers) is not dict:
+            # If this was called from Java then the headers are
+            # defined in a HashMap. We need to translate that to
+            # a Python dictionary.
+            header_dict = dict()
+            header_dict.update(headers)
+            headers = header_dict
+
+        if self.__accountname  and  self.__password:
+            credentials = (self.__accountname, self.__password)
+        else:
+            credentials = None
 
         if data:
-            request.add_data(data)
-        resp = opener.open(request)
-        #resp = opener.open(url, data)
-        code = HTTP.OK
-        data = resp.read()
+            method = "POST"
+        else:
+            method = "GET"
+        # All components share one client, which keeps connections open
+        # for later requests to the same host.
+        code, resp_headers, data = getHttpClient().request(method, url, data, headers, credentials)
         return code, data
         
     def httpGet(self, url, headers=None):
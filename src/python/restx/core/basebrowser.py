@@ -30,6 +30,51 @@ from restx.render import JsonRenderer
 
 from org.mulesoft.restx.component.api import HTTP, Result
 
+#
+# Query arguments, which control the rendering of the output. They are
+# not passed on to components as runtime parameters.
+#
+RENDER_QUERY_FLAGS = [ "_compact", "_sort" ]
+
+
+def _is_flag_set(value):
+    """
+    Interpret the value of a render flag, such as '_compact=1'.
+
+    A flag without value ('_compact') counts as set.
+
+    """
+    return value is None  or  value.strip().lower() not in [ "0", "false", "no", "off" ]
+
+
+def parse_accept_header(accept_header):
+    """
+    Parse the values of the Accept header.
+
+    @param accept_header:   List of the values of the Accept header. Each value
+                            may contain several comma separated media ranges,
+                            each of which may have parameters.
+    @type accept_header:    list
+
+    @return:                List of (media type, parameter dictionary) tuples.
+    @rtype:                 list
+
+    """
+    media_ranges = list()
+    for value in accept_header:
+        for media_range in value.split(","):
+            elems  = media_range.split(";")
+            params = dict()
+            for param in elems[1:]:
+                if "=" in param:
+                    pname, pvalue = param.split("=", 1)
+                    params[pname.strip().lower()] = pvalue.strip()
+                elif param.strip():
+                    params[param.strip().lower()] = None
+            media_ranges.append((elems[0].strip().lower(), params))
+    return media_ranges
+
+
 class BaseBrowser(object):
     """
     A browser is a class that handles specific requests after they
@@ -54,6 +99,12 @@ class BaseBrowser(object):
         was requested in the accept header. This is because we
         are assuming that a non-human client wants the easily
         parsable json.
+
+        Machine clients may ask for compact JSON output (no indentation)
+        either with a 'compact' parameter in the Accept header, such as
+        'application/json; compact=1', or with the '_compact' query flag.
+        Sorting of dictionary keys can be switched off with 'sort=0' or the
+        '_sort=0' query flag.
                         
         @param request:        This HTTP request.
         @type request:         RestxHttpRequest
@@ -69,13 +120,49 @@ class BaseBrowser(object):
         accept_header       = self.headers.get("Accept")
         if not accept_header:
             accept_header = list()
-        self.human_client   = False if "application/json" in accept_header or settings.NEVER_HUMAN else True
+        self.renderer_args  = dict(renderer_args) if renderer_args else dict()
+        json_params         = None
+        for media_type, params in parse_accept_header(accept_header):
+            if media_type == "application/json":
+                json_params = params
+                break
+        self.human_client   = False if json_params is not None or settings.NEVER_HUMAN else True
+        if json_params:
+            if 'compact' in json_params:
+                self.renderer_args['compact'] = _is_flag_set(json_params['compact'])
+            if 'sort' in json_params:
+                self.renderer_args['sort_keys'] = _is_flag_set(json_params['sort'])
+        self.__process_render_query_flags()
         self.header         = ""
         self.footer         = ""
-        self.renderer_args  = renderer_args
+        # Browsers set this to the number of seconds for which the
+        # response to a GET request may be served from the response
+        # cache. None means: Don't cache.
+        self.cache_ttl      = None
+        # Set to True if clients have to revalidate a cached response (with
+        # its ETag) every time, because it may change at any moment.
+        self.revalidate     = False
         self.breadcrumbs    = list()
         self.context_header = list()  # Contextual menus or other header items, possibly displayed by renderer
     
+    def __process_render_query_flags(self):
+        """
+        Set renderer arguments from the render flags in the query string.
+
+        """
+        query_string = self.request.getRequestQuery()
+        if not query_string  or  "_" not in query_string:
+            return
+        for elem in query_string.split("&"):
+            if "=" in elem:
+                name, value = elem.split("=", 1)
+            else:
+                name, value = elem, None
+            if name == "_compact":
+                self.renderer_args['compact'] = _is_flag_set(value)
+            elif name == "_sort":
+                self.renderer_args['sort_keys'] = _is_flag_set(value)
+
     def renderOutput(self, data):
         """
         Take a Python object and return it rendered.
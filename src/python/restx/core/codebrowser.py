@@ -198,6 +198,8 @@ class CodeBrowser(BaseBrowser):
         """
         method = self.request.getRequestMethod()
         if method == HTTP.GET_METHOD:
+            # The component code only changes when the server is restarted
+            self.cache_ttl = settings.RESPONSE_CACHE_TTL
             return self.__process_get()
         elif method == HTTP.POST_METHOD:
             return self.__process_post()
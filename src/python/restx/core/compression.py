@@ -0,0 +1,285 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Compression of responses with gzip or deflate.
+
+The content coding is negotiated with the Accept-Encoding header of the
+request. Rendered responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes
+are compressed after rendering, streamed responses are compressed chunk by
+chunk while they are sent. Content types, which are compressed already
+(most images, audio, video and archives), are sent as they are.
+
+Files (see restx.fileentity) of up to COMPRESSED_FILE_MAX_SIZE bytes are
+compressed only once: The compressed variants are cached, keyed by file
+name, inode, modification time and size. Larger files are sent
+uncompressed, so that they can still be sent directly from disk.
+
+"""
+# Python imports
+import zlib
+import struct
+
+# RESTx imports
+import restx.settings as settings
+
+from restx.cache                       import LruCache
+from restx.core.responsecache          import getRequestHeader
+from restx.httpabstraction.base_server import isStreamedEntity
+
+from org.mulesoft.restx.component.api import HTTP
+
+
+# Supported content codings, in order of preference
+ENCODINGS = [ "gzip", "deflate" ]
+
+# Content types (or their prefixes), which don't get any smaller
+INCOMPRESSIBLE_TYPES = [ "image/", "audio/", "video/", "application/zip", "application/gzip",
+                         "application/x-gzip", "application/java-archive", "application/pdf",
+                         "application/x-shockwave-flash", "font/woff" ]
+
+# ... with these exceptions
+COMPRESSIBLE_TYPES   = [ "image/svg+xml", "image/bmp" ]
+
+# Header of a gzip member without file name and time stamp (RFC 1952)
+_GZIP_HEADER = "\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+_FILE_CACHE = LruCache(settings.COMPRESSED_FILE_CACHE_SIZE, name="compressed_files")
+
+
+def negotiateEncoding(request):
+    """
+    Return the content coding that should be used for the response to a request.
+
+    @param request:  The HTTP request.
+    @type request:   RestxHttpRequest
+
+    @return:         "gzip", "deflate" or None if the response should not
+                     be compressed.
+    @rtype:          string
+
+    """
+    if not settings.RESPONSE_COMPRESSION:
+        return None
+    accept_encoding = getRequestHeader(request, "Accept-encoding")
+    if not accept_encoding:
+        return None
+    qualities = dict()
+    for part in accept_encoding.split(","):
+        fields = part.split(";")
+        coding = fields[0].strip().lower()
+        if coding == "x-gzip":
+            coding = "gzip"
+        quality = 1.0
+        for param in fields[1:]:
+            name, value = (param.split("=", 1) + [ "" ])[:2]
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    best_encoding = None
+    best_quality  = 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding = encoding
+            best_quality  = quality
+    return best_encoding
+
+
+def isCompressible(content_type):
+    """
+    Return True if compression makes sense for a content type.
+
+    @param content_type:    The content type (parameters are ignored).
+    @type content_type:     string
+
+    @return:                Flag indicating whether this type is compressible.
+    @rtype:                 boolean
+
+    """
+    if not content_type:
+        return True
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in COMPRESSIBLE_TYPES:
+        return True
+    for prefix in INCOMPRESSIBLE_TYPES:
+        if content_type.startswith(prefix):
+            return False
+    return True
+
+
+def compressData(data, encoding):
+    """
+    Compress a buffer.
+
+    @param data:        The data.
+    @type data:         string
+
+    @param encoding:    "gzip" or "deflate".
+    @type encoding:     string
+
+    @return:            The compressed data.
+    @rtype:             string
+
+    """
+    level = settings.RESPONSE_COMPRESSION_LEVEL
+    if encoding == "deflate":
+        return zlib.compress(data, level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return "".join([ _GZIP_HEADER, compressor.compress(data), compressor.flush(),
+                     struct.pack("<II", zlib.crc32(data) & 0xffffffff, len(data) & 0xffffffff) ])
+
+
+def compressStream(chunks, encoding):
+    """
+    Compress a streamed entity, chunk by chunk.
+
+    Every chunk is flushed, so that the client can decompress it right
+    away. The chunks of a stream may be produced slowly, and the client
+    should not have to wait for the compressor to fill its buffer.
+
+    @param chunks:      The chunks of the entity.
+    @type chunks:       iterator
+
+    @param encoding:    "gzip" or "deflate".
+    @type encoding:     string
+
+    @return:            Generator for the compressed chunks.
+    @rtype:             generator
+
+    """
+    level = settings.RESPONSE_COMPRESSION_LEVEL
+    if encoding == "deflate":
+        compressor = zlib.compressobj(level)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        yield _GZIP_HEADER
+    crc  = 0
+    size = 0
+    for chunk in chunks:
+        if type(chunk) is unicode:
+            chunk = chunk.encode("UTF-8")
+        if not chunk:
+            continue
+        crc   = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    data = compressor.flush()
+    if encoding == "gzip":
+        data += struct.pack("<II", crc & 0xffffffff, size & 0xffffffff)
+    yield data
+
+
+def _addVary(result):
+    """
+    Tell caches that the response depends on the Accept-Encoding of the request.
+
+    """
+    headers = result.getHeaders()
+    vary    = headers  and  headers.get("Vary")
+    if not vary:
+        result.addHeader("Vary", "Accept-Encoding")
+    elif "accept-encoding" not in vary.lower():
+        result.addHeader("Vary", vary + ", Accept-Encoding")
+
+
+def compressResult(result, encoding):
+    """
+    Compress the (rendered) entity of a result, if that is worthwhile.
+
+    Compressible results get a 'Vary: Accept-Encoding' header, even if they
+    are not compressed for this client.
+
+    @param result:      The result.
+    @type result:       Result
+
+    @param encoding:    The negotiated content coding, or None.
+    @type encoding:     string
+
+    @return:            The result.
+    @rtype:             Result
+
+    """
+    if not settings.RESPONSE_COMPRESSION  or  result.getStatus() != HTTP.OK:
+        return result
+    headers = result.getHeaders()
+    if headers:
+        if headers.get("Content-Encoding")  or  not isCompressible(headers.get("Content-type")):
+            return result
+    entity = result.getEntity()
+    if isStreamedEntity(entity):
+        _addVary(result)
+        if encoding:
+            result.setEntity(compressStream(entity, encoding))
+            result.addHeader("Content-Encoding", encoding)
+    elif type(entity) in [ str, unicode ]:
+        if type(entity) is unicode:
+            entity = entity.encode("UTF-8")
+        if len(entity) >= settings.RESPONSE_COMPRESSION_MIN_SIZE:
+            _addVary(result)
+            if encoding:
+                result.setEntity(compressData(entity, encoding))
+                result.addHeader("Content-Encoding", encoding)
+    return result
+
+
+def canCompressFile(entity):
+    """
+    Return True if a file entity is sent compressed to clients that accept it.
+
+    @param entity:  The file entity.
+    @type entity:   FileEntity
+
+    @return:        Flag indicating whether the file may be compressed.
+    @rtype:         boolean
+
+    """
+    return settings.RESPONSE_COMPRESSION  and  isCompressible(entity.content_type)  and \
+           settings.RESPONSE_COMPRESSION_MIN_SIZE <= entity.length <= settings.COMPRESSED_FILE_MAX_SIZE
+
+
+def compressFile(entity, encoding):
+    """
+    Return the compressed contents of a file entity.
+
+    The compressed variants are cached. The entity is closed.
+
+    @param entity:      The file entity (see canCompressFile()).
+    @type entity:       FileEntity
+
+    @param encoding:    "gzip" or "deflate".
+    @type encoding:     string
+
+    @return:            The compressed data.
+    @rtype:             string
+
+    """
+    key  = (entity.name, entity.inode, entity.offset, entity.length, entity.mtime, encoding)
+    data = _FILE_CACHE.get(key)
+    if data is None:
+        data = compressData("".join(entity.chunks()), encoding)
+        _FILE_CACHE.put(key, data)
+    else:
+        entity.close()
+    return data
+
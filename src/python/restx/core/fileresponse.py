@@ -0,0 +1,193 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Conditional and range requests for file entities.
+
+Responses with a FileEntity carry Last-Modified and ETag headers, which
+are derived from inode, modification time and size of the file. Clients can
+revalidate them with If-Modified-Since or If-None-Match, and retrieve
+parts of them with a Range header (single byte ranges only, requests
+for multiple ranges receive the whole file).
+
+Clients that accept gzip or deflate receive small enough files compressed
+(see restx.core.compression). The compressed variant has its own ETag and
+is always sent as a whole.
+
+"""
+# Python imports
+import rfc822
+
+# RESTx imports
+from restx.fileentity             import isFileEntity, httpDate
+from restx.core.responsecache     import getRequestHeader, etagMatches, notModified
+from restx.core.compression       import canCompressFile, compressFile
+
+from org.mulesoft.restx.component.api import HTTP, Result
+
+
+def _parseHttpDate(value):
+    """
+    Return the time stamp of a date in an HTTP header, or None if it is invalid.
+
+    """
+    try:
+        date = rfc822.parsedate_tz(value)
+        if date:
+            return rfc822.mktime_tz(date)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return None
+
+
+def parseRange(value, size):
+    """
+    Parse the value of a Range header.
+
+    @param value:   The value of the header, for example 'bytes=0-499'.
+    @type value:    string
+
+    @param size:    The size of the entity.
+    @type size:     int
+
+    @return:        Tuple of offset and length of the range, None if the
+                    header has to be ignored (invalid, or more than one
+                    range) or False if the range can't be satisfied.
+    @rtype:         tuple
+
+    """
+    value = value.strip()
+    if not value.startswith("bytes="):
+        return None
+    spec = value[6:].strip()
+    if "," in spec  or  "-" not in spec:
+        return None
+    first, last = [ s.strip() for s in spec.split("-", 1) ]
+    try:
+        if not first:
+            # Suffix range: The last n bytes
+            num = int(last)
+            if num <= 0  or  size == 0:
+                return False
+            num = min(num, size)
+            return (size - num, num)
+        first = int(first)
+        if last:
+            last = int(last)
+        else:
+            last = None
+    except ValueError:
+        return None
+    if first < 0  or  (last is not None  and  last < first):
+        return None
+    if first >= size:
+        return False
+    if last is None  or  last >= size:
+        last = size - 1
+    return (first, last - first + 1)
+
+
+def prepareFileResponse(request, result, encoding=None):
+    """
+    Add validators to a result with a FileEntity and answer conditional and range requests.
+
+    Other results are returned unchanged.
+
+    @param request:  The HTTP request.
+    @type request:   RestxHttpRequest
+
+    @param result:   The result.
+    @type result:    Result
+
+    @param encoding: The negotiated content coding, if any.
+    @type encoding:  string
+
+    @return:         The (possibly new) result.
+    @rtype:          Result
+
+    """
+    entity = result.getEntity()
+    if result.getStatus() != HTTP.OK  or  not isFileEntity(entity):
+        return result
+    if request.getRequestMethod().upper() not in [ HTTP.GET_METHOD, HTTP.HEAD_METHOD ]:
+        return result
+
+    compressible  = canCompressFile(entity)
+    if not compressible:
+        encoding = None
+    last_modified = httpDate(entity.mtime)
+    # Files are replaced by renaming a new one over them, so the inode
+    # changes even if the modification time (and size) remain the same
+    etag          = '"%x-%x-%x-%x"' % (entity.inode, int(entity.mtime * 1000000),
+                                        entity.offset, entity.length)
+    if encoding:
+        etag = etag[:-1] + '-%s"' % encoding
+    result.addHeader("Last-Modified", last_modified)
+    result.addHeader("ETag", etag)
+    if compressible:
+        result.addHeader("Vary", "Accept-Encoding")
+    if not encoding:
+        result.addHeader("Accept-Ranges", "bytes")
+    headers       = result.getHeaders()
+
+    # If-None-Match takes precedence over If-Modified-Since
+    if getRequestHeader(request, "If-none-match") is not None:
+        modified = not etagMatches(request, etag)
+    else:
+        since    = getRequestHeader(request, "If-modified-since")
+        since    = since  and  _parseHttpDate(since)
+        modified = since is None  or  int(entity.mtime) > since
+    if not modified:
+        entity.close()
+        result = notModified(etag, headers.get("Cache-Control"))
+        result.addHeader("Last-Modified", last_modified)
+        if compressible:
+            result.addHeader("Vary", "Accept-Encoding")
+        return result
+
+    if encoding:
+        compressed = Result(HTTP.OK, compressFile(entity, encoding))
+        for name in headers.keySet():
+            compressed.addHeader(name, headers.get(name))
+        compressed.addHeader("Content-Encoding", encoding)
+        return compressed
+
+    range_value = getRequestHeader(request, "Range")
+    if not range_value:
+        return result
+    if_range = getRequestHeader(request, "If-range")
+    if if_range  and  if_range != etag  and  if_range != last_modified:
+        # The client's copy is outdated: It needs the whole file
+        return result
+    file_range = parseRange(range_value, entity.length)
+    if file_range is None:
+        return result
+    if file_range is False:
+        entity.close()
+        result = Result(HTTP.REQUEST_RANGE_NOT_SATISFIED, "")
+        result.addHeader("Content-Range", "bytes */%d" % entity.length)
+        return result
+    offset, length = file_range
+    partial = Result(HTTP.PARTIAL_CONTENT, entity.getRange(offset, length))
+    for name in headers.keySet():
+        partial.addHeader(name, headers.get(name))
+    partial.addHeader("Content-Range", "bytes %d-%d/%d" % (offset, offset + length - 1, entity.length))
+    return partial
+
@@ -24,6 +24,7 @@ Allows users and clients to browse the server's meta information.
 """
 import restx.settings as settings
 
+from restx.stats            import get_stats
 from restx.core.basebrowser import BaseBrowser
 
 from org.mulesoft.restx.util          import Url
@@ -59,8 +60,9 @@ class MetaBrowser(BaseBrowser):
         Process the request.
         
         Produce the data that needs to be displayed for any request
-        handled by this browser. Currently, there is only one request
-        handled by the meta browser.
+        handled by this browser. Besides the server's home page, the
+        meta browser knows about the server documentation and the
+        run-time statistics.
         
         @return:  Http return structure.
         @rtype:   Result
@@ -79,10 +81,16 @@ class MetaBrowser(BaseBrowser):
                     "doc"      : Url(settings.PREFIX_META + "/doc")
             }
             result = Result.ok(data)
+            self.cache_ttl = settings.RESPONSE_CACHE_TTL
             
         elif path == settings.PREFIX_META + "/doc":
             self.breadcrumbs.append(("Doc", settings.PREFIX_META + "/doc"))
             result = Result.ok(settings.get_docs())
+            self.cache_ttl = settings.RESPONSE_CACHE_TTL
+
+        elif path == settings.PREFIX_META + "/stats":
+            self.breadcrumbs.append(("Stats", settings.PREFIX_META + "/stats"))
+            result = Result.ok(get_stats())
         else:
             result = Result.notFound("Don't know this meta page")
         
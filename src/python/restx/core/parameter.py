@@ -25,7 +25,7 @@ The parameter class.
 from datetime import date
 from datetime import time as time_class
 
-from restx.platform_specifics       import PLATFORM, PLATFORM_JYTHON
+from restx.platform_specifics       import PLATFORM, JAVA_PLATFORMS
 from org.mulesoft.restx.exception import RestxException
 
 #
@@ -106,7 +106,7 @@ TYPES_DICT = {
     "URI_TYPES"      : [ unicode, str ],
 }
 
-if PLATFORM == PLATFORM_JYTHON:
+if PLATFORM in JAVA_PLATFORMS:
     # Now selectively add some of the Java types
     from java.math import BigDecimal
     TYPES_DICT["NUMBER_TYPES"].append(BigDecimal)
@@ -122,6 +122,41 @@ TYPE_COMPATIBILITY = {
     PARAM_URI      : (TYPES_DICT["URI_TYPES"], [ str ], None)
 }
 
+def makeTypeConverter(type_str):
+    """
+    Return a function that converts a value to the runtime type of a parameter type.
+
+    The returned function performs the same check and conversion that is
+    described in the TYPE_COMPATIBILITY table: Values that are of one of the
+    runtime or storage types are returned unchanged, all others are passed
+    through the conversion function. The table lookups are done only once,
+    when the converter is created.
+
+    The converter raises an exception if the value cannot be converted.
+
+    @param type_str:    A parameter type, such as PARAM_STRING, etc.
+    @type type_str:     string
+
+    @return:            Converter function, which takes a value and returns
+                        the converted value.
+    @rtype:             function
+
+    """
+    storage_types, runtime_types, conversion_func = TYPE_COMPATIBILITY[type_str]
+    accepted_types = frozenset(runtime_types + storage_types)
+
+    def convert(value):
+        value_type = type(value)
+        if value_type in accepted_types:
+            return value
+        if conversion_func:
+            return conversion_func(value)
+        raise Exception("Cannot convert provided parameter type (%s) to necessary type(s) '%s'" % \
+                        (value_type, runtime_types))
+
+    return convert
+
+
 class ParameterDef(object):
     """
     This class encapsulates a parameter definition.
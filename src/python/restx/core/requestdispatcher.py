@@ -34,6 +34,11 @@ from restx.core.staticbrowser     import StaticBrowser
 from restx.core.metabrowser       import MetaBrowser
 from restx.core.codebrowser       import CodeBrowser 
 from restx.core.resourcebrowser   import ResourceBrowser 
+from restx.core.responsecache     import ResponseCache, etagMatches, notModified
+from restx.core.fileresponse      import prepareFileResponse
+from restx.core.compression       import negotiateEncoding, compressResult
+from restx.resources              import getResourceGeneration
+from restx.fileentity             import isFileEntity
 
 BROWSER_MAP   = {
                     settings.PREFIX_META     : MetaBrowser,
@@ -46,9 +51,69 @@ class RequestDispatcher(object):
     """
     Takes incoming HTTP requests and sends them off to the
     appropriate modules.
+
+    Responses to GET requests may be served from the response cache.
     
     """
+    def __init__(self):
+        if settings.RESPONSE_CACHE_SIZE:
+            self.response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+        else:
+            self.response_cache = None
+
     def handle(self, request):
+        """
+        Handle a request, using the response cache for GET requests.
+
+        If the response can be served from the cache, no browser is involved
+        at all. Otherwise, the request is dispatched to the correct handler
+        and - if the browser allows it - the rendered response is cached.
+
+        Rendered responses are compressed for clients that accept it, before
+        they are cached (see compressResult()).
+
+        Conditional requests (If-None-Match) for responses with an ETag are
+        answered with '304 Not Modified'. Responses that consist of a file
+        also support If-Modified-Since and Range requests (see
+        prepareFileResponse()).
+        
+        @param request:   A properly wrapped request.
+        @type request:    RestxHttpRequest
+        
+        @return:          Response structure
+        @rtype:           Result
+        
+        """
+        encoding = negotiateEncoding(request)
+        if not self.response_cache  or  request.getRequestMethod().upper() != HTTP.GET_METHOD:
+            result, browser_instance = self.__dispatch(request)
+            if isFileEntity(result.getEntity()):
+                return prepareFileResponse(request, result, encoding)
+            return compressResult(result, encoding)
+
+        key        = self.response_cache.makeKey(request, encoding)
+        # Taken before the request is processed, so that any change to the
+        # resources during the processing makes the cached response stale.
+        generation = getResourceGeneration()
+        result     = self.response_cache.lookup(key, generation)
+        if not result:
+            result, browser_instance = self.__dispatch(request)
+            if isFileEntity(result.getEntity()):
+                # Files are not cached as responses: They are sent from disk
+                return prepareFileResponse(request, result, encoding)
+            result = compressResult(result, encoding)
+            if browser_instance  and  browser_instance.cache_ttl:
+                self.response_cache.store(key, result, browser_instance.cache_ttl, generation,
+                                          browser_instance.revalidate)
+
+        headers = result.getHeaders()
+        if headers:
+            etag = headers.get("ETag")
+            if etag  and  etagMatches(request, etag):
+                return notModified(etag, headers.get("Cache-Control"))
+        return result
+
+    def __dispatch(self, request):
         """
         Handle a request by dispatching it off to the correct handler.
         
@@ -61,11 +126,13 @@ class RequestDispatcher(object):
         @param request:   A properly wrapped request.
         @type request:    RestxHttpRequest
         
-        @return:          Response structure and headers
-        @rtype:           Tuple of (Result, dict)
+        @return:          Response structure and the browser that handled
+                          the request (None if there was no browser for it).
+        @rtype:           Tuple of (Result, BaseBrowser)
         
         """
-        content_type = None
+        content_type     = None
+        browser_instance = None
         try:
             if request.getRequestPath() == "/":
                 browser_class = BROWSER_MAP['/meta']
@@ -89,6 +156,9 @@ class RequestDispatcher(object):
                         content_type = result.getHeaders().get("Content-type")
                     else:
                         content_type = None
+                    if content_type is None  and  isFileEntity(result.getEntity()):
+                        # Files are sent as they are
+                        content_type = result.getEntity().content_type
                     if content_type is None:
                         # If all was OK with the request then we will
                         # render the output in the format that was
@@ -104,11 +174,13 @@ class RequestDispatcher(object):
             result = Result(e.code, e.msg)
         except RestxFileNotFoundException, e:
             result = Result(e.code, e.msg)
+        except RestxRequestEntityTooLargeException, e:
+            result = Result(e.code, e.msg)
         except RestxException, e:
             result = Result.badRequest("Bad request: " + e.msg)
 
         if content_type:
             result.addHeader("Content-type", content_type);
         
-        return result
+        return result, browser_instance
 
@@ -24,6 +24,7 @@ Allows users and clients to browse the defined resources.
 """
 # Python imports
 import os
+import urllib
 import traceback
 
 # RESTx imports
@@ -34,9 +35,9 @@ from org.mulesoft.restx.exception       import *
 from org.mulesoft.restx.component.api   import HTTP, HttpMethod, Result
 
 from restx.logger                       import *
-from restx.core.basebrowser             import BaseBrowser
+from restx.core.basebrowser             import BaseBrowser, RENDER_QUERY_FLAGS
 from restx.core.codebrowser             import getComponentInstance
-from restx.resources                    import paramSanityCheck, fillDefaults, listResources, \
+from restx.resources                    import paramSanityCheck, fillDefaults, listResources, listResourcesPage, \
                                                retrieveResourceFromStorage, getResourceUri, deleteResourceFromStorage
 from restx.resources.resource_runner    import _accessComponentService, _getResourceDetails
 
@@ -59,6 +60,10 @@ def get_request_query_dict(request):
             # Parse the query string apart and put values into a dictionary
             runtime_param_dict = dict([elem.split("=") if "=" in elem else (elem, None) \
                                                        for elem in query_string.split("&")])
+            # Flags that control the rendering of the output are not runtime parameters
+            for name in RENDER_QUERY_FLAGS:
+                if name in runtime_param_dict:
+                    del runtime_param_dict[name]
         else:
             runtime_param_dict = dict()
         return runtime_param_dict
@@ -116,9 +121,31 @@ class ResourceBrowser(BaseBrowser):
             #
             if method == HTTP.GET_METHOD:
                 #
-                # List all the resources
+                # List all the resources, or a page of them: The 'offset',
+                # 'limit' and 'prefix' query arguments select the resources.
+                # Pages are returned as an ordered list, with the total
+                # number of resources and the URI of the next page.
                 #
-                return Result.ok(listResources())
+                query = get_request_query_dict(self.request)
+                try:
+                    offset = int(query.get('offset') or 0)
+                    limit  = query.get('limit')
+                    if limit is not None:
+                        limit = int(limit)
+                except ValueError:
+                    raise RestxBadRequestException("The 'offset' and 'limit' arguments must be numbers.")
+                if offset < 0  or  (limit is not None  and  limit < 0):
+                    raise RestxBadRequestException("The 'offset' and 'limit' arguments must not be negative.")
+                prefix = query.get('prefix')
+                if prefix:
+                    prefix = urllib.unquote_plus(prefix)
+                # Resources are created and deleted by other clients, so
+                # clients must not use the listing without asking us again.
+                self.cache_ttl  = settings.RESPONSE_CACHE_TTL
+                self.revalidate = True
+                if 'offset' in query  or  'limit' in query:
+                    return Result.ok(listResourcesPage(offset, limit, prefix))
+                return Result.ok(listResources(prefix))
             else:
                 raise RestxMethodNotAllowedException()
             
@@ -150,7 +177,6 @@ class ResourceBrowser(BaseBrowser):
             resource_home_uri     = rinfo['resource_home_uri']
             public_resource_def   = rinfo['public_resource_def']
             code_uri              = rinfo['code_uri']
-            component             = rinfo['component']
             services              = public_resource_def['services']
             public_resource_def['uri'] = Url(public_resource_def['uri'])
 
@@ -170,10 +196,16 @@ class ResourceBrowser(BaseBrowser):
 
                 service_name      = path_elems[1]
                 positional_params = path_elems[2:]
-                input             = self.request.getRequestBody()
+                # Services that ask for it get a stream for reading the request
+                # body, rather than the entire body as a single string.
+                service_def       = services.get(service_name)
+                if service_def  and  service_def.get('stream_input'):
+                    input         = self.request.getRequestBodyStream()
+                else:
+                    input         = self.request.getRequestBody()
                 try:
                     http_method = __HTTP_METHOD_LOOKUP.get(self.request.getRequestMethod().upper(), HttpMethod.UNKNOWN)
-                    result      = _accessComponentService(component, services, complete_resource_def,
+                    result      = _accessComponentService(rinfo['plan'], complete_resource_def,
                                                           resource_name, service_name, positional_params,
                                                           runtime_param_dict, input, self.request,
                                                           http_method)
@@ -186,6 +218,11 @@ class ResourceBrowser(BaseBrowser):
                     log("Exception in component for service '%s': %s" % (service_name, str(e)), facility=LOGF_COMPONENTS)
                     result = Result.internalServerError("Internal server error. Details have been logged...")
 
+                # Services may declare that their GET results can be cached
+                # for a while by the response cache and by clients.
+                if method == HTTP.GET_METHOD  and  service_def  and  service_def.get('cache'):
+                    self.cache_ttl = service_def['cache'].get('ttl')
+
                 if result.getStatus() != HTTP.NOT_FOUND  and  method == HTTP.GET_METHOD  and  service_name in services:
                     self.breadcrumbs.append((service_name, services[service_name]['uri']))
                     
@@ -195,4 +232,6 @@ class ResourceBrowser(BaseBrowser):
                 # No, nothing else. Someone just wanted to know more about the resource.
                 if method == HTTP.POST_METHOD:
                     raise RestxMethodNotAllowedException()
+                self.cache_ttl  = settings.RESPONSE_CACHE_TTL
+                self.revalidate = True
                 return Result.ok(public_resource_def)
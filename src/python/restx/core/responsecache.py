@@ -0,0 +1,283 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+A cache for rendered responses.
+
+Responses to GET requests are kept in this cache if the browser that
+produced them says that they may be cached (see BaseBrowser.cache_ttl).
+Each cached response is stored together with a strong ETag, which is
+computed from the rendered body. Clients that send a matching If-None-Match
+header receive a '304 Not Modified' response without a body.
+
+Entries expire after their time-to-live, or as soon as a resource definition
+is created, changed or deleted (see getResourceGeneration()). Clients may
+cache the responses as well, for the remaining time-to-live. Responses that
+clients have to revalidate each time are sent with 'Cache-Control: no-cache'.
+
+"""
+# Python imports
+import time
+import hashlib
+
+# RESTx imports
+import restx.settings as settings
+
+from restx.cache     import LruCache
+from restx.resources import getResourceGeneration
+
+from restx.httpabstraction.base_server import isStreamedEntity
+
+from org.mulesoft.restx.component.api import HTTP, Result
+
+
+def getRequestHeader(request, name):
+    """
+    Return the (first) value of a request header, or None.
+
+    Header names are normalized by the HTTP backends: The first letter
+    is upper case, all others are lower case ("If-none-match").
+
+    @param request:  The HTTP request.
+    @type request:   RestxHttpRequest
+
+    @param name:     Name of the header, in normalized form.
+    @type name:      string
+
+    @return:         The value of the header.
+    @rtype:          string
+
+    """
+    headers = request.getRequestHeaders()
+    if not headers:
+        return None
+    values = headers.get(name)
+    if not values:
+        return None
+    if type(values) in [ str, unicode ]:
+        return values
+    return values[0]
+
+
+def makeEtag(entity):
+    """
+    Compute a strong ETag for a response entity.
+
+    @param entity:   The (rendered) entity of a response.
+    @type entity:    string, unicode or byte array
+
+    @return:         The ETag (including the quotes) or None, if no
+                     ETag can be computed for this type of entity.
+    @rtype:          string
+
+    """
+    if type(entity) is unicode:
+        data = entity.encode("utf-8")
+    elif type(entity) is str:
+        data = entity
+    elif hasattr(entity, "tostring"):
+        # Byte array, for example from a static file
+        data = entity.tostring()
+    else:
+        return None
+    return '"%s"' % hashlib.sha1(data).hexdigest()
+
+
+def etagMatches(request, etag):
+    """
+    Check whether the If-None-Match header of a request matches an ETag.
+
+    @param request:  The HTTP request.
+    @type request:   RestxHttpRequest
+
+    @param etag:     The ETag of the current response.
+    @type etag:      string
+
+    @return:         True if the client has the current version already.
+    @rtype:          boolean
+
+    """
+    if_none_match = getRequestHeader(request, "If-none-match")
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            # For GET requests, the weak comparison is fine
+            tag = tag[2:]
+        if tag == "*"  or  tag == etag:
+            return True
+    return False
+
+
+def notModified(etag, cache_control=None):
+    """
+    Return a '304 Not Modified' result.
+
+    @param etag:          The ETag of the current response.
+    @type etag:           string
+
+    @param cache_control: Value of the Cache-Control header, if any.
+    @type cache_control:  string
+
+    @return:              The result.
+    @rtype:               Result
+
+    """
+    result = Result(HTTP.NOT_MODIFIED, "")
+    result.addHeader("ETag", etag)
+    if cache_control:
+        result.addHeader("Cache-Control", cache_control)
+    return result
+
+
+def _cacheControl(ttl, revalidate):
+    """
+    Return the value of the Cache-Control header for a cached response.
+
+    Clients may cache the response only for the remaining time-to-live, or
+    have to revalidate it every time.
+
+    """
+    if revalidate:
+        return "no-cache"
+    return "max-age=%d" % max(0, int(ttl))
+
+
+class _CachedResponse(object):
+    """
+    A rendered response, as it is kept in the response cache.
+
+    """
+    def __init__(self, result, ttl, generation, revalidate):
+        self.status     = result.getStatus()
+        self.entity     = result.getEntity()
+        self.headers    = dict()
+        headers         = result.getHeaders()
+        if headers:
+            for name in headers.keySet():
+                self.headers[name] = headers.get(name)
+        self.expires    = time.time() + ttl
+        self.generation = generation
+        self.revalidate = revalidate
+
+    def makeResult(self):
+        """
+        Return a new result structure for this cached response.
+
+        """
+        result = Result(self.status, self.entity)
+        for name, value in self.headers.items():
+            result.addHeader(name, value)
+        result.addHeader("Cache-Control", _cacheControl(self.expires - time.time(), self.revalidate))
+        return result
+
+
+class ResponseCache(object):
+    """
+    The cache for rendered responses.
+
+    """
+    def __init__(self, max_size):
+        """
+        Create a new response cache.
+
+        @param max_size:    Maximum number of responses in the cache.
+        @type  max_size:    int
+
+        """
+        self.__cache = LruCache(max_size, name="response_cache")
+
+    def makeKey(self, request, encoding=None):
+        """
+        Return the cache key for a request.
+
+        The key consists of path, query and Accept header of the request. The
+        rendering mode (HTML or JSON, compact or not) is derived from the
+        Accept header and the query, so it is covered by the key as well.
+        Compressed responses are cached separately for each content coding.
+
+        @param request:  The HTTP request.
+        @type request:   RestxHttpRequest
+
+        @param encoding: The negotiated content coding of the response, if any.
+        @type encoding:  string
+
+        @return:         The key.
+        @rtype:          tuple
+
+        """
+        accept = getRequestHeader(request, "Accept")
+        return (request.getRequestPath(), request.getRequestQuery(), accept, encoding)
+
+    def lookup(self, key, generation):
+        """
+        Return a result structure for a cached response, or None.
+
+        @param key:         The cache key, as returned by makeKey().
+        @type key:          tuple
+
+        @param generation:  The current resource generation.
+        @type generation:   int
+
+        @return:            A new result structure or None.
+        @rtype:             Result
+
+        """
+        now   = time.time()
+        entry = self.__cache.get(key, lambda entry: entry.expires > now  and  entry.generation == generation)
+        if entry:
+            return entry.makeResult()
+        return None
+
+    def store(self, key, result, ttl, generation, revalidate=False):
+        """
+        Add ETag and Cache-Control headers to a result and store it in the cache.
+
+        Only successful responses, which have been completely rendered, are
+        stored. Streamed responses are not cached.
+
+        @param key:         The cache key, as returned by makeKey().
+        @type key:          tuple
+
+        @param result:      The result.
+        @type result:       Result
+
+        @param ttl:         Time-to-live for the cached response, in seconds.
+        @type ttl:          int
+
+        @param generation:  The resource generation at the time the request
+                            processing started.
+        @type generation:   int
+
+        @param revalidate:  Flag indicating whether clients have to revalidate
+                            the response every time they want to use it.
+        @type revalidate:   boolean
+
+        """
+        if result.getStatus() != HTTP.OK  or  isStreamedEntity(result.getEntity()):
+            return
+        etag = makeEtag(result.getEntity())
+        if not etag:
+            return
+        result.addHeader("ETag", etag)
+        self.__cache.put(key, _CachedResponse(result, ttl, generation, revalidate))
+        result.addHeader("Cache-Control", _cacheControl(ttl, revalidate))
+
@@ -22,14 +22,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Serves static files.
 
 """
+import os
 import array
 
 import restx.settings as settings
 
 from restx.core.basebrowser import BaseBrowser
+from restx.fileentity       import FileEntity
 
 from org.mulesoft.restx.component.api import HTTP, Result
-from org.mulesoft.restx.util import RawFileReader
 
 from java.io import File
 from java.io import FileInputStream
@@ -82,20 +83,17 @@ class StaticBrowser(BaseBrowser):
             
         try:
             fname = settings.get_root_dir()+settings.STATIC_LOCATION + path
-            rfr   = RawFileReader()
-            data  = rfr.readFile(fname)
-            res   = Result.ok(data)
-            # Examine the extension of the filename to see if we can set the content
-            # type based on any of them. If we set the content type here then the
-            # request dispatcher will not attempt to call a render method on the
-            # data we return.
-            i = path.rfind(".")
-            if i > -1:
-                # Found an extension in the filename
-                ext = path[i+1:].lower()
-                if ext in [ "jpg", "png", "gif", "jpeg" ]:
-                    res.addHeader("Content-type", "image/%s" % ext)
+            if os.path.isdir(fname):
+                return Result.notFound("Not found")
+            # The file is not read here: The HTTP backend sends it directly,
+            # and the request dispatcher answers range and conditional requests.
+            # The content type is guessed from the extension of the filename.
+            # Since we set the content type here, the request dispatcher will
+            # not attempt to call a render method on the data we return.
+            entity = FileEntity(fname)
+            res    = Result.ok(entity)
+            res.addHeader("Content-type", entity.content_type)
+            res.addHeader("Cache-Control", "max-age=%d" % settings.RESPONSE_CACHE_TTL)
             return res
         except (Exception, JavaException), e:
             return Result.notFound("Not found")
-            
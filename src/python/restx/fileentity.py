@@ -0,0 +1,241 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Response entities that are backed by a file.
+
+Static files and stored data don't need to be read into memory before they
+are sent. A component or browser returns a FileEntity instead, and the HTTP
+backends send the file (or a range of it) directly: The Jython server lets
+Java transfer the data (FileChannel.transferTo()), the others read and send
+it in chunks of RESPONSE_CHUNK_SIZE.
+
+The file is opened when the entity is created. That way, the entity remains
+valid if the file is replaced or deleted before the response is sent.
+
+"""
+# Python imports
+import os
+import time
+
+# RESTx imports
+import restx.settings as settings
+
+
+#
+# Content types by (lower case) file name extension. Files with other
+# extensions are sent as 'application/octet-stream'.
+#
+CONTENT_TYPES = {
+    "html"  : "text/html",
+    "htm"   : "text/html",
+    "css"   : "text/css",
+    "js"    : "application/javascript",
+    "json"  : "application/json",
+    "xml"   : "application/xml",
+    "xsl"   : "application/xml",
+    "txt"   : "text/plain",
+    "csv"   : "text/csv",
+    "rtf"   : "application/rtf",
+    "pdf"   : "application/pdf",
+    "jpg"   : "image/jpeg",
+    "jpeg"  : "image/jpeg",
+    "png"   : "image/png",
+    "gif"   : "image/gif",
+    "bmp"   : "image/bmp",
+    "ico"   : "image/x-icon",
+    "svg"   : "image/svg+xml",
+    "tif"   : "image/tiff",
+    "tiff"  : "image/tiff",
+    "webp"  : "image/webp",
+    "mp3"   : "audio/mpeg",
+    "ogg"   : "audio/ogg",
+    "wav"   : "audio/x-wav",
+    "mp4"   : "video/mp4",
+    "webm"  : "video/webm",
+    "avi"   : "video/x-msvideo",
+    "mov"   : "video/quicktime",
+    "swf"   : "application/x-shockwave-flash",
+    "woff"  : "font/woff",
+    "ttf"   : "font/ttf",
+    "zip"   : "application/zip",
+    "gz"    : "application/gzip",
+    "tgz"   : "application/gzip",
+    "tar"   : "application/x-tar",
+    "jar"   : "application/java-archive",
+    "doc"   : "application/msword",
+    "xls"   : "application/vnd.ms-excel",
+    "ppt"   : "application/vnd.ms-powerpoint",
+    "odt"   : "application/vnd.oasis.opendocument.text",
+}
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+def guessContentType(name):
+    """
+    Return the content type for a file, based on the extension of its name.
+
+    @param name:    The file name.
+    @type name:     string
+
+    @return:        The content type.
+    @rtype:         string
+
+    """
+    i = name.rfind(".")
+    if i > -1  and  "/" not in name[i:]:
+        return CONTENT_TYPES.get(name[i+1:].lower(), DEFAULT_CONTENT_TYPE)
+    return DEFAULT_CONTENT_TYPE
+
+
+def httpDate(timestamp):
+    """
+    Format a time stamp for use in HTTP headers ('Last-Modified').
+
+    @param timestamp:   Seconds since the epoch.
+    @type timestamp:    float
+
+    @return:            The date, for example 'Sun, 06 Nov 1994 08:49:37 GMT'.
+    @rtype:             string
+
+    """
+    return time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(timestamp))
+
+
+def isFileEntity(entity):
+    """
+    Return True if a response entity is backed by a file.
+
+    @param entity:  The entity of a result.
+    @type entity:   object
+
+    @return:        Flag indicating whether this is a FileEntity.
+    @rtype:         boolean
+
+    """
+    return isinstance(entity, FileEntity)
+
+
+class FileEntity(object):
+    """
+    A response entity, which consists of (a range of) a file.
+
+    """
+    def __init__(self, name, content_type=None, offset=0, length=None, mtime=None):
+        """
+        Open the file for the entity.
+
+        Raises an IOError if the file cannot be opened.
+
+        @param name:            Full name of the file.
+        @type name:             string
+
+        @param content_type:    The content type. If not specified, it is
+                                guessed from the file name.
+        @type content_type:     string
+
+        @param offset:          Start of the entity within the file.
+        @type offset:           int
+
+        @param length:          Length of the entity, or None for the
+                                remainder of the file.
+        @type length:           int
+
+        @param mtime:           Modification time of the entity, if it
+                                differs from the one of the file.
+        @type mtime:            float
+
+        """
+        self.file         = open(name, "rb")
+        try:
+            # The file may have been replaced since it was opened
+            st            = os.fstat(self.file.fileno())
+        except (AttributeError, TypeError, OSError):
+            # No fstat() or no numeric file descriptors (Jython)
+            st            = os.stat(name)
+        self.name         = name
+        self.content_type = content_type or guessContentType(name)
+        self.mtime        = mtime or st.st_mtime
+        self.inode        = st.st_ino or 0
+        self.offset       = offset
+        if length is None:
+            length = max(0, st.st_size - offset)
+        self.length       = length
+
+    def __len__(self):
+        return self.length
+
+    def getRange(self, offset, length):
+        """
+        Return an entity for a part of this entity.
+
+        The new entity shares the open file with this one.
+
+        @param offset:  Start of the range, relative to this entity.
+        @type offset:   int
+
+        @param length:  Length of the range.
+        @type length:   int
+
+        @return:        The new entity.
+        @rtype:         FileEntity
+
+        """
+        entity        = object.__new__(FileEntity)
+        entity.__dict__.update(self.__dict__)
+        entity.offset = self.offset + offset
+        entity.length = length
+        return entity
+
+    def chunks(self, chunk_size=None):
+        """
+        Read the entity in chunks.
+
+        The file is closed when all data has been read.
+
+        @param chunk_size:  Max. size of the chunks. RESPONSE_CHUNK_SIZE
+                            if not specified.
+        @type chunk_size:   int
+
+        @return:            Generator for the chunks.
+        @rtype:             generator
+
+        """
+        chunk_size = chunk_size or settings.RESPONSE_CHUNK_SIZE
+        remaining  = self.length
+        try:
+            self.file.seek(self.offset)
+            while remaining > 0:
+                chunk = self.file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break       # The file was truncated in the meantime
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Close the file.
+
+        """
+        self.file.close()
+
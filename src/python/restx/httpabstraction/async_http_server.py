@@ -0,0 +1,872 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+An event loop based HTTP server.
+
+All connections are handled by a single thread, which runs an asyncore
+event loop. It reads and parses the requests and writes the responses.
+Only the processing of a request (the request dispatcher and with it the
+component code) runs on a bounded pool of worker threads. Therefore, idle
+keep-alive connections don't tie up any threads.
+
+Each connection works on one request at a time. Pipelined requests are
+buffered and processed in order, after the previous response was sent.
+
+Worker threads never touch the sockets. They hand the response data to
+the event loop thread, which is woken up through a trigger socket.
+
+"""
+
+# Python imports
+import time
+import socket
+import urllib
+import asyncore
+import httplib
+import StringIO
+import threading
+import traceback
+
+# RESTx imports
+import restx.settings as settings
+
+from restx.logger     import *
+from restx.stats      import register_stats_provider
+from restx.workerpool import WorkerPool
+
+from restx.httpabstraction.base_server import BaseHttpServer, RestxHttpRequest, RequestBodyReader, \
+                                              isStreamedEntity
+from restx.fileentity                  import isFileEntity
+
+from org.mulesoft.restx.component.api import HTTP
+
+
+MAX_HEADER_SIZE = 64*1024       # Max. size of request line and headers of a request
+
+
+class _Trigger(asyncore.dispatcher):
+    """
+    Lets other threads run functions in the event loop thread.
+
+    A connected pair of sockets is used to wake up the event loop, since
+    select() (or poll()) is all the loop is ever waiting for. Sockets work
+    on all platforms (pipes don't work with select() on Windows, for example).
+
+    """
+    def __init__(self, socket_map):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        self.__writer = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__writer.connect(listener.getsockname())
+        reader, addr = listener.accept()
+        listener.close()
+        self.__writer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        asyncore.dispatcher.__init__(self, reader, map=socket_map)
+        self.__lock    = threading.Lock()
+        self.__calls   = list()
+        self.__pending = False      # Is a wakeup byte on its way?
+
+    def call(self, func, *args):
+        """
+        Run a function in the event loop thread, as soon as possible.
+
+        @param func:    The function.
+        @type  func:    function
+
+        @param args:    Positional arguments for the function.
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__calls.append((func, args))
+            if self.__pending:
+                return
+            self.__pending = True
+        finally:
+            self.__lock.release()
+        self.__writer.send("x")
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def handle_connect(self):
+        pass
+
+    def handle_read(self):
+        try:
+            self.recv(8192)
+        except socket.error:
+            pass
+        self.__lock.acquire()
+        try:
+            calls          = self.__calls
+            self.__calls   = list()
+            self.__pending = False
+        finally:
+            self.__lock.release()
+        for func, args in calls:
+            try:
+                func(*args)
+            except Exception:
+                print traceback.format_exc()
+                log("Exception in event loop callback")
+
+
+class AsyncHttpRequest(RestxHttpRequest):
+    """
+    Wrapper class around a concrete HTTP request representation.
+
+    The class contains information about the received request and
+    also provided the means to send a response. Therefore, this
+    class encapsulates and controls the entire HTTP exchange between
+    client and server.
+
+    This class is part of the official http-abstraction-API. It is
+    intended to be used by the rest of the code, shielding it from
+    the specific server implementation.
+
+    The request is fully received (including its body) before it is
+    processed. The send methods are called in a worker thread. They
+    pass the data on to the event loop thread of the connection.
+
+    """
+    __response_code    = None
+    __response_body    = None
+    __response_headers = None
+    __body_reader      = None
+    __request_body     = None
+
+    def __init__(self, channel, method, uri, protocol, headers, body):
+        """
+        Initialize request wrapper with the parsed request.
+
+        @param channel:     The connection on which the request was received.
+        @type channel:      _HttpChannel
+
+        @param method:      The request method, such as "GET".
+        @type method:       string
+
+        @param uri:         The URI of the request (path and query).
+        @type uri:          string
+
+        @param protocol:    The protocol of the request, such as "HTTP/1.1".
+        @type protocol:     string
+
+        @param headers:     The request headers, a list of values for each
+                            (normalized) header name.
+        @type headers:      dict
+
+        @param body:        The body of the request.
+        @type body:         string
+
+        """
+        self.channel            = channel
+        self.method             = method
+        self.uri                = uri
+        self.protocol           = protocol
+        self.headers            = headers
+        self.body               = body
+        self.keep_alive         = self.__wantsKeepAlive()
+        self.headers_sent       = False
+        self.__chunked          = False
+        self.__response_headers = dict()
+        if "?" in uri:
+            self.path, self.query = uri.split("?", 1)
+        else:
+            self.path, self.query = uri, ""
+        self.path = urllib.unquote(self.path)
+
+    def __wantsKeepAlive(self):
+        """
+        Return True if the client wants to use the connection for further requests.
+
+        """
+        connection = ",".join(self.headers.get('Connection', [])).lower()
+        if self.protocol == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+    def setResponseCode(self, code):
+        """
+        Set the response code, such as 200, 404, etc.
+
+        This is the code that is sent in the response from the server
+        to the client.
+
+        The method can be called multiple times with different values
+        before any of the send methods are called.
+
+        @param code:  HTTP response code
+        @type code:   int
+
+        """
+        self.__response_code = code
+
+    def setResponseBody(self, body):
+        """
+        Set the response body.
+
+        This method may be called multiple times with different values.
+
+        @param body:    The data that should be send in the response body. This may
+                        also be an iterator over chunks of data, which are then sent
+                        one after the other.
+        @type body:     string or iterator
+
+        """
+        self.__response_body = body
+
+    def setResponseHeader(self, name, value):
+        """
+        Set a header for this response.
+
+        @param name:    Name of the header.
+        @type name:     string
+
+        @param value:   Value for the header.
+        @type value:    string
+
+        """
+        self.__response_headers[name] = value
+
+    def setResponse(self, code, body):
+        """
+        Set response code and body in one function.
+
+        Same as calling setResponseCode() and setResponseBody()
+        separately.
+
+        @param code:    HTTP response code
+        @type code:     int
+
+        @param body:    The data that should be send in the response body.
+        @type body:     string
+
+        """
+        self.setResponseCode(code)
+        self.setResponseBody(body)
+
+    def getRequestProtocol(self):
+        """
+        Return the protocol of the request.
+
+        @return:    Protocol of the request, such as "HTTP/1.1"
+        @rtype:     string
+
+        """
+        return self.protocol
+
+    def getRequestMethod(self):
+        """
+        Return the method of the request.
+
+        @return:    Method of the request, such as "GET", "POST", etc.
+        @rtype:     string
+
+        """
+        return self.method
+
+    def getRequestURI(self):
+        """
+        Return the full URI of the request.
+
+        @return:    URI of the request, containing server, path
+                    and query portion.
+        @rtype:     string
+
+        """
+        return self.uri
+
+    def getRequestPath(self):
+        """
+        Return only the path component of the URI.
+
+        @return:    The path component of the URI.
+        @rtype:     string
+
+        """
+        return self.path
+
+    def getRequestHeaders(self):
+        """
+        Return a dictionary with the request headers.
+
+        Each header can have multiple entries, so this is a
+        dictionary of lists.
+
+        @return:    Dictionary containing a list of values for each header.
+        @rtype:     dict
+
+        """
+        return self.headers
+
+    def getRequestQuery(self):
+        """
+        Return only the query component of the URI.
+
+        @return:    Query portion of the URI (the part after the first '?').
+        @rtype:     string
+
+        """
+        return self.query
+
+    def getRequestBodyStream(self):
+        """
+        Return a file-like object for reading the body of the request message.
+
+        The body was received by the event loop already, but the stream still
+        gives components the same interface as with the other servers.
+
+        @return:    Stream for the body of the request.
+        @rtype:     RequestBodyReader
+
+        """
+        if not self.__body_reader:
+            self.__body_reader = RequestBodyReader(StringIO.StringIO(self.body), len(self.body))
+        return self.__body_reader
+
+    def getRequestBody(self):
+        """
+        Return the body of the request message.
+
+        @return:    Body of the request.
+        @rtype:     string
+
+        """
+        if self.__request_body is None:
+            self.__request_body = self.getRequestBodyStream().read()
+        return self.__request_body
+
+    def sendResponseHeaders(self):
+        """
+        Send the previously specified response headers and code.
+
+        Entities of known length are sent with a Content-Length header.
+        Streamed entities use chunked transfer encoding for HTTP/1.1
+        clients. Older clients see the end of the body when we close
+        the connection.
+
+        """
+        code    = self.__response_code
+        body    = self.__response_body
+        headers = self.__response_headers
+        lines   = [ "%s %d %s" % (self.protocol == "HTTP/1.1" and "HTTP/1.1" or "HTTP/1.0",
+                                  code, httplib.responses.get(code, "Unknown")) ]
+        headers['Date'] = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+        if isStreamedEntity(body)  and  self.__hasBody(code):
+            if self.protocol == "HTTP/1.1":
+                headers['Transfer-Encoding'] = "chunked"
+                self.__chunked = True
+            else:
+                self.keep_alive = False
+        else:
+            if isStreamedEntity(body):
+                # Length unknown, and no body to be sent anyway (HEAD)
+                body = ""
+            elif isFileEntity(body):
+                headers['Content-Length'] = str(len(body))
+                if not self.__hasBody(code):
+                    body.close()
+                    body = ""
+            else:
+                body = _toBytes(body)
+                if code >= 200  and  code not in [ 204, 304 ]:
+                    headers['Content-Length'] = str(len(body))
+            if not self.__hasBody(code):
+                body = ""
+            self.__response_body = body
+        if self.keep_alive:
+            if self.protocol != "HTTP/1.1":
+                headers['Connection'] = "keep-alive"
+        else:
+            headers['Connection'] = "close"
+        for name, value in headers.items():
+            lines.append("%s: %s" % (name, value))
+        self.channel.pushFromThread("\r\n".join(lines) + "\r\n\r\n")
+        self.headers_sent = True
+
+    def __hasBody(self, code):
+        """
+        Return True if a response with this code to this request has a body.
+
+        """
+        return self.method != HTTP.HEAD_METHOD  and  code >= 200  and  code not in [ 204, 304 ]
+
+    def sendResponseBody(self):
+        """
+        Send the previously specified request body.
+
+        Chunks of streamed entities are handed to the event loop as they
+        are produced. If the client doesn't read fast enough, we wait here
+        until the connection has caught up. Files are read in chunks, as
+        the connection can take them.
+
+        """
+        body = self.__response_body
+        if isFileEntity(body):
+            sent = 0
+            try:
+                try:
+                    for chunk in body.chunks():
+                        if not self.channel.pushFromThread(chunk):
+                            break   # The client went away
+                        sent += len(chunk)
+                except Exception, e:
+                    print traceback.format_exc()
+                    log("Exception while sending file: %s" % str(e))
+            finally:
+                body.close()
+            if sent < len(body):
+                # Less than the announced Content-Length (file truncated?)
+                self.keep_alive = False
+        elif isStreamedEntity(body):
+            try:
+                for chunk in body:
+                    chunk = _toBytes(chunk)
+                    if chunk:
+                        if self.__chunked:
+                            chunk = "%x\r\n%s\r\n" % (len(chunk), chunk)
+                        if not self.channel.pushFromThread(chunk):
+                            break   # The client went away
+                if self.__chunked:
+                    self.channel.pushFromThread("0\r\n\r\n")
+            except Exception, e:
+                # The response code was sent already, so all we can do is to
+                # log the problem and cut the response short.
+                print traceback.format_exc()
+                log("Exception while streaming response: %s" % str(e), facility=LOGF_COMPONENTS)
+                self.keep_alive = False
+        elif body:
+            self.channel.pushFromThread(body)
+
+    def sendResponse(self):
+        """
+        Send the previously specified response headers, code and body.
+
+        This is the same as calling sendResponseHeaders() and sendResponseBody()
+        separately.
+
+        """
+        self.sendResponseHeaders()
+        self.sendResponseBody()
+
+    def close(self):
+        """
+        Finish this exchange.
+
+        The connection stays open for the next request if the client
+        asked for keep-alive.
+
+        """
+        self.channel.finishFromThread(self.keep_alive)
+
+
+def _toBytes(data):
+    """
+    Return the data of an entity as a (byte) string.
+
+    """
+    if data is None:
+        return ""
+    if type(data) is unicode:
+        return data.encode("UTF-8")
+    if hasattr(data, "tostring"):
+        # A Java byte array
+        return data.tostring()
+    return data
+
+
+class _HttpChannel(asyncore.dispatcher):
+    """
+    A client connection.
+
+    All methods, except the ones ending in 'FromThread', are only
+    called in the event loop thread.
+
+    """
+    def __init__(self, server, sock, addr):
+        asyncore.dispatcher.__init__(self, sock, map=server.socket_map)
+        self.server          = server
+        self.addr            = addr
+        self.in_buffer       = ""
+        self.out_buffer      = list()
+        self.busy            = False        # Is a request being processed?
+        self.close_when_done = False
+        self.last_activity   = time.time()
+        self.__out_cond      = threading.Condition()
+        self.__out_bytes     = 0            # Bytes pushed by workers, but not sent yet
+        self.__closed        = False
+
+    # ----- Called in worker threads -----
+
+    def pushFromThread(self, data):
+        """
+        Queue data for sending, waiting while too much data is queued already.
+
+        @param data:    The data to send.
+        @type data:     string
+
+        @return:        False if the connection was closed.
+        @rtype:         boolean
+
+        """
+        self.__out_cond.acquire()
+        try:
+            while self.__out_bytes > settings.ASYNC_SERVER_OUTPUT_BUFFER  and  not self.__closed:
+                self.__out_cond.wait(1.0)
+            if self.__closed:
+                return False
+            self.__out_bytes += len(data)
+        finally:
+            self.__out_cond.release()
+        self.server.trigger.call(self.push, data)
+        return True
+
+    def finishFromThread(self, keep_alive):
+        """
+        Signal that the response to the current request is complete.
+
+        @param keep_alive:  Flag indicating whether the connection may be
+                            used for further requests.
+        @type keep_alive:   boolean
+
+        """
+        self.server.trigger.call(self.requestDone, keep_alive)
+
+    # ----- Called in the event loop thread -----
+
+    def push(self, data):
+        if not self.__closed:
+            self.out_buffer.append(data)
+            self.handle_write()
+
+    def requestDone(self, keep_alive):
+        self.busy          = False
+        self.last_activity = time.time()
+        if not keep_alive:
+            self.close_when_done = True
+            if not self.out_buffer:
+                self.close()
+        elif self.in_buffer:
+            # Pipelined requests, which have been received already
+            self.processInput()
+
+    def readable(self):
+        # No reading while a request is processed, this is what keeps
+        # pipelined requests in order (and slow workers from being flooded).
+        return not self.busy  and  not self.close_when_done
+
+    def writable(self):
+        return bool(self.out_buffer)
+
+    def handle_read(self):
+        try:
+            data = self.recv(65536)
+        except socket.error:
+            self.close()
+            return
+        if not data:
+            self.close()
+            return
+        self.last_activity = time.time()
+        self.in_buffer    += data
+        self.processInput()
+
+    def handle_write(self):
+        while self.out_buffer:
+            data = self.out_buffer[0]
+            try:
+                sent = self.send(data)
+            except socket.error:
+                self.close()
+                return
+            if not sent:
+                break
+            if sent < len(data):
+                self.out_buffer[0] = data[sent:]
+            else:
+                self.out_buffer.pop(0)
+            self.__sent(sent)
+            if sent < len(data):
+                break
+        self.last_activity = time.time()
+        if not self.out_buffer  and  self.close_when_done  and  not self.busy:
+            self.close()
+
+    def __sent(self, num_bytes):
+        self.__out_cond.acquire()
+        try:
+            self.__out_bytes -= num_bytes
+            self.__out_cond.notifyAll()
+        finally:
+            self.__out_cond.release()
+
+    def handle_close(self):
+        self.close()
+
+    def handle_error(self):
+        print traceback.format_exc()
+        log("Exception on connection from %s" % str(self.addr))
+        self.close()
+
+    def close(self):
+        if self.__closed:
+            return
+        self.__out_cond.acquire()
+        try:
+            self.__closed = True
+            self.__out_cond.notifyAll()
+        finally:
+            self.__out_cond.release()
+        self.out_buffer = list()
+        asyncore.dispatcher.close(self)
+
+    def isIdle(self, now):
+        return not self.busy  and  not self.out_buffer  and \
+               now - self.last_activity > settings.SERVER_KEEPALIVE_TIMEOUT
+
+    def processInput(self):
+        """
+        Parse the next complete request in the input buffer and hand it
+        to a worker.
+
+        """
+        if self.busy  or  self.close_when_done:
+            return
+        # Tolerate empty lines between requests (RFC 2616, 4.1)
+        self.in_buffer = self.in_buffer.lstrip("\r\n")
+        header_end     = self.in_buffer.find("\r\n\r\n")
+        if header_end < 0:
+            if len(self.in_buffer) > MAX_HEADER_SIZE:
+                self.__error(413)
+            return
+        lines = self.in_buffer[:header_end].split("\r\n")
+        try:
+            method, uri, protocol = lines[0].split()
+        except ValueError:
+            self.__error(400)
+            return
+        headers = dict()
+        name    = None
+        for line in lines[1:]:
+            if line[:1] in [ " ", "\t" ]  and  name:
+                # Continuation of the previous header line
+                headers[name][-1] += " " + line.strip()
+                continue
+            if ":" not in line:
+                self.__error(400)
+                return
+            name, value = line.split(":", 1)
+            name        = name.strip().capitalize()
+            value       = value.strip()
+            if name == 'Content-type':
+                # Same as the other servers: Type and parameters are separate entries
+                headers[name] = value.split(";")
+            else:
+                headers.setdefault(name, list()).append(value)
+
+        if 'chunked' in ",".join(headers.get('Transfer-encoding', [])).lower():
+            # We only accept request bodies of known length
+            self.__error(411)
+            return
+        try:
+            content_length = int(headers.get('Content-length', [ "0" ])[0])
+        except ValueError:
+            self.__error(400)
+            return
+        if settings.MAX_REQUEST_BODY_SIZE  and  content_length > settings.MAX_REQUEST_BODY_SIZE:
+            self.__error(413)
+            return
+        body_start = header_end + 4
+        if len(self.in_buffer) < body_start + content_length:
+            return      # Wait for the rest of the body
+        body           = self.in_buffer[body_start:body_start + content_length]
+        self.in_buffer = self.in_buffer[body_start + content_length:]
+
+        self.busy = True
+        req       = AsyncHttpRequest(self, method, uri, protocol, headers, body)
+        self.server.workers.submit(self.server.handleRequest, req)
+
+    def __error(self, code):
+        """
+        Respond to a malformed request and close the connection.
+
+        """
+        body = httplib.responses[code]
+        self.push("HTTP/1.0 %d %s\r\nContent-Type: text/plain\r\nContent-Length: %d\r\n" \
+                  "Connection: close\r\n\r\n%s" % (code, body, len(body), body))
+        self.in_buffer       = ""
+        self.close_when_done = True
+        if not self.out_buffer:
+            self.close()
+
+
+class _HttpListener(asyncore.dispatcher):
+    """
+    Accepts new connections.
+
+    """
+    def __init__(self, server, port):
+        asyncore.dispatcher.__init__(self, map=server.socket_map)
+        self.server = server
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind(("0.0.0.0", port))
+        self.listen(settings.SERVER_BACKLOG)
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def handle_accept(self):
+        try:
+            pair = self.accept()
+        except socket.error:
+            return
+        if pair is None:
+            return
+        sock, addr = pair
+        if len(self.server.socket_map) - 2 >= settings.ASYNC_SERVER_MAX_CONNECTIONS:
+            # Over the limit: The client has to try again later
+            sock.close()
+            self.server.rejected += 1
+            return
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _HttpChannel(self.server, sock, addr)
+        self.server.accepted += 1
+
+    def handle_error(self):
+        print traceback.format_exc()
+        log("Exception while accepting a connection")
+
+
+class AsyncHttpServer(BaseHttpServer):
+    """
+    Wrapper class around a concrete HTTP server implementation.
+
+    """
+    def __init__(self, port, request_handler):
+        """
+        Initialize and start an HTTP server.
+
+        The calling thread runs the event loop, the requests are processed
+        by up to SERVER_THREADS worker threads.
+
+        @param port:            The port on which the server should listen.
+        @type port:             int
+
+        @param request_handler: The request handler class from our generic code.
+        @type request_handler:  Any class with a 'handle()' method that can take a
+                                RestxHttpRequest. In our case, this is normally the
+                                RequestDispatcher class.
+
+        """
+        self.request_handler = request_handler
+        self.socket_map      = dict()
+        self.accepted        = 0
+        self.rejected        = 0
+        self.workers         = WorkerPool(settings.SERVER_THREADS, name="async_workers")
+        self.trigger         = _Trigger(self.socket_map)
+        self.listener        = _HttpListener(self, port)
+        register_stats_provider("http_server", self.getStats)
+        log("Listening for HTTP requests on port %d..." % port)
+        self.run()
+
+    def run(self):
+        """
+        Run the event loop.
+
+        Once per second, connections that have been idle for longer than
+        SERVER_KEEPALIVE_TIMEOUT are closed.
+
+        """
+        last_check = time.time()
+        while self.socket_map:
+            asyncore.loop(timeout=1.0, map=self.socket_map, count=1)
+            now = time.time()
+            if now - last_check >= 1.0:
+                last_check = now
+                for channel in self.socket_map.values():
+                    if isinstance(channel, _HttpChannel)  and  channel.isIdle(now):
+                        channel.close()
+
+    def getStats(self):
+        """
+        Return the usage statistics of this server.
+
+        @return:    Dictionary with connection counters.
+        @rtype:     dict
+
+        """
+        return dict(open_connections     = len(self.socket_map) - 2,
+                    accepted_connections = self.accepted,
+                    rejected_connections = self.rejected)
+
+    def handleRequest(self, req):
+        """
+        Process a request. This runs in a worker thread.
+
+        @param req:     The request.
+        @type req:      AsyncHttpRequest
+
+        """
+        start_time = datetime.datetime.now()
+        msg = "%s : %s : %s" % (req.getRequestProtocol(),
+                                req.getRequestMethod(),
+                                req.getRequestURI())
+        try:
+            try:
+                result  = self.request_handler.handle(req)
+                headers = result.getHeaders()
+                if headers:
+                    for name in headers.keySet():
+                        req.setResponseHeader(name, headers[name])
+                req.setResponse(result.getStatus(), result.getEntity())
+                req.sendResponse()
+            except Exception, e:
+                print traceback.format_exc()
+                log("Exception while handling request: %s" % str(e))
+                if req.headers_sent:
+                    req.keep_alive = False
+                else:
+                    req.setResponse(500, "Internal Server Error")
+                    req.setResponseHeader("Content-Type", "text/plain")
+                    req.sendResponse()
+                result = None
+        finally:
+            req.close()
+        end_time   = datetime.datetime.now()
+        td         = end_time-start_time
+        request_ms = td.seconds*1000 + td.microseconds//1000
+        if result is None:
+            status, l = 500, -1
+        elif isStreamedEntity(result.getEntity()):
+            status, l = result.getStatus(), -1
+        else:
+            status, l = result.getStatus(), len(result.getEntity() or "")
+        log("%s : %sms : %s : %s" % (msg, request_ms, status, l),
+            start_time = start_time, facility=LOGF_ACCESS_LOG)
@@ -37,6 +37,145 @@ concrete HttpServer implementation later on.
 #
 from org.mulesoft.restx import RestxHttpRequest
 
+import restx.settings as settings
+
+from org.mulesoft.restx.exception import RestxRequestEntityTooLargeException
+
+
+def isStreamedEntity(entity):
+    """
+    Return True if a response entity should be streamed.
+
+    Components may return an iterator (for example a generator) instead of
+    a fully materialized result. Such entities are rendered and sent to the
+    client piece by piece, using chunked transfer encoding where possible.
+
+    @param entity:  The entity of a result.
+    @type entity:   object
+
+    @return:        Flag indicating whether this is an entity to be streamed.
+    @rtype:         boolean
+
+    """
+    return hasattr(entity, "next")  and  hasattr(entity, "__iter__")  and \
+           type(entity) is not str  and  type(entity) is not unicode
+
+
+class RequestBodyReader(object):
+    """
+    File-like access to the body of a request.
+
+    Wraps the raw input stream of the server. The Content-Length of the request
+    is honoured (we never read past the end of the body), data is read in chunks
+    and the maximum request body size (MAX_REQUEST_BODY_SIZE) is enforced. If
+    the body exceeds that size, a RestxRequestEntityTooLargeException is raised.
+
+    The stream can be handed to components (services that specify 'stream_input'),
+    which can then process large request bodies without reading them into memory
+    all at once.
+
+    """
+    def __init__(self, stream, content_length=None, max_size=None):
+        """
+        Initialize the reader.
+
+        @param stream:          The raw input stream. Only read(size) is required.
+        @type stream:           file-like object
+
+        @param content_length:  The length of the body, if known. If None then
+                                we read until the end of the stream.
+        @type content_length:   int
+
+        @param max_size:        Maximum allowed size of the body. If not specified
+                                then MAX_REQUEST_BODY_SIZE is used. 0 means: no limit.
+        @type max_size:         int
+
+        """
+        if max_size is None:
+            max_size = settings.MAX_REQUEST_BODY_SIZE
+        if max_size  and  content_length is not None  and  content_length > max_size:
+            raise RestxRequestEntityTooLargeException("Request body exceeds %d bytes" % max_size)
+        self.__stream    = stream
+        self.__remaining = content_length
+        self.__max_size  = max_size
+        self.__total     = 0
+        self.__pending   = ""   # Data that was read ahead by isEmpty()
+
+    def __read_chunk(self, size):
+        """
+        Read at most 'size' bytes from the stream, watching the length limits.
+
+        """
+        if self.__remaining is not None:
+            if self.__remaining <= 0:
+                return ""
+            size = min(size, self.__remaining)
+        data = self.__stream.read(size)
+        if not data:
+            # Premature end of the stream (or simply the end, if we
+            # didn't know the content length).
+            self.__remaining = 0
+            return ""
+        if self.__remaining is not None:
+            self.__remaining -= len(data)
+        self.__total += len(data)
+        if self.__max_size  and  self.__total > self.__max_size:
+            raise RestxRequestEntityTooLargeException("Request body exceeds %d bytes" % self.__max_size)
+        return data
+
+    def read(self, size=-1):
+        """
+        Read from the body.
+
+        @param size:    Maximum number of bytes to read. If negative (the default)
+                        then the remainder of the body is read.
+        @type size:     int
+
+        @return:        The data, or an empty string at the end of the body.
+        @rtype:         string
+
+        """
+        if size is None  or  size < 0:
+            chunks = [ self.__pending ]
+            self.__pending = ""
+            while True:
+                chunk = self.__read_chunk(settings.REQUEST_BODY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return "".join(chunks)
+        if self.__pending:
+            data           = self.__pending[:size]
+            self.__pending = self.__pending[size:]
+            return data
+        return self.__read_chunk(size)
+
+    def isEmpty(self):
+        """
+        Return True if there is no (more) data in the body.
+
+        May need to read ahead, but the data remains available for read().
+
+        @return:        Flag indicating whether the remaining body is empty.
+        @rtype:         boolean
+
+        """
+        if not self.__pending:
+            self.__pending = self.__read_chunk(settings.REQUEST_BODY_CHUNK_SIZE)
+        return not self.__pending
+
+    def __iter__(self):
+        """
+        Iterate over the body in chunks of REQUEST_BODY_CHUNK_SIZE.
+
+        """
+        while True:
+            chunk = self.read(settings.REQUEST_BODY_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
 
 class BaseHttpServer(object):
     """
@@ -41,7 +41,7 @@ from restx.httpabstraction.python_http_server import PythonHttpRequest
 
 from restx.logger import *
 
-from restx.httpabstraction.base_server import BaseHttpServer
+from restx.httpabstraction.base_server import BaseHttpServer, isStreamedEntity
 
 #
 # Note: We are not defining out own Request class here, since we
@@ -65,16 +65,22 @@ class _HttpHandler(object):
                                     req.getRequestMethod(),
                                     req.getRequestURI())
             #log(msg, facility=LOGF_ACCESS_LOG)
-            code, response_body, headers = self.request_handler.handle(req)
-            for name, value in headers.items():
-                req.setResponseHeader(name, value)
-            req.setResponse(code, response_body)
+            result  = self.request_handler.handle(req)
+            headers = result.getHeaders()
+            if headers:
+                for name in headers.keySet():
+                    req.setResponseHeader(name, headers[name])
+            req.setResponse(result.getStatus(), result.getEntity())
             req.sendResponse()
             req.close()
             end_time   = datetime.datetime.now()
             td         = end_time-start_time
             request_ms = td.seconds*1000 + td.microseconds//1000
-            log("%s : %sms : %s : %s" % (msg, request_ms, code, len(response_body)),
+            if isStreamedEntity(result.getEntity()):
+                l = -1
+            else:
+                l = len(result.getEntity() or "")
+            log("%s : %sms : %s : %s" % (msg, request_ms, result.getStatus(), l),
                 start_time = start_time, facility=LOGF_ACCESS_LOG)
         except Exception, e:
             sys.stderr.write(traceback.format_exc())
@@ -31,21 +31,177 @@ concrete HttpServer implementation later on.
 from com.sun.net.httpserver import HttpServer, HttpHandler
 from java.net               import InetSocketAddress
 from java.lang              import String
-from java.io                import InputStreamReader;
-from java.io                import BufferedReader
-from java.io                import OutputStream
+from java.io                import OutputStream, FileInputStream
+from java.nio.channels      import Channels
 from java.lang              import Exception as JavaException
-from java.util.concurrent   import Executors;
+from java.lang              import Thread, Integer, Runnable
+from java.util.concurrent   import ThreadPoolExecutor, TimeUnit, ThreadFactory, \
+                                   RejectedExecutionHandler, SynchronousQueue, LinkedBlockingQueue, \
+                                   ArrayBlockingQueue
+from java.util.concurrent.atomic import AtomicLong
+from jarray                 import zeros
 
 # Python imports
+import threading
 import traceback
 
 # RESTx imports
 import restx.settings as settings
 
 from restx.logger import *
+from restx.stats  import register_stats_provider
+
+from restx.httpabstraction.base_server import BaseHttpServer, RestxHttpRequest, RequestBodyReader, \
+                                              isStreamedEntity
+from restx.fileentity                  import isFileEntity
+
+from org.mulesoft.restx.component.api import HTTP
+
+
+class _JavaInputStreamAdapter(object):
+    """
+    Provides a Python-style read() for a Java InputStream.
+
+    Returns the bytes as they are (no character decoding), so binary
+    request bodies are passed through unchanged.
+
+    """
+    def __init__(self, input_stream):
+        self.input_stream = input_stream
+
+    def read(self, size):
+        buf = zeros(size, 'b')
+        num = self.input_stream.read(buf, 0, size)
+        if num <= 0:
+            return ""
+        return buf[:num].tostring()
+
+
+class _NamedThreadFactory(ThreadFactory):
+    """
+    Creates daemon threads with a common name prefix.
+
+    """
+    def __init__(self, prefix):
+        self.prefix  = prefix
+        self.counter = 0
+
+    def newThread(self, runnable):
+        self.counter += 1
+        thread = Thread(runnable, "%s-%d" % (self.prefix, self.counter))
+        thread.setDaemon(True)
+        return thread
+
+
+#
+# Set for the duration of a request that is only answered with '503 Service
+# Unavailable', because the server is overloaded (see _OverflowPolicy).
+#
+_REJECTING = threading.local()
+
+
+class _RejectingTask(Runnable):
+    """
+    Runs the server's task for a connection, with the request marked for rejection.
+
+    """
+    def __init__(self, runnable):
+        self.runnable = runnable
+
+    def run(self):
+        _REJECTING.active = True
+        try:
+            self.runnable.run()
+        finally:
+            _REJECTING.active = False
+
+
+def _isRejecting():
+    """
+    Return True if the current thread should reject the request it handles.
+
+    """
+    return getattr(_REJECTING, "active", False)
+
+
+def _closeConnection(runnable):
+    """
+    Close the connection of a task, which the server can't even reject.
+
+    The executor only sees the HTTP server's internal task for a connection,
+    not the request: That has not been read yet. The task keeps the socket
+    channel of the connection in its 'chan' field.
+
+    """
+    try:
+        field = runnable.getClass().getDeclaredField("chan")
+        field.setAccessible(True)
+        field.get(runnable).close()
+    except (Exception, JavaException), e:
+        log("Cannot close connection of a dropped request: %s" % str(e))
+
+
+class _OverflowPolicy(RejectedExecutionHandler):
+    """
+    Passes requests, which the server's executor rejects, on to a small
+    pool of overflow threads, which answer them with '503 Service
+    Unavailable'.
+
+    The overflow threads have a bounded queue as well. Should that fill
+    up, too, the connections of further requests are closed right away.
+
+    """
+    OVERFLOW_THREADS    = 2
+    OVERFLOW_QUEUE_SIZE = 100
+
+    def __init__(self):
+        self.rejected = AtomicLong()      # Requests answered with 503
+        self.dropped  = AtomicLong()      # Connections closed without a response
+        self.executor = ThreadPoolExecutor(self.OVERFLOW_THREADS, self.OVERFLOW_THREADS, 0, TimeUnit.SECONDS,
+                                           ArrayBlockingQueue(self.OVERFLOW_QUEUE_SIZE),
+                                           _NamedThreadFactory("restx-overflow"), self)
+
+    def rejectedExecution(self, runnable, executor):
+        if isinstance(runnable, _RejectingTask):
+            # Rejected by the overflow threads themselves
+            self.dropped.incrementAndGet()
+            _closeConnection(runnable.runnable)
+        else:
+            self.rejected.incrementAndGet()
+            self.executor.execute(_RejectingTask(runnable))
+
+
+def _makeExecutor(executor_type, num_threads, queue_size):
+    """
+    Create the executor for the server's request processing.
+
+    @param executor_type:   "cached" (unbounded number of threads), "fixed"
+                            (fixed number of threads, unbounded queue) or
+                            "bounded" (fixed number of threads and a bounded
+                            queue, overflowing requests are rejected with 503).
+    @type executor_type:    string
+
+    @param num_threads:     Number of threads (not for "cached").
+    @type num_threads:      int
+
+    @param queue_size:      Max. number of waiting requests (only for "bounded").
+    @type queue_size:       int
+
+    @return:                The executor.
+    @rtype:                 ThreadPoolExecutor
+
+    """
+    factory = _NamedThreadFactory("restx-worker")
+    if executor_type == "cached":
+        return ThreadPoolExecutor(0, Integer.MAX_VALUE, 60, TimeUnit.SECONDS, SynchronousQueue(), factory)
+    elif executor_type == "fixed":
+        return ThreadPoolExecutor(num_threads, num_threads, 0, TimeUnit.SECONDS, LinkedBlockingQueue(), factory)
+    elif executor_type == "bounded":
+        return ThreadPoolExecutor(num_threads, num_threads, 0, TimeUnit.SECONDS, ArrayBlockingQueue(queue_size),
+                                  factory, _OverflowPolicy())
+    else:
+        raise Exception("Unknown executor type '%s'" % executor_type)
 
-from restx.httpabstraction.base_server import BaseHttpServer, RestxHttpRequest
 
 class JythonJavaHttpRequest(RestxHttpRequest):
     """
@@ -66,6 +222,8 @@ class JythonJavaHttpRequest(RestxHttpRequest):
     __request_uri_str  = None
     __request_headers  = None
     __response_headers = None
+    __body_reader      = None
+    __request_body     = None
 
     _native_mode = False
 
@@ -112,8 +270,10 @@ class JythonJavaHttpRequest(RestxHttpRequest):
         
         This method may be called multiple times with different values.
         
-        @param body:    The data that should be send in the response body.
-        @type body:     string
+        @param body:    The data that should be send in the response body. This may
+                        also be an iterator over chunks of data, which are then sent
+                        with chunked transfer encoding.
+        @type body:     string or iterator
         
         """
         self.__response_body = body if body else ""
@@ -244,28 +404,47 @@ class JythonJavaHttpRequest(RestxHttpRequest):
         else:
             return None
     
+    def getRequestBodyStream(self):
+        """
+        Return a file-like object for reading the body of the request message.
+
+        This is suitable for large message bodies, which should not be read
+        into memory all at once. The body can be read only once, either through
+        this stream or with getRequestBody().
+        
+        @return:    Stream for the body of the request.
+        @rtype:     RequestBodyReader
+        
+        """
+        if self.__native_req:
+            if not self.__body_reader:
+                content_length = self.__native_req.getRequestHeaders().getFirst("Content-length")
+                if content_length is not None:
+                    try:
+                        content_length = int(content_length)
+                    except ValueError:
+                        content_length = None
+                self.__body_reader = RequestBodyReader(_JavaInputStreamAdapter(self.__native_req.getRequestBody()),
+                                                       content_length)
+            return self.__body_reader
+        else:
+            return None
+
     def getRequestBody(self):
         """
         Return the body of the request message.
         
-        Note that this is not very suitable for streaming or large message bodies
-        at this point, since the entire message is read into a single string
-        before it is returned to the client.
+        The entire message is read into a single string. For large message
+        bodies, use getRequestBodyStream() instead.
         
         @return:    Body of the request.
         @rtype:     string
         
         """
         if self.__native_req:
-            buffered_reader = BufferedReader(InputStreamReader(self.__native_req.getRequestBody()));
-            lines = []
-            while True:
-                line = buffered_reader.readLine()
-                if not line:
-                    break
-                lines.append(line)
-            
-            return '\n'.join(lines)
+            if self.__request_body is None:
+                self.__request_body = self.getRequestBodyStream().read()
+            return self.__request_body
         else:
             return None
     
@@ -278,7 +457,18 @@ class JythonJavaHttpRequest(RestxHttpRequest):
             response_headers = self.__native_req.getResponseHeaders()
             for name, value in self.__response_headers.items():
                 response_headers[name] = [ value ]
-            self.__native_req.sendResponseHeaders(self.__response_code, len(self.__response_body))
+            if isStreamedEntity(self.__response_body):
+                # Length not known in advance: A length of 0 tells the
+                # server to use chunked transfer encoding.
+                self.__native_req.sendResponseHeaders(self.__response_code, 0)
+            elif isFileEntity(self.__response_body)  and  len(self.__response_body):
+                self.__native_req.sendResponseHeaders(self.__response_code, len(self.__response_body))
+            elif not self.__response_body:
+                # A length of -1 means that no body is sent at all, as
+                # required for '304 Not Modified' responses.
+                self.__native_req.sendResponseHeaders(self.__response_code, -1)
+            else:
+                self.__native_req.sendResponseHeaders(self.__response_code, len(self.__response_body))
     
     def sendResponseBody(self):
         """
@@ -287,9 +477,59 @@ class JythonJavaHttpRequest(RestxHttpRequest):
         """
         if self.__native_req:
             os = self.__native_req.getResponseBody()
-            os.write(self.__response_body, 0, len(self.__response_body))
+            if isStreamedEntity(self.__response_body):
+                try:
+                    for chunk in self.__response_body:
+                        if chunk:
+                            os.write(chunk, 0, len(chunk))
+                except Exception, e:
+                    # The response code was sent already, so all we can do is to
+                    # log the problem and cut the response short.
+                    print traceback.format_exc()
+                    log("Exception while streaming response: %s" % str(e), facility=LOGF_COMPONENTS)
+            elif isFileEntity(self.__response_body):
+                self.__sendFile(self.__response_body, os)
+            else:
+                os.write(self.__response_body, 0, len(self.__response_body))
             os.flush()
             os.close()
+
+    def __sendFile(self, entity, out):
+        """
+        Copy a file entity to the response stream.
+
+        The data is transferred by Java (FileChannel.transferTo()), it is
+        never copied into Python strings.
+
+        @param entity:  The file entity.
+        @type entity:   FileEntity
+
+        @param out:     The response stream.
+        @type out:      java.io.OutputStream
+
+        """
+        try:
+            # Jython's file objects are based on a Java FileChannel, which
+            # still refers to the file as it was when the entity was created.
+            channel = entity.file.fileno().getChannel()
+            stream  = None
+        except AttributeError:
+            stream  = FileInputStream(entity.name)
+            channel = stream.getChannel()
+        try:
+            target    = Channels.newChannel(out)
+            position  = entity.offset
+            remaining = entity.length
+            while remaining > 0:
+                sent = channel.transferTo(position, remaining, target)
+                if sent <= 0:
+                    break       # The file was truncated in the meantime
+                position  += sent
+                remaining -= sent
+        finally:
+            if stream:
+                stream.close()
+            entity.close()
         
     def sendResponse(self):
         """
@@ -354,6 +594,9 @@ class __HttpHandler(HttpHandler):
         @type native_request:     com.sun.net.httpserver.HttpExchange
         
         """
+        if _isRejecting():
+            self.__reject(native_request)
+            return
         try:
             start_time = datetime.datetime.now()
             req = JythonJavaHttpRequest()
@@ -377,7 +620,10 @@ class __HttpHandler(HttpHandler):
             # data, which can't be converted to a string. In that case,
             # we should find other means to determine the size of the data.
             try:
-                l = len(str(result.getEntity()))
+                if isStreamedEntity(result.getEntity()):
+                    l = -1
+                else:
+                    l = len(str(result.getEntity()))
             except:
                 l = -1
             log("%s : %sms : %s : %s" % (msg, request_ms, result.getStatus(), l),
@@ -388,6 +634,22 @@ class __HttpHandler(HttpHandler):
         except JavaException, e:
             print "JAVA exception: ", e.printStackTrace()
 
+    def __reject(self, native_request):
+        """
+        Tell the client that the server is too busy to process its request.
+
+        """
+        try:
+            body = String("Server busy, please retry later").getBytes()
+            native_request.getResponseHeaders().set("Retry-After", str(settings.SERVER_RETRY_AFTER))
+            native_request.sendResponseHeaders(HTTP.SERVICE_UNAVAILABLE, len(body))
+            os = native_request.getResponseBody()
+            os.write(body, 0, len(body))
+            os.close()
+        except (Exception, JavaException), e:
+            log("Cannot send overload response: %s" % str(e))
+        native_request.close()
+
 
 class JythonJavaHttpServer(BaseHttpServer):
     """
@@ -414,8 +676,36 @@ class JythonJavaHttpServer(BaseHttpServer):
         
         """
         self.request_handler = request_handler
-        self.__native_server = HttpServer.create(InetSocketAddress(port), 5)
+        self.__native_server = HttpServer.create(InetSocketAddress(port), settings.SERVER_BACKLOG)
         self.__native_server.createContext(settings.DOCUMENT_ROOT if settings.DOCUMENT_ROOT != "" else "/", __HttpHandler(request_handler))
-        self.__native_server.setExecutor(Executors.newCachedThreadPool())
+        self.__executor      = _makeExecutor(settings.SERVER_EXECUTOR, settings.SERVER_THREADS,
+                                             settings.SERVER_QUEUE_SIZE)
+        self.__native_server.setExecutor(self.__executor)
+        register_stats_provider("http_server", self.getStats)
         self.__native_server.start()
-        log("Listening for HTTP requests on port %d..." % port)
+        log("Listening for HTTP requests on port %d (%s executor)..." % (port, settings.SERVER_EXECUTOR))
+
+    def getStats(self):
+        """
+        Return the load statistics of the server's executor.
+
+        @return:    Dictionary with thread and queue counters.
+        @rtype:     dict
+
+        """
+        executor = self.__executor
+        handler  = executor.getRejectedExecutionHandler()
+        if isinstance(handler, _OverflowPolicy):
+            rejected = handler.rejected.get()
+            dropped  = handler.dropped.get()
+        else:
+            rejected = 0
+            dropped  = 0
+        return dict(executor        = settings.SERVER_EXECUTOR,
+                    threads         = executor.getPoolSize(),
+                    active_threads  = executor.getActiveCount(),
+                    largest_threads = executor.getLargestPoolSize(),
+                    queued          = executor.getQueue().size(),
+                    completed       = executor.getCompletedTaskCount(),
+                    rejected        = rejected,
+                    dropped         = dropped)
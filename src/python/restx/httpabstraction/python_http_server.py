@@ -28,9 +28,14 @@ concrete HttpServer implementation later on.
 """
 
 # Python imports
+import os
 import sys
+import time
+import errno
+import signal
 import httplib
 import StringIO
+import threading
 import traceback
 
 # RESTx imports
@@ -38,7 +43,10 @@ import restx.settings as settings
 
 from restx.logger import *
 
-from restx.httpabstraction.base_server import BaseHttpServer, RestxHttpRequest
+from restx.httpabstraction.base_server import BaseHttpServer, RestxHttpRequest, RequestBodyReader, \
+                                              isStreamedEntity
+from restx.storageabstraction.file_storage import flushWriteBehind
+from restx.fileentity                      import isFileEntity
 
 from org.mulesoft.restx.component.api import HTTP
 
@@ -62,15 +70,19 @@ class PythonHttpRequest(RestxHttpRequest):
     """
     __response_code    = None
     __request_headers  = None
-    __response_headers = dict()
+    __response_headers = None
+    __body_reader      = None
+    __request_body     = None
+    response_iterable  = None     # The body, as returned by the WSGI application
     
     def __init__(self, environ, start_response):
         """
         Initialize request wrapper with the native request class.
         
         """
-        self.environ        = environ
-        self.start_response = start_response
+        self.environ            = environ
+        self.start_response     = start_response
+        self.__response_headers = dict()
     
     def setResponseCode(self, code):
         """
@@ -94,8 +106,10 @@ class PythonHttpRequest(RestxHttpRequest):
         
         This method may be called multiple times with different values.
         
-        @param body:    The data that should be send in the response body.
-        @type body:     string
+        @param body:    The data that should be send in the response body. This may
+                        also be an iterator over chunks of data, which are then sent
+                        one after the other.
+        @type body:     string or iterator
         
         """
         self.__response_body = body
@@ -187,8 +201,14 @@ class PythonHttpRequest(RestxHttpRequest):
         """
         if not self.__request_headers:
             self.__request_headers = dict()
+            for key, value in self.environ.items():
+                if key.startswith("HTTP_"):
+                    # Same normalization as the Java server: "If-none-match"
+                    name = key[5:].replace("_", "-").capitalize()
+                    self.__request_headers[name] = [ value ]
             if 'HTTP_ACCEPT' in self.environ:
-                self.__request_headers['Accept'] = self.environ['HTTP_ACCEPT'].split(";")
+                # Kept as a single value, media type parameters are parsed by the browsers
+                self.__request_headers['Accept'] = [ self.environ['HTTP_ACCEPT'] ]
             if 'CONTENT_TYPE' in self.environ:
                 self.__request_headers['Content-type'] = self.environ['CONTENT_TYPE'].split(";")
         return self.__request_headers
@@ -204,48 +224,126 @@ class PythonHttpRequest(RestxHttpRequest):
         query = self.environ['QUERY_STRING']
         return query
     
+    def getRequestBodyStream(self):
+        """
+        Return a file-like object for reading the body of the request message.
+
+        This is suitable for large message bodies, which should not be read
+        into memory all at once. The body can be read only once, either through
+        this stream or with getRequestBody().
+        
+        @return:    Stream for the body of the request.
+        @rtype:     RequestBodyReader
+        
+        """
+        if not self.__body_reader:
+            if self.getRequestMethod() in [ HTTP.POST_METHOD, HTTP.PUT_METHOD ]:
+                fp = self.environ['wsgi.input']
+                try:
+                    content_length = int(self.environ.get('CONTENT_LENGTH'))
+                except (TypeError, ValueError):
+                    content_length = None
+            else:
+                fp             = StringIO.StringIO()
+                content_length = 0
+            self.__body_reader = RequestBodyReader(fp, content_length)
+        return self.__body_reader
+
     def getRequestBody(self):
         """
         Return the body of the request message.
         
-        Note that this is not very suitable for streaming or large message bodies
-        at this point, since the entire message is read into a single string
-        before it is returned to the client.
+        The entire message is read into a single string. For large message
+        bodies, use getRequestBodyStream() instead.
         
         @return:    Body of the request.
         @rtype:     string
         
         """
-        #buffered_reader = BufferedReader(InputStreamReader(self.__native_req.getRequestBody()));
-        if self.getRequestMethod() in [ HTTP.POST_METHOD, HTTP.PUT_METHOD ]:
-            fp = self.environ['wsgi.input']
-            lines = []
-            while True:
-                line = fp.readline()
-                if not line:
-                    break
-                lines.append(line)
-            return '\n'.join(lines)
-        else:
-            return ""
+        if self.__request_body is None:
+            self.__request_body = self.getRequestBodyStream().read()
+        return self.__request_body
     
     def sendResponseHeaders(self):
         """
         Send the previously specified response headers and code.
-        
+
+        Responses of known length are sent with a Content-Length header, so
+        that the client can use the connection for further requests. The
+        length of streamed entities is not known in advance. The server
+        closes the connection at the end of those responses.
+
+        """
+        code = self.__response_code
+        body = self.__response_body
+        if isStreamedEntity(body):
+            if not self.__hasBody(code):
+                body = ""
+        elif isFileEntity(body):
+            self.__response_headers['Content-Length'] = str(len(body))
+            if not self.__hasBody(code):
+                body.close()
+                body = ""
+        else:
+            if body is None:
+                body = ""
+            elif type(body) is unicode:
+                body = body.encode("UTF-8")
+            # Also for responses without a body (HEAD, 304, ...): Without a
+            # Content-Length the server would close the connection.
+            self.__response_headers['Content-Length'] = str(len(body))
+            if not self.__hasBody(code):
+                body = ""
+        self.__response_body = body
+        if self.getRequestMethod() in [ HTTP.POST_METHOD, HTTP.PUT_METHOD ]:
+            # Unread parts of the request body would be taken for the next request
+            try:
+                if not self.getRequestBodyStream().isEmpty():
+                    self.__response_headers['Connection'] = "close"
+            except Exception:
+                self.__response_headers['Connection'] = "close"
+        self.start_response('%d %s' % (code, httplib.responses[code]),
+                            self.__response_headers.items())
+
+    def __hasBody(self, code):
         """
-        
-        self.write_callable = self.start_response('%d %s' % (self.__response_code, httplib.responses[self.__response_code]),
-                                                   self.__response_headers.items())
-    
+        Return True if a response with this code to this request has a body.
+
+        """
+        return self.getRequestMethod() != HTTP.HEAD_METHOD  and  code >= 200  and  code not in [ 204, 304 ]
+
     def sendResponseBody(self):
         """
         Send the previously specified request body.
-        
+
+        The body is not written here, but handed to the server as the
+        iterable that is returned by our WSGI application (see
+        response_iterable). Streamed entities are then sent chunk by
+        chunk, as they are produced. Files are read in chunks as well,
+        since Python 2 has no sendfile().
+
+        """
+        if isStreamedEntity(self.__response_body):
+            self.response_iterable = self.__streamBody(self.__response_body)
+        elif isFileEntity(self.__response_body):
+            self.response_iterable = self.__response_body.chunks()
+        else:
+            self.response_iterable = [ self.__response_body ]
+
+    def __streamBody(self, body):
+        """
+        Yield the chunks of a streamed entity.
+
         """
-        if not self.__response_body:
-            self.__response_body = ""
-        self.write_callable(self.__response_body)
+        try:
+            for chunk in body:
+                if chunk:
+                    yield chunk
+        except Exception, e:
+            # The response code was sent already, so all we can do is to
+            # log the problem and cut the response short.
+            print traceback.format_exc()
+            log("Exception while streaming response: %s" % str(e), facility=LOGF_COMPONENTS)
         
     def sendResponse(self):
         """
@@ -276,6 +374,13 @@ class _HttpHandler(object):
         self.request_handler = request_handler
         
     def handle(self, environ, start_response):
+        """
+        Process a request.
+
+        @return:    The body of the response (see WSGI).
+        @rtype:     iterable
+
+        """
         try:
             start_time = datetime.datetime.now()
             req = PythonHttpRequest(environ, start_response)            
@@ -283,20 +388,37 @@ class _HttpHandler(object):
                                     req.getRequestMethod(),
                                     req.getRequestURI())
             #log(msg, facility=LOGF_ACCESS_LOG)
-            code, response_body, headers = self.request_handler.handle(req)
-            for name, value in headers.items():
-                req.setResponseHeader(name, value)
-            req.setResponse(code, response_body)
+            result  = self.request_handler.handle(req)
+            headers = result.getHeaders()
+            if headers:
+                for name in headers.keySet():
+                    req.setResponseHeader(name, headers[name])
+            req.setResponse(result.getStatus(), result.getEntity())
             req.sendResponse()
             req.close()
             end_time   = datetime.datetime.now()
             td         = end_time-start_time
             request_ms = td.seconds*1000 + td.microseconds//1000
-            log("%s : %sms : %s : %s" % (msg, request_ms, code, len(response_body)),
+            if isStreamedEntity(result.getEntity()):
+                l = -1
+            else:
+                l = len(result.getEntity() or "")
+            log("%s : %sms : %s : %s" % (msg, request_ms, result.getStatus(), l),
                 start_time = start_time, facility=LOGF_ACCESS_LOG)
+            return req.response_iterable
         except Exception, e:
+            # A failed request must not take the server (or worker process) down
             print traceback.format_exc()
-            sys.exit(1)        
+            log("Exception while handling request: %s" % str(e))
+            body = "Internal Server Error"
+            try:
+                # Only possible if the response has not been started yet
+                start_response("500 Internal Server Error", [ ("Content-Type", "text/plain"),
+                                                              ("Content-Length", str(len(body))) ],
+                               sys.exc_info())
+            except Exception:
+                pass
+            return [ body ]
 
 
 # ----------------------------------------------------
@@ -306,8 +428,7 @@ request_handler = None
 def _app_method(environ, start_response):
     global request_handler
     handler = _HttpHandler(request_handler)
-    handler.handle(environ, start_response)
-    return ""
+    return handler.handle(environ, start_response)
 
 
 class PythonHttpServer(BaseHttpServer):
@@ -336,6 +457,173 @@ class PythonHttpServer(BaseHttpServer):
         """
         global request_handler
         request_handler = req_handler
-        log("Listening for HTTP requests on port %d..." % port)
-        httpserver.serve(_app_method, host="0.0.0.0", port=port)
+        if settings.SERVER_PROCESSES > 1:
+            # Each worker process creates its request threads after the fork,
+            # so the thread pool of the paste server can't be used.
+            server = httpserver.serve(_app_method, host="0.0.0.0", port=port,
+                                      protocol_version="HTTP/1.1",
+                                      socket_timeout=settings.SERVER_KEEPALIVE_TIMEOUT,
+                                      start_loop=False, use_threadpool=False)
+            log("Listening for HTTP requests on port %d with %d worker processes..." % \
+                                                        (port, settings.SERVER_PROCESSES))
+            _PreforkSupervisor(server, settings.SERVER_PROCESSES).run()
+        else:
+            log("Listening for HTTP requests on port %d..." % port)
+            # A keep-alive connection occupies a thread of the pool until the
+            # client closes it or it has been idle for SERVER_KEEPALIVE_TIMEOUT.
+            httpserver.serve(_app_method, host="0.0.0.0", port=port,
+                             protocol_version="HTTP/1.1",
+                             socket_timeout=settings.SERVER_KEEPALIVE_TIMEOUT,
+                             threadpool_workers=settings.SERVER_THREADS)
+
+
+class _PreforkSupervisor(object):
+    """
+    Runs a number of worker processes, which share the listening socket.
+
+    Python threads can only use a single CPU core at a time. Worker
+    processes don't have that limitation. Workers that die are replaced.
+
+    The supervisor reacts to these signals:
+
+        SIGHUP:             Graceful reload: New workers are started and the
+                            old ones finish the requests they are working on
+                            before they exit.
+        SIGTERM, SIGINT:    Graceful shutdown of all workers.
+
+    Worker processes don't share any memory. Changes to resources made by
+    one worker are noticed by the others through the resource storage
+    (see restx.resources.getResourceGeneration()).
+
+    """
+    MIN_WORKER_LIFETIME = 1.0   # Workers that die sooner cause a delay before the restart
+
+    def __init__(self, server, num_workers):
+        """
+        Create the supervisor.
+
+        @param server:          The (listening) paste server.
+        @type server:           WSGIServer
+
+        @param num_workers:     Number of worker processes.
+        @type num_workers:      int
+
+        """
+        self.server      = server
+        self.num_workers = num_workers
+        self.workers     = dict()       # PID -> start time
+        self.retiring    = list()       # PIDs of workers that were asked to stop
+        self.stopping    = False
+        self.reloading   = False
+
+    def run(self):
+        """
+        Start the workers and supervise them until we are asked to stop.
+
+        """
+        signal.signal(signal.SIGTERM, self.__stop)
+        signal.signal(signal.SIGINT,  self.__stop)
+        signal.signal(signal.SIGHUP,  self.__reload)
+        for i in range(self.num_workers):
+            self.__spawn()
+
+        while self.workers:
+            if self.stopping:
+                self.__retire(self.workers.keys())
+            elif self.reloading:
+                self.reloading = False
+                log("Reloading: Replacing %d worker processes" % self.num_workers)
+                old_workers = [ pid for pid in self.workers.keys() if pid not in self.retiring ]
+                for i in range(self.num_workers):
+                    self.__spawn()
+                self.__retire(old_workers)
+            try:
+                pid, status = os.wait()
+            except OSError, e:
+                if e.errno == errno.EINTR:
+                    continue        # A signal arrived
+                if e.errno == errno.ECHILD:
+                    break
+                raise
+            start_time = self.workers.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.remove(pid)
+            elif start_time is not None  and  not self.stopping:
+                log("Worker process %d died (status %d), starting a new one" % (pid, status))
+                if time.time() - start_time < self.MIN_WORKER_LIFETIME:
+                    # Don't fork like crazy if workers die right after they start
+                    time.sleep(self.MIN_WORKER_LIFETIME)
+                self.__spawn()
+        self.server.server_close()
+        log("All worker processes have stopped")
+
+    def __stop(self, signum, frame):
+        self.stopping = True
+
+    def __reload(self, signum, frame):
+        self.reloading = True
+
+    def __retire(self, pids):
+        """
+        Ask workers to finish their current requests and exit.
+
+        """
+        for pid in pids:
+            if pid not in self.retiring:
+                self.retiring.append(pid)
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+
+    def __spawn(self):
+        """
+        Start a new worker process.
+
+        """
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.time()
+            return
+        # In the worker process
+        exit_code = 0
+        try:
+            try:
+                _runWorker(self.server)
+            except:
+                print traceback.format_exc()
+                exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+
+def _runWorker(server):
+    """
+    Serve requests in a worker process until it receives SIGTERM.
+
+    Requests that are being processed when the signal arrives are finished
+    (or given up after SERVER_SHUTDOWN_TIMEOUT seconds) before we return.
+
+    """
+    def stop(signum, frame):
+        raise KeyboardInterrupt()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT,  signal.SIG_IGN)     # Only the supervisor reacts to Ctrl-C
+    signal.signal(signal.SIGHUP,  signal.SIG_IGN)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    # Stop accepting new connections in this worker, but finish the running requests
+    server.socket.close()
+    deadline = time.time() + settings.SERVER_SHUTDOWN_TIMEOUT
+    for thread in threading.enumerate():
+        # Request threads aren't daemons, unlike the background threads of our pools
+        if thread is not threading.currentThread()  and  not thread.isDaemon():
+            try:
+                thread.join(max(0, deadline - time.time()))
+            except Exception:
+                pass    # Threads not started by us can't always be joined
+    # Worker processes end with os._exit(), which doesn't run the exit handlers
+    flushWriteBehind()
 
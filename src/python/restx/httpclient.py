@@ -0,0 +1,563 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+A pooled HTTP client for outgoing requests.
+
+Components access other web sites through the base capabilities (httpGet()
+and httpPost()). Those requests go through a single, shared client, which
+keeps HTTP/1.1 connections open and reuses them for later requests to the
+same host. The number of connections per host is limited, connecting to and
+reading from a host is subject to a timeout and host names are resolved
+through a small DNS cache.
+
+The client is safe to be used from multiple threads at the same time. Its
+statistics are reported as 'http_client' in the server's run-time statistics.
+
+If a proxy is configured for a URL (http_proxy, https_proxy and no_proxy
+environment variables), the request is handed to urllib2 instead, which
+connects through the proxy (with CONNECT for https). Those requests don't
+use the connection pool.
+
+"""
+# Python imports
+import os
+import sys
+import time
+import errno
+import base64
+import socket
+import urllib
+import urllib2
+import httplib
+import urlparse
+import threading
+
+from StringIO import StringIO
+
+# RESTx imports
+import restx.settings as settings
+
+from restx.stats import register_stats_provider
+
+
+#
+# Errors with which a connection fails if the server has closed it already
+#
+_STALE_ERRNOS = [ errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED ]
+
+
+class DnsCache(object):
+    """
+    Remembers the address of host names for a while.
+
+    Only one address is kept per host name. Addresses of hosts that
+    can't be reached are forgotten, so that the next request does a
+    fresh lookup.
+
+    """
+    def __init__(self, ttl):
+        """
+        Create a new DNS cache.
+
+        @param ttl:     Number of seconds for which an address is kept.
+        @type  ttl:     int
+
+        """
+        self.ttl       = ttl
+        self.hits      = 0
+        self.misses    = 0
+        self.__lock    = threading.Lock()
+        self.__entries = dict()     # Host name -> ( address, expiry time )
+
+    def resolve(self, host):
+        """
+        Return the IP address for a host name.
+
+        @param host:    The host name.
+        @type  host:    string
+
+        @return:        The IP address as a string.
+        @rtype:         string
+
+        """
+        now = time.time()
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(host)
+            if entry  and  entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        finally:
+            self.__lock.release()
+
+        # The lookup itself is done without holding the lock
+        addr = socket.gethostbyname(host)
+        self.__lock.acquire()
+        try:
+            self.__entries[host] = (addr, now + self.ttl)
+        finally:
+            self.__lock.release()
+        return addr
+
+    def forget(self, host):
+        """
+        Remove the address of a host name from the cache.
+
+        @param host:    The host name.
+        @type  host:    string
+
+        """
+        self.__lock.acquire()
+        try:
+            if host in self.__entries:
+                del self.__entries[host]
+        finally:
+            self.__lock.release()
+
+
+class _PooledHttpConnection(httplib.HTTPConnection):
+    """
+    An HTTP connection, which connects through the client's DNS cache
+    and with the client's timeouts.
+
+    """
+    def __init__(self, host, port, client):
+        httplib.HTTPConnection.__init__(self, host, port)
+        self.client    = client
+        self.last_used = time.time()
+
+    def connect(self):
+        self.sock = self.client._openSocket(self.host, self.port)
+
+
+class _PooledHttpsConnection(httplib.HTTPSConnection):
+    """
+    An HTTPS connection, which connects through the client's DNS cache
+    and with the client's timeouts.
+
+    """
+    def __init__(self, host, port, client):
+        httplib.HTTPSConnection.__init__(self, host, port)
+        self.client    = client
+        self.last_used = time.time()
+
+    def connect(self):
+        sock = self.client._openSocket(self.host, self.port)
+        try:
+            import ssl
+            self.sock = ssl.wrap_socket(sock)
+        except ImportError:
+            # Older Python versions (and Jython 2.5) don't have the ssl module
+            self.sock = httplib.FakeSocket(sock, socket.ssl(sock))
+
+
+class HttpClient(object):
+    """
+    An HTTP client with a pool of keep-alive connections.
+
+    Idle connections are kept per (scheme, host, port). A request takes
+    an idle connection to its host if there is one, or opens a new one
+    if the per-host limit allows it. Otherwise, it waits for another
+    request to finish. After the response was read, the connection is
+    handed back to the pool, unless the server asked to close it.
+
+    """
+    MAX_REDIRECTS  = 5
+    REDIRECT_CODES = [ 301, 302, 303, 307 ]
+    RETRY_METHODS  = [ "GET", "HEAD", "PUT", "DELETE" ]     # Idempotent, can be sent again
+
+    def __init__(self, max_per_host, connect_timeout, read_timeout, idle_timeout, dns_ttl, name=None,
+                 proxies=None, no_proxy=None):
+        """
+        Create a new client.
+
+        @param max_per_host:    Max. number of open connections per host.
+        @type  max_per_host:    int
+
+        @param connect_timeout: Seconds to wait for a connection to be established
+                                (or for a connection to become available).
+        @type  connect_timeout: float
+
+        @param read_timeout:    Seconds to wait for data from the server.
+        @type  read_timeout:    float
+
+        @param idle_timeout:    Idle connections older than this many seconds
+                                are closed rather than reused.
+        @type  idle_timeout:    float
+
+        @param dns_ttl:         Seconds for which resolved host names are kept.
+        @type  dns_ttl:         int
+
+        @param name:            If specified, the statistics of this client
+                                are reported under this name.
+        @type  name:            string
+
+        @param proxies:         Proxy URL per scheme. Taken from the environment
+                                (http_proxy, https_proxy) if not specified.
+        @type  proxies:         dict
+
+        @param no_proxy:        Host names (or domain suffixes) which are accessed
+                                directly. Taken from the no_proxy environment
+                                variable if not specified.
+        @type  no_proxy:        list
+
+        """
+        self.max_per_host        = max_per_host
+        self.connect_timeout     = connect_timeout
+        self.read_timeout        = read_timeout
+        self.idle_timeout        = idle_timeout
+        self.requests            = 0
+        self.connections_created = 0
+        self.connections_reused  = 0
+        self.retries             = 0
+        self.proxied             = 0
+        if proxies is None:
+            proxies = urllib.getproxies()
+        if no_proxy is None:
+            no_proxy = [ h.strip().lower() for h in os.environ.get("no_proxy", os.environ.get("NO_PROXY", "")).split(",")
+                                           if h.strip() ]
+        self.proxies             = proxies
+        self.no_proxy            = no_proxy
+        self.__dns               = DnsCache(dns_ttl)
+        self.__cond              = threading.Condition()
+        self.__idle              = dict()   # (scheme, host, port) -> list of idle connections
+        self.__open              = dict()   # (scheme, host, port) -> number of open connections
+        if name:
+            register_stats_provider(name, self.getStats)
+
+    def getStats(self):
+        """
+        Return the usage statistics of this client.
+
+        @return:    Dictionary with request and connection counters.
+        @rtype:     dict
+
+        """
+        if self.requests:
+            reuse_rate = float(self.connections_reused) / self.requests
+        else:
+            reuse_rate = 0.0
+        return dict(requests            = self.requests,
+                    connections_created = self.connections_created,
+                    connections_reused  = self.connections_reused,
+                    reuse_rate          = reuse_rate,
+                    retries             = self.retries,
+                    proxied             = self.proxied,
+                    open_connections    = sum(self.__open.values()),
+                    idle_connections    = sum([ len(l) for l in self.__idle.values() ]),
+                    dns_hits            = self.__dns.hits,
+                    dns_misses          = self.__dns.misses)
+
+    def request(self, method, url, body=None, headers=None, credentials=None):
+        """
+        Send a request and read the entire response.
+
+        Redirects are followed. Credentials are only sent to the scheme,
+        host and port of the original URL, not to other hosts to which a
+        request is redirected. As with urllib2, a response with an error
+        status raises urllib2.HTTPError.
+
+        @param method:      The HTTP method ("GET", "POST", ...).
+        @type  method:      string
+
+        @param url:         The absolute URL.
+        @type  url:         string
+
+        @param body:        The request body, if any.
+        @type  body:        string
+
+        @param headers:     Additional request headers.
+        @type  headers:     dict
+
+        @param credentials: Account name and password for HTTP basic
+                            authentication, or None.
+        @type  credentials: tuple
+
+        @return:            Tuple of status, response headers (with lower
+                            case names) and response data.
+        @rtype:             tuple
+
+        """
+        scheme, host, port, selector, userinfo = _splitUrl(url)
+        if self.__proxyFor(scheme, host):
+            return self.__proxyRequest(method, url, body, headers, credentials)
+        origin    = (scheme, host, port)
+        redirects = 0
+        while True:
+            status, reason, resp_headers, data = self.__send(method, url, body, headers, credentials)
+            if status in self.REDIRECT_CODES  and  'location' in resp_headers  and  \
+                                                   redirects < self.MAX_REDIRECTS:
+                url        = urlparse.urljoin(url, resp_headers['location'])
+                redirects += 1
+                target     = _splitUrl(url)
+                if target[:3] != origin:
+                    # Don't give the credentials away to another host
+                    credentials = None
+                    if headers:
+                        headers = dict([ (name, value) for name, value in headers.items()
+                                                       if name.lower() != "authorization" ])
+                if status != 307  and  method == "POST":
+                    # Same as browsers (and urllib2) do: Redirected POSTs become GETs
+                    method = "GET"
+                    body   = None
+                if self.__proxyFor(target[0], target[1]):
+                    return self.__proxyRequest(method, url, body, headers, credentials)
+                continue
+            if status >= 400:
+                raise urllib2.HTTPError(url, status, reason, resp_headers, StringIO(data))
+            return status, resp_headers, data
+
+    def __send(self, method, url, body, headers, credentials):
+        """
+        Send a single request, without following redirects.
+
+        A reused connection may have been closed by the server in the
+        meantime. If sending over such a connection fails, or the server
+        closes it without sending a status line, an idempotent request is
+        tried once more, with a new connection. Nothing is sent again once
+        a response has started, or if the request could have changed
+        something on the server (POST).
+
+        @return:            Tuple of status, reason, response headers and data.
+        @rtype:             tuple
+
+        """
+        scheme, host, port, selector, userinfo = _splitUrl(url)
+        req_headers = dict()
+        if headers:
+            req_headers.update(headers)
+        if userinfo  and  not credentials:
+            credentials = urllib.unquote(userinfo).split(":", 1)
+        if credentials:
+            auth = base64.encodestring("%s:%s" % tuple(credentials)).replace("\n", "")
+            req_headers['Authorization'] = "Basic %s" % auth
+        if body  and  'Content-Type' not in req_headers:
+            req_headers['Content-Type'] = "application/x-www-form-urlencoded"
+
+        key = (scheme, host, port)
+        for attempt in [ 1, 2 ]:
+            conn, reused = self.__acquire(key)
+            reusable     = False
+            try:
+                sent = False
+                try:
+                    conn.request(method, selector, body, req_headers)
+                    sent = True
+                    resp = conn.getresponse()
+                except (socket.error, httplib.HTTPException), e:
+                    # A stale connection fails while sending, or is closed
+                    # by the server before a status line arrives. Timeouts
+                    # and errors after that are not retried.
+                    stale = not sent  or  isinstance(e, httplib.BadStatusLine)  or  \
+                            (isinstance(e, socket.error)  and  e.args  and  e.args[0] in _STALE_ERRNOS)
+                    if stale  and  reused  and  attempt == 1  and  method in self.RETRY_METHODS:
+                        self.retries += 1
+                        continue
+                    raise
+                data     = resp.read()
+                reusable = not resp.will_close
+            finally:
+                self.__release(key, conn, reusable)
+            resp_headers = dict([ (name.lower(), value) for name, value in resp.getheaders() ])
+            return resp.status, resp.reason, resp_headers, data
+
+    def __proxyFor(self, scheme, host):
+        """
+        Return the URL of the proxy for a request, or None.
+
+        """
+        proxy = self.proxies.get(scheme)
+        if not proxy:
+            return None
+        for name in self.no_proxy:
+            if name == "*"  or  host == name.lstrip(".")  or  host.endswith("." + name.lstrip(".")):
+                return None
+        return proxy
+
+    def __proxyRequest(self, method, url, body, headers, credentials):
+        """
+        Send a request through the configured proxy, using urllib2.
+
+        The result is the same as for request().
+
+        """
+        handlers = [ urllib2.ProxyHandler(self.proxies) ]
+        if credentials:
+            passman = urllib2.HTTPPasswordMgrWithDefaultRealm()
+            passman.add_password(None, url, credentials[0], credentials[1])
+            handlers.append(urllib2.HTTPBasicAuthHandler(passman))
+        opener  = urllib2.build_opener(*handlers)
+        request = urllib2.Request(url, body, headers or {})
+        if method not in [ "GET", "POST" ]:
+            request.get_method = lambda: method
+        self.proxied += 1
+        if sys.version_info >= (2, 6):
+            resp = opener.open(request, timeout=self.read_timeout)
+        else:
+            # No timeouts in older versions (Jython 2.5)
+            resp = opener.open(request)
+        try:
+            data = resp.read()
+        finally:
+            resp.close()
+        resp_headers = dict([ (name.lower(), value) for name, value in resp.info().items() ])
+        return resp.code, resp_headers, data
+
+    def __acquire(self, key):
+        """
+        Return a connection for the specified key.
+
+        @return:    Tuple of connection and a flag, which indicates
+                    whether this is a reused connection.
+        @rtype:     tuple
+
+        """
+        self.__cond.acquire()
+        try:
+            deadline = time.time() + self.connect_timeout
+            while True:
+                now  = time.time()
+                idle = self.__idle.get(key)
+                while idle:
+                    conn = idle.pop()
+                    if now - conn.last_used < self.idle_timeout:
+                        self.requests           += 1
+                        self.connections_reused += 1
+                        return conn, True
+                    conn.close()
+                    self.__open[key] -= 1
+                if self.__open.get(key, 0) < self.max_per_host:
+                    self.__open[key]          = self.__open.get(key, 0) + 1
+                    self.requests            += 1
+                    self.connections_created += 1
+                    break
+                if now >= deadline:
+                    raise urllib2.URLError("Too many open connections to '%s'" % key[1])
+                self.__cond.wait(deadline - now)
+        finally:
+            self.__cond.release()
+
+        scheme, host, port = key
+        if scheme == "https":
+            return _PooledHttpsConnection(host, port, self), False
+        else:
+            return _PooledHttpConnection(host, port, self), False
+
+    def __release(self, key, conn, reusable):
+        """
+        Hand a connection back to the pool, or close it.
+
+        """
+        if not reusable:
+            conn.close()
+        self.__cond.acquire()
+        try:
+            if reusable:
+                conn.last_used = time.time()
+                self.__idle.setdefault(key, list()).append(conn)
+            else:
+                self.__open[key] -= 1
+            self.__cond.notify()
+        finally:
+            self.__cond.release()
+
+    def _openSocket(self, host, port):
+        """
+        Open a socket to a host, resolving its name through the DNS cache.
+
+        Called by the connections when they need to connect.
+
+        """
+        addr = self.__dns.resolve(host)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect((addr, port))
+            sock.settimeout(self.read_timeout)
+            # Requests are small and we wait for each response before
+            # sending the next request, so don't delay sending them.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except socket.error:
+            sock.close()
+            # The host may have moved to a different address
+            self.__dns.forget(host)
+            raise
+        return sock
+
+
+def _splitUrl(url):
+    """
+    Split an http or https URL into the parts that are needed for a request.
+
+    @param url:     The absolute URL.
+    @type  url:     string
+
+    @return:        Tuple of scheme, host name (lower case), port, selector
+                    (path and query) and user info (or None).
+    @rtype:         tuple
+
+    """
+    scheme, netloc, path, query, fragment = urlparse.urlsplit(url)
+    scheme = scheme.lower()
+    if scheme not in [ "http", "https" ]:
+        raise urllib2.URLError("Unsupported URL scheme '%s'" % scheme)
+    userinfo, host_port = urllib.splituser(netloc)
+    host, port          = urllib.splitport(host_port)
+    if port:
+        port = int(port)
+    elif scheme == "https":
+        port = httplib.HTTPS_PORT
+    else:
+        port = httplib.HTTP_PORT
+    selector = path or "/"
+    if query:
+        selector += "?" + query
+    return scheme, host.lower(), port, selector, userinfo
+
+
+__CLIENT      = None
+__CLIENT_LOCK = threading.Lock()
+
+def getHttpClient():
+    """
+    Return the shared HTTP client of the server.
+
+    The client is created with the settings when it is first needed.
+
+    @return:    The shared client.
+    @rtype:     HttpClient
+
+    """
+    global __CLIENT
+    if __CLIENT is None:
+        __CLIENT_LOCK.acquire()
+        try:
+            if __CLIENT is None:
+                __CLIENT = HttpClient(settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+                                      settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+                                      settings.HTTP_CLIENT_READ_TIMEOUT,
+                                      settings.HTTP_CLIENT_IDLE_TIMEOUT,
+                                      settings.DNS_CACHE_TTL,
+                                      name="http_client")
+        finally:
+            __CLIENT_LOCK.release()
+    return __CLIENT
@@ -35,13 +35,14 @@ conversion function whenever we use the components.
 
 """
 
-from restx.platform_specifics           import PLATFORM, PLATFORM_JYTHON
+from restx.platform_specifics           import PLATFORM, JAVA_PLATFORMS
+from restx.httpabstraction.base_server  import isStreamedEntity
 
 from org.mulesoft.restx.exception     import *
 from org.mulesoft.restx.component.api import HTTP, HttpMethod, Result
 from org.mulesoft.restx.parameter     import ParameterDefNumber
 
-if PLATFORM == PLATFORM_JYTHON:
+if PLATFORM in JAVA_PLATFORMS:
     import java.lang.Exception
     from java.lang import String, Integer, Float
     from java.math import BigDecimal
@@ -88,14 +89,15 @@ def __pythonStructToPython(obj):
 def __pythonStructToJava(obj):
     """
     Traverse dicts and lists and convert to Java HashMaps
-    and ArrayLists.
+    and ArrayLists. Iterators (streamed results) are
+    converted to ArrayLists as well.
     
     """
     if type(obj) is dict:
         elem = HashMap()
         for key, value in obj.items():
             elem.put(key, __pythonStructToJava(value))
-    elif type(obj) is list:
+    elif type(obj) is list  or  isStreamedEntity(obj):
         elem = ArrayList()
         for e in obj:
             elem.add(__pythonStructToJava(e))
@@ -125,10 +127,114 @@ def languageStructToPython(component, obj):
     return func(obj)
 
 
+#
+# Information about Java component classes, keyed by class. The annotations of
+# a Java component are parsed only once per class (the base component caches
+# the results), but it is still much cheaper to convert what we need into
+# Python structures once, rather than walking the Java maps for every call.
+#
+__JAVA_CLASS_INFO = dict()
+
+class _JavaClassInfo(object):
+    """
+    The parameter information of a Java component class, in Python form.
+
+    """
+    def __init__(self, component):
+        # List of (name, is_numeric) tuples for the creation time parameters
+        param_map = component.componentDescriptor.getParamMap()
+        self.creation_params = [ (name, type(param_map.get(name)) is ParameterDefNumber)
+                                            for name in param_map.keySet() ]
+        # For each service: List of (type, name) tuples in the order in
+        # which the service method expects them.
+        self.service_params = dict()
+        param_orders = component.getParameterOrder()
+        param_types  = component.getParameterTypes()
+        for method_name in param_orders.keySet():
+            param_order = param_orders.get(method_name)
+            param_type  = param_types.get(method_name)
+            if param_order and param_type:
+                self.service_params[method_name] = zip(list(param_type), list(param_order))
+
+def __getJavaClassInfo(component):
+    """
+    Return the (cached) parameter information for the class of a Java component.
+
+    """
+    klass = component.__class__
+    info  = __JAVA_CLASS_INFO.get(klass)
+    if info is None:
+        # Concurrent requests may compute this at the same time, but
+        # the result is the same either way.
+        info = _JavaClassInfo(component)
+        __JAVA_CLASS_INFO[klass] = info
+    return info
+
+
+#
+# Binding of resource creation time parameters to component instances
+#
+def __javaBindCreationParams(component, params, only_strip=False):
+    """
+    Assign the resource creation time parameters to a Java component.
+
+    The parameters are removed from the map. If 'only_strip' is set then
+    the parameters are just removed, since they were bound before.
+
+    """
+    for name, is_numeric in __getJavaClassInfo(component).creation_params:
+        if name in params:
+            if not only_strip:
+                if is_numeric:
+                    # Why do we have this? The default type for numeric parameters is
+                    # BigDecimal. We can't just assign a float (or other numeric value)
+                    # to a BigDecimal variable. Instead, we need to create a new
+                    # instance of that type explicitly.
+                    setattr(component, name, BigDecimal(params[name]))
+                else:
+                    setattr(component, name, params[name])
+            del params[name]
+
+def __pythonBindCreationParams(component, params, only_strip=False):
+    """
+    Assign the resource creation time parameters to a Python component.
+
+    The parameters are removed from the map. If 'only_strip' is set then
+    the parameters are just removed, since they were bound before.
+
+    """
+    for name in component.PARAM_DEFINITION.keys():
+        if name in params:
+            if not only_strip:
+                if hasattr(component, name):
+                    raise RestxException("Name '%s' cannot be assigned to component, because an attribute with that name exists already" % name)
+                setattr(component, name, params[name])
+            del params[name]
+
+#
+# Translation table, which finds the correct binding function
+# based on the language ID of the component.
+#
+__LANG_BIND_CREATION_PARAMS = {
+    "JAVA"   : __javaBindCreationParams,
+    "PYTHON" : __pythonBindCreationParams,
+}
+
+def bindCreationParams(component, params):
+    """
+    Assign the resource creation time parameters to a component instance.
+
+    Used for pooled component instances, which are configured only once.
+    The parameters are removed from the (private copy of the) parameter map.
+
+    """
+    __LANG_BIND_CREATION_PARAMS[component.LANGUAGE](component, params)
+
+
 #
 # Proxies for calling language specific component service methods
 #
-def __javaServiceMethodProxy(component, request, method, method_name, input, params, http_method):
+def __javaServiceMethodProxy(component, request, method, method_name, input, params, http_method, params_bound):
     """
     Calls service methods in Java components.
     
@@ -141,29 +247,19 @@ def __javaServiceMethodProxy(component, request, method, method_name, input, par
     # assign them directly to the component as new attributes. After that,
     # the pruned parameter map can be passed as keyword arg dict to the
     # service method.
-    for name in component.componentDescriptor.getParamMap().keySet():
-        if name in params:
-            if type(component.componentDescriptor.getParamMap().get(name)) is ParameterDefNumber:
-                # Why do we have this? The default type for numeric parameters is
-                # BigDecimal. We can't just assign a float (or other numeric value)
-                # to a BigDecimal variable. Instead, we need to create a new
-                # instance of that type explicitly.
-                setattr(component, name, BigDecimal(params[name]))
-            else:
-                setattr(component, name, params[name])
-                
-            del params[name]
+    __javaBindCreationParams(component, params, params_bound)
     try:
-        param_order = component.getParameterOrder()[method_name]
-        param_types = component.getParameterTypes()[method_name]
+        # The combined type list and parameter name list for this service is
+        # taken from the class info cache.
+        typed_params = __getJavaClassInfo(component).service_params.get(method_name)
         # Assemble the list of additional service method parameters. We need
-        # to perform a case, so we combine the type list and parameter name list,
-        # index the parameter map and perform the cast all in one swoop.
-        if param_order and param_types:
+        # to perform a case, so we index the parameter map and perform the
+        # cast all in one swoop.
+        if typed_params:
             # Yes, the following CAN be written as a single line with list comprehension,
             # but then the 'reader comprehension' suffers. So, I wrote it out explicitly.
             arglist = list()
-            for param_type, name in zip(param_types, param_order):
+            for param_type, name in typed_params:
                 param_value = params[name]
                 if param_type != type(param_value):
                     # Some type conversion is required
@@ -182,7 +278,16 @@ def __javaServiceMethodProxy(component, request, method, method_name, input, par
         # Passing them to ResourceAccessor means that I don't have to import those
         # symbols in the resource_accessor module.        
         component.resourceAccessor = ResourceAccessor(__javaStructToPython, __pythonStructToJava)
-        res = method(http_method, String(input if input is not None else ""), *arglist)
+        if input is None:
+            input = ""
+        elif type(input) is str:
+            # The request body arrives as raw bytes. Java components expect
+            # a string, so we decode it (if it's not text, we leave it alone).
+            try:
+                input = input.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        res = method(http_method, String(input), *arglist)
     except RestxException, e:
         raise e
     except java.lang.Exception, e:
@@ -194,7 +299,7 @@ def __javaServiceMethodProxy(component, request, method, method_name, input, par
         res.setEntity(data)
     return res
 
-def __pythonServiceMethodProxy(component, request, method, method_name, input, params, http_method):
+def __pythonServiceMethodProxy(component, request, method, method_name, input, params, http_method, params_bound):
     """
     Calls service methods in Python components.
     
@@ -203,12 +308,7 @@ def __pythonServiceMethodProxy(component, request, method, method_name, input, p
     # assign them directly to the component as new attributes. After that,
     # the pruned parameter map can be passed as keyword arg dict to the
     # service method.
-    for name in component.PARAM_DEFINITION.keys():
-        if name in params:
-            if hasattr(component, name):
-                raise RestxException("Name '%s' cannot be assigned to component, because an attribute with that name exists already" % name)
-            setattr(component, name, params[name])
-            del params[name]
+    __pythonBindCreationParams(component, params, params_bound)
     return method(http_method, input, **params)
 
 #
@@ -221,7 +321,8 @@ __LANG_METHOD_PROXIES = {
 }
 
 
-def serviceMethodProxy(component, service_method, service_method_name, request, input, params, http_method):
+def serviceMethodProxy(component, service_method, service_method_name, request, input, params, http_method,
+                       params_bound=False):
     """
     Call the service method of a component.
     
@@ -233,8 +334,12 @@ def serviceMethodProxy(component, service_method, service_method_name, request,
 
     'service_method_name' is the name of the method, as you
     might have guessed.
+
+    'params_bound' is set for pooled component instances, which have
+    their resource creation time parameters assigned already.
     
     """
     func = __LANG_METHOD_PROXIES[component.LANGUAGE]
     component.setRequest(request)
-    return func(component, request, service_method, service_method_name, input, params, http_method)
+    return func(component, request, service_method, service_method_name, input, params, http_method,
+                params_bound)
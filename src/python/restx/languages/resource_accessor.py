@@ -19,7 +19,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from restx.resources                    import makeResource
-from restx.resources.resource_runner    import accessResource
+import jarray
+
+from restx.resources.resource_runner    import accessResource, accessResources
 from org.mulesoft.restx.component.api   import HttpResult, MakeResourceResult
 from org.mulesoft.restx                 import ResourceAccessorInterface
 
@@ -48,6 +50,21 @@ class ResourceAccessor(ResourceAccessorInterface):
         res.data = self.to_java_conversion_func(res.data)
         return res
 
+    def accessResourcesProxy(self, requests, timeout):
+        access_requests = [ (req.uri, self.from_java_conversion_func(req.params), req.input, req.method)
+                                for req in requests ]
+        if timeout > 0:
+            results = accessResources(access_requests, timeout)
+        else:
+            results = accessResources(access_requests)
+        out = list()
+        for status, data in results:
+            res        = HttpResult()
+            res.status = status
+            res.data   = self.to_java_conversion_func(data)
+            out.append(res)
+        return jarray.array(out, HttpResult)
+
     def makeResourceProxy(self, componentClassName, suggestedName, resourceDescription, params):
         rd = { "resource_creation_params" : { "suggested_name" : suggestedName, "desc" : resourceDescription },
                "params" : self.from_java_conversion_func(params) }
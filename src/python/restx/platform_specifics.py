@@ -29,11 +29,20 @@ or a different storage abstraction.
 import settings
 
 #
-# These are the three types of platforms we currently know about.
+# These are the types of platforms we currently know about.
+#
+# PLATFORM_ASYNC is Jython with an event loop based HTTP server instead of
+# the thread-per-request server (see httpabstraction/async_http_server.py).
 #
 PLATFORM_PYTHON = "Python"
 PLATFORM_JYTHON = "Jython"
 PLATFORM_GAE    = "GAE"
+PLATFORM_ASYNC  = "Async"
+
+#
+# The platforms on which we run in a Java VM (and can use Java components).
+#
+JAVA_PLATFORMS  = [ PLATFORM_JYTHON, PLATFORM_ASYNC ]
 
 #
 # ------------------------------------------------------------------------------------------
@@ -56,6 +65,18 @@ else:
     STORAGE_OBJECT = ResourceStorage(settings.RESOURCEDB_LOCATION)
 
 
+#
+# Export the class of the storage, in which components keep their data,
+# under the generic name 'FileStorageClass'
+#
+if settings.STORAGE_BACKEND == "log":
+    from restx.storageabstraction.log_storage import LogStorage as FileStorageClass
+elif settings.STORAGE_LAYOUT == "sharded":
+    from restx.storageabstraction.sharded_file_storage import ShardedFileStorage as FileStorageClass
+else:
+    from restx.storageabstraction.file_storage import FileStorage as FileStorageClass
+
+
 #
 # Export the correct server class under the generic name 'HttpServer'
 #
@@ -63,6 +84,8 @@ if PLATFORM == PLATFORM_JYTHON:
     from restx.httpabstraction.jython_java_server import JythonJavaHttpServer as HttpServer
 elif PLATFORM == PLATFORM_PYTHON:
     from restx.httpabstraction.python_http_server import PythonHttpServer as HttpServer
+elif PLATFORM == PLATFORM_ASYNC:
+    from restx.httpabstraction.async_http_server import AsyncHttpServer as HttpServer
 else:
     from restx.httpabstraction.gae_http_server import GaeHttpServer as HttpServer
 
@@ -31,6 +31,7 @@ import restx.settings as settings
 
 from restx.render.baserenderer import BaseRenderer
 from restx.core.util           import bool_view
+from restx.httpabstraction.base_server import isStreamedEntity
 
 from org.mulesoft.restx.util   import Url
 
@@ -240,6 +241,10 @@ class HtmlRenderer(BaseRenderer):
             
         """
         out = ""
+        if isStreamedEntity(data):
+            # No streaming for HTML output. We need to see all
+            # elements for the table layout anyway.
+            data = list(data)
         if type(data) is dict:
             out += self.__dict_render(data)
         elif type(data) is list:
@@ -27,7 +27,10 @@ Outputs JSON representation of data.
 import restxjson as json
 
 # RESTx imports
+import restx.settings as settings
+
 from restx.render.baserenderer import BaseRenderer
+from restx.httpabstraction.base_server import isStreamedEntity
 
 from restx.platform_specifics  import *
 
@@ -47,6 +50,11 @@ def _default(obj):
     @return:       String representation suitable for JSON.
     
     """
+    if isStreamedEntity(obj):
+        # An iterator somewhere within the data structure. Only
+        # iterators at the top level are streamed, all others are
+        # rendered as lists.
+        return list(obj)
     return str(obj)
 
 def _recursive_type_fixer(obj):
@@ -78,12 +86,64 @@ def _recursive_type_fixer(obj):
                 v = _recursive_type_fixer(v)
             new_dict[k] = v
         return new_dict
+    if isStreamedEntity(obj):
+        return [ _recursive_type_fixer(e) for e in obj ]
     return obj
-        
+
+
+def _encoder_options(compact, sort_keys):
+    """
+    Return the keyword arguments for the JSON encoder.
+
+    @param compact:     Flag indicating whether compact output (no indentation
+                        and no spaces after separators) is desired.
+    @type compact:      boolean
+
+    @param sort_keys:   Flag indicating whether dictionary keys should be sorted.
+    @type sort_keys:    boolean
+
+    @return:            Keyword arguments for the JSON encoder.
+    @rtype:             dict
+
+    """
+    if compact:
+        return dict(sort_keys=sort_keys, separators=(',', ':'))
+    else:
+        return dict(sort_keys=sort_keys, indent=4)
+
+
+def _dumps(data, compact=False, sort_keys=True):
+    """
+    Return the JSON representation of the data.
+
+    """
+    # simplejson can only handle some of the base Python datatypes.
+    # Since we also have other types in the output dictionaries (URIs
+    # for example), we need to provide a 'default' method, which
+    # simplejson calls in case it doesn't know what to do.
+
+    # Need to use our newly defined Url encoder, since otherwise
+    # json wouldn't know how to encode a URL
+    options = _encoder_options(compact, sort_keys)
+    if PLATFORM == PLATFORM_GAE:
+        # That doesn't seem to be supported when running in
+        # GAE, though. So, in that case we first perform a very
+        # manual fixup of the object, replacing all occurrances
+        # of unusual types with their string representations.
+        data = _recursive_type_fixer(data)
+        return json.dumps(data, **options)
+    else:
+        return json.dumps(data, default=_default, **options)
+
 
 class JsonRenderer(BaseRenderer):
     """
     Class to render data as JSON.
+
+    The following renderer arguments are supported:
+
+        * compact:   If set, the output is not indented (default: False).
+        * sort_keys: If not set, dictionary keys are not sorted (default: True).
         
     """
     CONTENT_TYPE = "application/json"
@@ -101,30 +161,67 @@ class JsonRenderer(BaseRenderer):
                             itself at the top level). This is important for
                             some renderers, since they can insert any framing
                             elements that might be required at the top level.
-                            However, for the JSON renderer this is just
-                            ignored.
         @param top_level:   boolean
         
-        @return:            Output buffer with completed representation.
+        @return:            Output buffer with completed representation. If
+                            the data is an iterator, the output is an iterator
+                            over chunks of the output. Data that is in memory
+                            already is rendered in one go, so that the response
+                            can be cached and revalidated.
         @rtype:             string
         
         """
-        # simplejson can only handle some of the base Python datatypes.
-        # Since we also have other types in the output dictionaries (URIs
-        # for example), we need to provide a 'default' method, which
-        # simplejson calls in case it doesn't know what to do.
-
-        # Need to use our newly defined Url encoder, since otherwise
-        # json wouldn't know how to encode a URL
-        if PLATFORM == PLATFORM_GAE:
-            # That doesn't seem to be supported when running in
-            # GAE, though. So, in that case we first perform a very
-            # manual fixup of the object, replacing all occurrances
-            # of unusual types with their string representations.
-            data = _recursive_type_fixer(data)
-            out = json.dumps(data, sort_keys=True, indent=4)
-        else:
-            out = json.dumps(data, default=_default, sort_keys=True, indent=4)
+        compact   = self.renderer_args.get('compact', False)
+        sort_keys = self.renderer_args.get('sort_keys', True)
+        if isStreamedEntity(data):
+            return self.__render_stream(data, compact, sort_keys)
+        return _dumps(data, compact, sort_keys)
+
+    def __render_stream(self, data, compact, sort_keys):
+        """
+        Render the elements of an iterator as a JSON array, piece by piece.
 
-        return out
+        This is a generator, which yields chunks of (roughly) RESPONSE_CHUNK_SIZE.
+        Only one chunk of the output is held in memory at any time, no matter
+        how many elements the iterator produces.
 
+        @param data:        An iterator over the elements of the array.
+        @type data:         iterator
+
+        @param compact:     Flag indicating whether compact output is desired.
+        @type compact:      boolean
+
+        @param sort_keys:   Flag indicating whether dictionary keys should be sorted.
+        @type sort_keys:    boolean
+
+        @return:            Iterator over the chunks of the output.
+        @rtype:             iterator
+
+        """
+        if compact:
+            first_sep, sep, indent, end = "", ",", None, "]"
+        else:
+            # Indent the elements like json.dumps() would do within a list
+            first_sep, sep, indent, end = "\n    ", ",\n    ", "\n    ", "\n]"
+        buf       = [ "[" ]
+        buf_len   = 1
+        separator = first_sep
+        empty     = True
+        for elem in data:
+            out = _dumps(elem, compact, sort_keys)
+            if indent:
+                out = out.replace("\n", indent)
+            out = separator + out
+            buf.append(out)
+            buf_len  += len(out)
+            separator = sep
+            empty     = False
+            if buf_len >= settings.RESPONSE_CHUNK_SIZE:
+                yield "".join(buf)
+                buf     = list()
+                buf_len = 0
+        if empty:
+            buf.append("]")
+        else:
+            buf.append(end)
+        yield "".join(buf)
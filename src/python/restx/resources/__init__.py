@@ -47,6 +47,9 @@ The stored representation of a resource looks like this:
 
 # Python imports
 import os
+import time
+import urllib
+import threading
 
 # RESTx imports
 import restx.components
@@ -54,7 +57,9 @@ import restx.settings as settings
 
 from restx.platform_specifics     import STORAGE_OBJECT
 from restx.logger                 import *
-from restx.core.parameter         import TYPE_COMPATIBILITY
+from restx.cache                  import LruCache, copy_struct
+from restx.resources.catalog      import ResourceCatalog
+from restx.core.parameter         import TYPE_COMPATIBILITY, makeTypeConverter
 from restx.languages              import *
 
 from org.mulesoft.restx.exception import *
@@ -64,6 +69,76 @@ from org.mulesoft.restx.util      import Url
 EXCLUDED_NAMES = [ "readme.txt" ]
 EXCLUDE_PREFIXES = [ "_" ]
 
+#
+# Parsed resource definitions are kept in memory, together with the
+# storage stamp of the definition from which they were parsed. As long
+# as the stamp has not changed, we don't need to read and parse the
+# stored definition again. Local changes to a resource definition
+# also remove the cached copy right away.
+#
+_RESOURCE_CACHE = LruCache(settings.RESOURCE_CACHE_SIZE, name="resource_cache")
+
+#
+# The resource generation is incremented whenever we notice that a resource
+# definition was created, changed or deleted. Anything that is derived from
+# resource definitions (for example cached responses) can remember the
+# generation it was computed in, in order to detect that it is outdated.
+#
+# Resources may also be changed by other processes, which serve the same
+# resource storage (for example the workers of a pre-forking server). Those
+# changes are noticed through the storage stamp, which we check at most once
+# every RESOURCE_SYNC_INTERVAL seconds.
+#
+_RESOURCE_GENERATION      = 0
+_RESOURCE_GENERATION_LOCK = threading.Lock()
+_STORAGE_STAMP            = None
+_NEXT_STORAGE_CHECK       = 0
+
+def getResourceGeneration():
+    """
+    Return the current resource generation.
+
+    @return:  The resource generation.
+    @rtype:   int
+
+    """
+    global _STORAGE_STAMP, _NEXT_STORAGE_CHECK
+    if settings.RESOURCE_SYNC_INTERVAL:
+        now = time.time()
+        if now >= _NEXT_STORAGE_CHECK:
+            _NEXT_STORAGE_CHECK = now + settings.RESOURCE_SYNC_INTERVAL
+            stamp = STORAGE_OBJECT.getStorageStamp()
+            if stamp != _STORAGE_STAMP:
+                _STORAGE_STAMP = stamp
+                _resourcesChanged()
+    return _RESOURCE_GENERATION
+
+def _resourcesChanged():
+    """
+    Start a new resource generation.
+
+    """
+    global _RESOURCE_GENERATION
+    _RESOURCE_GENERATION_LOCK.acquire()
+    try:
+        _RESOURCE_GENERATION += 1
+    finally:
+        _RESOURCE_GENERATION_LOCK.release()
+
+def _isResourceName(name):
+    """
+    Return True if a name in the resource storage is that of a resource.
+
+    """
+    name = name.lower()
+    return name not in EXCLUDED_NAMES  and  name[:1] not in EXCLUDE_PREFIXES
+
+#
+# The catalog of all resources, which is used to list them without having
+# to read every stored resource definition.
+#
+_CATALOG = ResourceCatalog(STORAGE_OBJECT, _isResourceName)
+
 def getResourceUri(resource_name):
     """
     Construct a resource's URI based on its name.
@@ -75,11 +150,59 @@ def getResourceUri(resource_name):
     return settings.PREFIX_RESOURCE + "/" + resource_name
 
 
+def loadResource(resource_name):
+    """
+    Return the parsed and sanity checked definition of a resource.
+
+    The definition is served from the resource cache, unless the stored
+    representation has changed since it was parsed. Note that the returned
+    object is shared with the cache and therefore must not be modified.
+
+    @param resource_name:   Name of the resource.
+    @type  resource_name:   string
+
+    @return:                The complete resource definition.
+    @rtype:                 dict
+
+    @raise Exception:       If the resource is unknown or malformed.
+
+    """
+    stamp = STORAGE_OBJECT.getResourceStamp(resource_name)
+    if stamp is not None:
+        entry = _RESOURCE_CACHE.get(resource_name)
+        if entry:
+            if entry[0] == stamp:
+                return entry[1]
+            # The stored definition was changed behind our back
+            _RESOURCE_CACHE.remove(resource_name)
+            _resourcesChanged()
+
+    obj = STORAGE_OBJECT.loadResourceFromStorage(resource_name)
+    if not obj:
+        raise Exception("Unknown resource: " + resource_name)
+    if type(obj) is not dict  or  'public' not in obj:
+        raise Exception("Missing top-level element 'public' or malformed resource.")
+    public_obj = obj['public']
+    # Do some sanity checking on the resource. Needs to contain
+    # a few key elements at least.
+    for mandatory_key in [ 'uri', 'desc', 'name' ]:
+        if mandatory_key not in public_obj:
+            raise Exception("Mandatory key '%s' missing in stored resource '%s'" % \
+                            (mandatory_key, resource_name))
+
+    if stamp is not None:
+        _RESOURCE_CACHE.put(resource_name, (stamp, obj))
+    return obj
+
+
 def retrieveResourceFromStorage(uri, only_public=False):
     """
     Return the details about a stored resource.
     
     The resource is identified via its URI.
+
+    The caller receives its own copy of the resource definition
+    and is free to modify it.
     
     @param uri:         Identifies a resource via its URI.
     @type  uri:         string
@@ -96,28 +219,39 @@ def retrieveResourceFromStorage(uri, only_public=False):
     resource_name = uri[len(settings.PREFIX_RESOURCE)+1:]
     obj = None
     try:
-        obj = STORAGE_OBJECT.loadResourceFromStorage(resource_name)
-        if not obj:
-            raise Exception("Unknown resource: " + resource_name)
-        if type(obj) is not dict  or  'public' not in obj:
-            obj = None
-            raise Exception("Missing top-level element 'public' or malformed resource.")
-        public_obj = obj['public']
-        # Do some sanity checking on the resource. Needs to contain
-        # a few key elements at least.
-        for mandatory_key in [ 'uri', 'desc', 'name' ]:
-            if mandatory_key not in public_obj:
-                public_obj = None
-                raise Exception("Mandatory key '%s' missing in stored resource '%s'" % \
-                                (mandatory_key, resource_name))
+        obj = loadResource(resource_name)
         if only_public:
-            obj = public_obj
+            obj = obj['public']
+        obj = copy_struct(obj)
             
     except Exception, e:
+        obj = None
         log("Malformed storage for resource '%s': %s" % (resource_name, str(e)), facility=LOGF_RESOURCES)
     return obj
 
 
+def writeResourceToStorage(uri, resource_def):
+    """
+    Store a resource definition.
+
+    @param uri:             Uri of the resource
+    @type  uri:             string
+
+    @param resource_def:    The complete resource definition.
+    @type  resource_def:    dict
+
+    @raise RestxException:  If the resource cannot be stored.
+
+    """
+    resource_name = uri[len(settings.PREFIX_RESOURCE)+1:]
+    try:
+        STORAGE_OBJECT.writeResourceToStorage(resource_name, resource_def)
+        _CATALOG.update(resource_name, resource_def)
+    finally:
+        _RESOURCE_CACHE.remove(resource_name)
+        _resourcesChanged()
+
+
 def deleteResourceFromStorage(uri):
     """
     Delete a resource definition from storage.
@@ -127,32 +261,115 @@ def deleteResourceFromStorage(uri):
 
     """
     resource_name = uri[len(settings.PREFIX_RESOURCE)+1:]
-    STORAGE_OBJECT.deleteResourceFromStorage(resource_name)
+    try:
+        STORAGE_OBJECT.deleteResourceFromStorage(resource_name)
+        _CATALOG.remove(resource_name)
+    finally:
+        _RESOURCE_CACHE.remove(resource_name)
+        _resourcesChanged()
+
+def _selectResources(prefix):
+    """
+    Return the catalog entries and the sorted names of the selected resources.
+
+    The information comes from the resource catalog, so the stored
+    resource definitions don't have to be read.
 
-def listResources():
+    """
+    entries = _CATALOG.getEntries(getResourceGeneration())
+    if prefix:
+        names = [ name for name in entries.keys() if name.startswith(prefix) ]
+    else:
+        names = entries.keys()
+    names.sort()
+    return entries, names
+
+def _resourceInfo(entry):
+    if 'uri' in entry:
+        return dict(uri=Url(entry['uri']), desc=entry['desc'])
+    return "Not found"
+
+def listResources(prefix=None):
     """
     Return list of all stored resources.
     
     Data is returned as dictionary keyed by resource name.
     For each resource the complete URI, the name and the description
     are returned.
-    
+
+    @param prefix:  If specified, only resources with names that start
+                    with this prefix are returned.
+    @type  prefix:  string
+
     @return: Dictionary of available resources.
     @rtype:  dict
     
     """
-    dir_list = STORAGE_OBJECT.listResourcesInStorage()
+    entries, names = _selectResources(prefix)
     out = {}
-    for resource_name in dir_list:
-        rname = resource_name.lower()
-        if rname not in EXCLUDED_NAMES  and  rname[0] not in EXCLUDE_PREFIXES:
-            resource_dict = retrieveResourceFromStorage(getResourceUri(resource_name), only_public=True)
-            if resource_dict:
-                out[resource_name] = dict(uri=Url(resource_dict['uri']), desc=resource_dict['desc'])
-            else:
-                out[resource_name] = "Not found"
+    for resource_name in names:
+        out[resource_name] = _resourceInfo(entries[resource_name])
     return out
 
+def listResourcesPage(offset=0, limit=None, prefix=None):
+    """
+    Return a page of the list of stored resources.
+
+    The resources are ordered by name. Since clients may lose the order of
+    a dictionary, the page is returned as a list. It comes with the total
+    number of (matching) resources and the URI of the next page, if there
+    is one:
+
+        {
+            "resources" : [ { "name" : ..., "uri" : ..., "desc" : ... }, ... ],
+            "offset"    : ...,
+            "total"     : ...,
+            "next"      : ... or None
+        }
+
+    @param offset:  Number of resources (of those that match the prefix)
+                    to skip.
+    @type  offset:  int
+
+    @param limit:   Max. number of resources to return, or None for all.
+    @type  limit:   int
+
+    @param prefix:  If specified, only resources with names that start
+                    with this prefix are returned.
+    @type  prefix:  string
+
+    @return: Dictionary with the page of resources and paging information.
+    @rtype:  dict
+
+    """
+    entries, names = _selectResources(prefix)
+    if limit is None:
+        page = names[offset:]
+    else:
+        page = names[offset:offset+limit]
+    resources = list()
+    for resource_name in page:
+        info = _resourceInfo(entries[resource_name])
+        if type(info) is dict:
+            info['name'] = resource_name
+        else:
+            info = dict(name=resource_name, desc=info)
+        resources.append(info)
+    next_offset = offset + len(page)
+    if page  and  next_offset < len(names):
+        query = "offset=%d" % next_offset
+        if limit is not None:
+            query += "&limit=%d" % limit
+        if prefix:
+            query += "&prefix=" + urllib.quote_plus(prefix)
+        next_uri = Url(settings.PREFIX_RESOURCE + "?" + query)
+    else:
+        next_uri = None
+    return dict(resources = resources,
+                offset    = offset,
+                total     = len(names),
+                next      = next_uri)
+
 
 def paramSanityCheck(param_dict, param_def_dict, name_for_errors):
     """
@@ -275,6 +492,91 @@ def convertTypes(param_def_dict, param_dict):
                 raise RestxException("Incompatible type for parameter '%s': %s" % (pname, str(e)))
 
 
+class ParamValidator(object):
+    """
+    A parameter definition, compiled for the fast validation of parameters.
+
+    Performs the work of paramSanityCheck(), fillDefaults() and convertTypes()
+    in a single pass over the provided parameters. Type converters, the list
+    of required parameters and the (already converted) default values are
+    computed once, when the validator is created. Validators are meant to be
+    created once per parameter definition and then used for every request.
+    Each request receives its own copy of mutable (dictionary or list)
+    default values.
+
+    """
+    def __init__(self, param_def_dict, name_for_errors):
+        """
+        Compile a parameter definition.
+
+        @param param_def_dict:  The parameter definition as provided by the component.
+        @type  param_def_dict:  dict
+
+        @param name_for_errors: A section name, which helps to provide meaningful error messages.
+        @type  name_for_errors: string
+
+        """
+        self.name_for_errors = name_for_errors
+        self.converters      = dict()
+        self.required        = list()
+        self.defaults        = list()    # List of (name, default value, converter) tuples
+        for pname, pdict in param_def_dict.items():
+            converter = makeTypeConverter(pdict['type'])
+            self.converters[pname] = converter
+            if pdict['required']:
+                self.required.append(pname)
+            elif pdict['default'] is not None:
+                # Defaults are converted right here. Only if that fails, we
+                # keep the converter around, so that the problem is reported
+                # whenever the default value is actually used.
+                try:
+                    self.defaults.append((pname, converter(pdict['default']), None))
+                except Exception, e:
+                    self.defaults.append((pname, pdict['default'], converter))
+
+    def validate(self, param_dict):
+        """
+        Check a parameter dictionary, convert its values and fill in defaults.
+
+        The dictionary is modified in place. The same checks as in paramSanityCheck()
+        are performed and the same exceptions are raised.
+
+        @param param_dict:      The parameter dictionary provided (for example by the client).
+        @type  param_dict:      dict
+
+        @raise RestxException:  If the parameters are not compatible with the definition.
+
+        """
+        if type(param_dict) is not dict:
+            raise RestxException("The '%s' section has to be a dictionary" % self.name_for_errors)
+        converters = self.converters
+        for pname, param_value in param_dict.items():
+            converter = converters.get(pname)
+            if converter is None:
+                raise RestxException("Unknown parameter in '%s' section: %s" % (self.name_for_errors, pname))
+            try:
+                new_value = converter(param_value)
+            except Exception, e:
+                raise RestxException("Incompatible type for parameter '%s' in section '%s': %s" % \
+                                     (pname, self.name_for_errors, str(e)))
+            if new_value is not param_value:
+                param_dict[pname] = new_value
+
+        for pname in self.required:
+            if pname not in param_dict:
+                raise RestxMandatoryParameterMissingException("Missing mandatory parameter '%s' in section '%s'" % \
+                                                              (pname, self.name_for_errors))
+
+        for pname, default, converter in self.defaults:
+            if pname not in param_dict:
+                if converter:
+                    try:
+                        default = converter(default)
+                    except Exception, e:
+                        raise RestxException("Incompatible type for parameter '%s': %s" % (pname, str(e)))
+                param_dict[pname] = copy_struct(default)
+
+
 def makeResourceFromClass(component_class, params):
     """
     Create a new resource representation from the
@@ -376,7 +678,7 @@ def makeResourceFromClass(component_class, params):
     }
     
     # Storage to our 'database'.
-    STORAGE_OBJECT.writeResourceToStorage(resource_name, resource_def)
+    writeResourceToStorage(resource_uri, resource_def)
 
     # Send a useful message back to the client.
     success_body = {
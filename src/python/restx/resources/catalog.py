@@ -0,0 +1,210 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+
+"""
+An index of all stored resources.
+
+Listing the resources used to mean reading and parsing every stored
+resource definition, just to get its URI and description. The catalog
+keeps this information (and the stamp of each definition) in a single
+stored object, which is updated whenever we write or delete a resource.
+
+When the catalog is first used, it is checked against the stored
+resources: Definitions that are new or whose stamp has changed are read
+again, entries of deleted resources are removed. The same happens if the
+resources are changed by another process (see getEntries()).
+
+"""
+# Python imports
+import threading
+
+# RESTx imports
+from restx.logger import *
+
+CATALOG_VERSION = 1
+
+
+def makeCatalogEntry(resource_def, stamp):
+    """
+    Return the catalog entry for a resource definition.
+
+    @param resource_def:    The complete resource definition.
+    @type  resource_def:    dict
+
+    @param stamp:           The storage stamp of the definition, or None.
+    @type  stamp:           object
+
+    @return:                The catalog entry.
+    @rtype:                 dict
+
+    """
+    public_obj = resource_def['public']
+    if stamp is not None:
+        stamp = list(stamp)     # That's what it looks like after a JSON round trip
+    return dict(uri      = public_obj['uri'],
+                desc     = public_obj['desc'],
+                code_uri = resource_def.get('private', dict()).get('code_uri'),
+                stamp    = stamp)
+
+
+class ResourceCatalog(object):
+    """
+    Catalog of resource name -> uri, desc, code_uri and stamp.
+
+    """
+    def __init__(self, storage, is_resource_name):
+        """
+        Create the catalog. It is loaded when it is first used.
+
+        @param storage:             The resource storage.
+        @type  storage:             ResourceStorage
+
+        @param is_resource_name:    Function that tells us whether a name
+                                    in the storage is that of a resource.
+        @type  is_resource_name:    function
+
+        """
+        self.storage          = storage
+        self.is_resource_name = is_resource_name
+        self.__lock           = threading.Lock()
+        self.__entries        = None
+        self.__generation     = None
+
+    def getEntries(self, generation):
+        """
+        Return the entries of all resources.
+
+        The entry of a resource with a malformed definition only contains
+        its stamp.
+
+        @param generation:  The current resource generation. If it has changed
+                            since the last call, someone may have modified the
+                            resources and the catalog is loaded again.
+        @type  generation:  int
+
+        @return:            Dictionary of resource name -> entry. This is shared,
+                            so it must not be modified by the caller.
+        @rtype:             dict
+
+        """
+        self.__lock.acquire()
+        try:
+            if self.__entries is None:
+                self.__synchronize(self.storage.loadCatalog(), check_stamps=True)
+            elif generation != self.__generation:
+                self.__synchronize(self.storage.loadCatalog(), check_stamps=False)
+            self.__generation = generation
+            return self.__entries
+        finally:
+            self.__lock.release()
+
+    def update(self, resource_name, resource_def):
+        """
+        Add or replace the entry of a resource, which was just written.
+
+        @param resource_name:   Name of the resource.
+        @type  resource_name:   string
+
+        @param resource_def:    The complete resource definition.
+        @type  resource_def:    dict
+
+        """
+        self.__lock.acquire()
+        try:
+            if self.__entries is None:
+                return      # Not loaded yet, the new resource is found then
+            self.__entries = dict(self.__entries)
+            self.__entries[resource_name] = \
+                    makeCatalogEntry(resource_def, self.storage.getResourceStamp(resource_name))
+            self.__store()
+        finally:
+            self.__lock.release()
+
+    def remove(self, resource_name):
+        """
+        Remove the entry of a resource, which was just deleted.
+
+        @param resource_name:   Name of the resource.
+        @type  resource_name:   string
+
+        """
+        self.__lock.acquire()
+        try:
+            if self.__entries is None  or  resource_name not in self.__entries:
+                return
+            self.__entries = dict(self.__entries)
+            del self.__entries[resource_name]
+            self.__store()
+        finally:
+            self.__lock.release()
+
+    def __store(self):
+        """
+        Persist the catalog.
+
+        """
+        try:
+            self.storage.storeCatalog(dict(version=CATALOG_VERSION, resources=self.__entries))
+        except Exception, e:
+            # Not fatal: The catalog is checked against the resources when it's loaded
+            log("Cannot store resource catalog: %s" % str(e), facility=LOGF_RESOURCES)
+
+    def __synchronize(self, catalog, check_stamps):
+        """
+        Bring the catalog in line with the stored resources.
+
+        @param catalog:         The stored catalog, or None.
+        @type  catalog:         dict
+
+        @param check_stamps:    If set, the stamps of all resource definitions
+                                are compared with the ones in the catalog.
+                                Otherwise, only the list of resource names is.
+        @type  check_stamps:    boolean
+
+        """
+        if catalog  and  catalog.get('version') == CATALOG_VERSION:
+            entries = catalog['resources']
+        else:
+            entries = dict()
+        names    = set([ name for name in self.storage.listResourcesInStorage() if self.is_resource_name(name) ])
+        modified = False
+        for name in entries.keys():
+            if name not in names:
+                del entries[name]
+                modified = True
+        for name in names:
+            entry = entries.get(name)
+            if entry is not None  and  not check_stamps:
+                continue
+            stamp = self.storage.getResourceStamp(name)
+            if stamp is not None:
+                stamp = list(stamp)
+                if entry is not None  and  entry['stamp'] == stamp:
+                    continue
+            try:
+                entries[name] = makeCatalogEntry(self.storage.loadResourceFromStorage(name), stamp)
+            except Exception, e:
+                log("Malformed storage for resource '%s': %s" % (name, str(e)), facility=LOGF_RESOURCES)
+                entries[name] = dict(stamp=stamp)
+            modified = True
+        self.__entries = entries
+        if modified:
+            self.__store()
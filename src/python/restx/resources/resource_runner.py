@@ -19,39 +19,281 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 
+import time
+import threading
+
 import restxjson as json
 
 import restx.settings as settings
 
+from restx.logger import *
+from restx.cache      import LruCache, MemoCache, copy_struct
+from restx.workerpool import WorkerPool
+
 import restx.core.codebrowser  # Wanted to be much more selective here, but a circular
                              # import issue was most easily resolved like this.
                              # We only need getComponentInstance() from this module.
 
 from org.mulesoft.restx.exception import *
-from org.mulesoft.restx.component.api import HTTP, Result
-from restx.resources  import paramSanityCheck, fillDefaults, convertTypes, \
-                           retrieveResourceFromStorage, getResourceUri
+from org.mulesoft.restx.component.api import HTTP, HttpMethod, Result
+from restx.resources  import ParamValidator, retrieveResourceFromStorage, getResourceUri, getResourceGeneration, \
+                           loadResource
 
 from restx.languages import *
 
+from restx.httpabstraction.base_server  import isStreamedEntity
+from restx.fileentity                   import isFileEntity
+
 from restx.components.base_capabilities import BaseCapabilities
 
 
-def _accessComponentService(component, services, complete_resource_def, resource_name, service_name,
+class _ServicePlan(object):
+    """
+    Precomputed information about the services of a resource.
+
+    Getting the service definitions of a resource requires the instantiation
+    of the component, a deep copy of its service definitions and the conversion
+    of all parameter definitions to plain dictionaries (as well as a conversion
+    to Python structures for components in other languages). None of that
+    changes as long as the resource definition remains the same, so we do it
+    once and keep the result.
+
+    A plan is shared by all requests to the resource. Its contents must
+    therefore be treated as read-only.
+
+    The plan also holds the pool of component instances for components that
+    declare themselves poolable. Pooled instances have the resource creation
+    time parameters bound already and are reused across requests. When they
+    are returned to the pool, their per-request state (request and base
+    capabilities) is reset. Since a new plan is computed whenever the resource
+    definition changes, the pool never hands out outdated instances.
+
+    """
+    def __init__(self, resource_def, code_uri, resource_name):
+        """
+        Compute the service plan for a resource.
+
+        @param resource_def:    The (shared) resource definition from which the
+                                plan is computed. As long as the resource cache
+                                hands out this very definition object, the plan
+                                remains valid.
+        @type  resource_def:    dict
+
+        @param code_uri:        The URI of the resource's component.
+        @type  code_uri:        string
+
+        @param resource_name:   Name of the resource.
+        @type  resource_name:   string
+
+        """
+        self.resource_def      = resource_def
+        self.code_uri          = code_uri
+        self.resource_name     = resource_name
+        self.resource_home_uri = getResourceUri(resource_name)
+        component              = restx.core.codebrowser.getComponentInstance(code_uri, resource_name)
+        if not component:
+            raise RestxResourceNotFoundException("Unknown component for resource '%s'" % resource_name)
+        services               = component._getServices(self.resource_home_uri)
+        self.services          = languageStructToPython(component, services)
+
+        # Per service: The positional parameter names, the parameter definitions
+        # and a validator for the runtime parameters (only for services that
+        # define parameters).
+        self.positional_params = dict()
+        self.param_defs        = dict()
+        self.validators        = dict()
+        if self.services:
+            for name, service_def in self.services.items():
+                self.positional_params[name] = service_def.get('positional_params')
+                param_defs                   = service_def.get('params')
+                self.param_defs[name]        = param_defs
+                if param_defs:
+                    self.validators[name] = ParamValidator(param_defs, "runtime parameter")
+
+        # Components are pooled only if they ask for it. Runtime parameters with
+        # the same name as a creation time parameter would overwrite the bound
+        # attribute of the instance, so such components are not pooled either.
+        self.poolable = component.isPoolable()
+        if self.poolable:
+            creation_param_names = resource_def['private']['params'].keys()
+            for param_defs in self.param_defs.values():
+                if param_defs:
+                    for name in creation_param_names:
+                        if name in param_defs:
+                            self.poolable = False
+        self.__pool      = list()
+        self.__pool_lock = threading.Lock()
+        if self.poolable:
+            # The instance we just created can be the first one in the pool
+            self.releaseComponent(self.__bindComponent(component), True)
+
+    def __bindComponent(self, component):
+        """
+        Assign the resource creation time parameters to a new pooled instance.
+
+        """
+        bindCreationParams(component, dict(self.resource_def['private']['params']))
+        return component
+
+    def acquireComponent(self):
+        """
+        Return a component instance for the processing of a request.
+
+        Pooled instances are taken from the pool, if one is available. The
+        instance has to be given back with releaseComponent() when the
+        request is done.
+
+        @return:   Tuple with the component instance and a flag, which indicates
+                   whether the resource creation time parameters are bound
+                   already (only for pooled instances).
+        @rtype:    tuple
+
+        """
+        if self.poolable:
+            self.__pool_lock.acquire()
+            try:
+                if self.__pool:
+                    return self.__pool.pop(), True
+            finally:
+                self.__pool_lock.release()
+        component = restx.core.codebrowser.getComponentInstance(self.code_uri, self.resource_name)
+        if not component:
+            raise RestxResourceNotFoundException("Unknown component for resource '%s'" % self.resource_name)
+        if self.poolable:
+            return self.__bindComponent(component), True
+        return component, False
+
+    def releaseComponent(self, component, pooled):
+        """
+        Hand a component instance back after the request is done.
+
+        @param component:   The component instance, as returned by acquireComponent().
+        @type  component:   BaseComponent
+
+        @param pooled:      The flag, as returned by acquireComponent().
+        @type  pooled:      boolean
+
+        """
+        if not pooled:
+            return
+        component.resetRequestState()
+        self.__pool_lock.acquire()
+        try:
+            if len(self.__pool) < settings.COMPONENT_POOL_SIZE:
+                self.__pool.append(component)
+        finally:
+            self.__pool_lock.release()
+
+
+#
+# Service plans, keyed by code URI and resource name.
+#
+_SERVICE_PLANS = LruCache(settings.SERVICE_PLAN_CACHE_SIZE, name="service_plans")
+
+def _getServicePlan(resource_def, code_uri, resource_name):
+    """
+    Return the service plan for a resource, computing it if necessary.
+
+    @param resource_def:    The shared resource definition, as it is returned
+                            by the resource cache.
+    @type  resource_def:    dict
+
+    @param code_uri:        The URI of the resource's component.
+    @type  code_uri:        string
+
+    @param resource_name:   Name of the resource.
+    @type  resource_name:   string
+
+    @return:                The service plan.
+    @rtype:                 _ServicePlan
+
+    """
+    key  = (code_uri, resource_name)
+    plan = _SERVICE_PLANS.get(key, lambda plan: plan.resource_def is resource_def)
+    if not plan:
+        plan = _ServicePlan(resource_def, code_uri, resource_name)
+        _SERVICE_PLANS.put(key, plan)
+    return plan
+
+
+#
+# Memoized results of services that declare a 'cache' entry, keyed by
+# resource name, service name and the relevant parameter values.
+#
+_SERVICE_RESULTS = MemoCache(settings.SERVICE_RESULT_CACHE_SIZE, name="service_results",
+                             wait_timeout=settings.SERVICE_RESULT_WAIT_TIMEOUT)
+
+def _freezeValue(value):
+    """
+    Return a hashable representation of a parameter value.
+
+    """
+    value_type = type(value)
+    if value_type is dict:
+        items = [ (k, _freezeValue(v)) for k, v in value.items() ]
+        items.sort()
+        return tuple(items)
+    elif value_type is list:
+        return tuple([ _freezeValue(v) for v in value ])
+    return value
+
+def _serviceResultKey(resource_name, service_name, param_dict, vary):
+    """
+    Return the key under which the result of a service call is memoized.
+
+    @param resource_name:   Name of the resource.
+    @type  resource_name:   string
+
+    @param service_name:    Name of the service.
+    @type  service_name:    string
+
+    @param param_dict:      The (validated) runtime parameters of the call.
+    @type  param_dict:      dict
+
+    @param vary:            Names of the parameters on which the result depends.
+                            If not specified, all runtime parameters are used.
+    @type  vary:            list
+
+    @return:                The key.
+    @rtype:                 tuple
+
+    """
+    if vary is None:
+        names = param_dict.keys()
+        names.sort()
+    else:
+        names = vary
+    return (resource_name, service_name,
+            tuple([ (name, _freezeValue(param_dict.get(name))) for name in names ]))
+
+def _isCacheableCall(service_def, method, input):
+    """
+    Return True if the result of a service call may be memoized.
+
+    Only services with a 'cache' entry that contains a 'ttl' qualify,
+    and only for GET requests without a request body.
+
+    """
+    cache_def = service_def.get('cache')
+    if not cache_def  or  not cache_def.get('ttl'):
+        return False
+    if input:
+        return False
+    return method is None  or  method == HttpMethod.GET  or  method == HTTP.GET_METHOD
+
+
+def _accessComponentService(plan, complete_resource_def, resource_name, service_name,
                             positional_params, runtime_param_dict, input, request=None, method=None, direct_call=False):
     """
     Passes control to a service method exposed by a component.
     
-    @param component:             An instance of the component.
-    @type component:              BaseComponent (object of child class)
-    
-    @param services:              Dictionary of services definitions for this component. Can be had
-                                  by calling _getServices() on the component. But we would need the
-                                  resource's base URI to get those URIs exported properly. Since
-                                  we already did this call in process() from where we called this
-                                  method, we just pass the services dictionary in, rather than
-                                  calling _getServices() again.
-    @param services:              dict
+    @param plan:                  The service plan of the resource. It contains the service
+                                  definitions of the component, the positional parameter names
+                                  and the precompiled validators for the runtime parameters of
+                                  each service. The component instance is taken from the plan
+                                  as well. This was already computed in _getResourceDetails(),
+                                  so we just pass it in.
+    @type plan:                   _ServicePlan
     
     @param complete_resource_def: The entire resource definition as it was retrieved from storage.
     @type complete_resource_def:  dict
@@ -69,8 +311,10 @@ def _accessComponentService(component, services, complete_resource_def, resource
     @param runtime_param_dict:    Dictionary of URL command line arguments.
     @type runtime_param_dict:     dict
     
-    @param input:                 Any potential input (came in the request body)
-    @type input:                  string
+    @param input:                 Any potential input (came in the request body). For services
+                                  that specify 'stream_input', this is a file-like object from
+                                  which the request body can be read.
+    @type input:                  string or RequestBodyReader
 
     @param request:               HTTP request structure.
     @type request:                RestxHttpRequest
@@ -90,7 +334,7 @@ def _accessComponentService(component, services, complete_resource_def, resource
     
     """
     try:
-        service_def = services.get(service_name)
+        service_def = plan.services.get(service_name)
         if not service_def:
             raise RestxException("Service '%s' is not available in this resource." % service_name)
 
@@ -119,10 +363,7 @@ def _accessComponentService(component, services, complete_resource_def, resource
         # method, which could possibly use a complete 
         #
         if positional_params:
-            try:
-                pos_param_def = complete_resource_def['public']['services'][service_name]['positional_params']
-            except Exception, e:
-                pos_param_def = None
+            pos_param_def = plan.positional_params.get(service_name)
             if pos_param_def:
                 # Iterating over all the positional parameters that are provided in the URI
                 # There might be some empty ones (when the URL has two // in a row or ends
@@ -142,14 +383,17 @@ def _accessComponentService(component, services, complete_resource_def, resource
                         # else is in the URL
                         break
             
-        runtime_param_def  = service_def.get('params')
-        if runtime_param_def:
+        # Streamed input is passed on to the service untouched
+        stream_input = service_def.get('stream_input')
+
+        validator = plan.validators.get(service_name)
+        if validator:
             # If the 'allow_params_in_body' flag is set for a service then we
             # allow runtime parameters to be passed in the request body PUT or POST.
             # So, if the URL command line parameters are not specified then we
             # should take the runtime parameters out of the body.
             # Sanity checking and filling in of defaults for the runtime parameters
-            if service_def.get('allow_params_in_body')  and  input:
+            if service_def.get('allow_params_in_body')  and  input  and  not stream_input:
                 # Take the base definition of the parameters from the request body
                 try:
                     base_params = json.loads(input.strip())
@@ -164,16 +408,66 @@ def _accessComponentService(component, services, complete_resource_def, resource
                     if name not in runtime_param_dict:
                         runtime_param_dict[name] = value
 
-            paramSanityCheck(runtime_param_dict, runtime_param_def, "runtime parameter")
-            fillDefaults(runtime_param_def, runtime_param_dict)
-            convertTypes(runtime_param_def, runtime_param_dict)
-    
-        services = complete_resource_def['public']['services']
-        if service_name in services  and  hasattr(component, service_name):
+            # Sanity check, type conversion and filling in of defaults, all
+            # done in a single pass with the precompiled validator.
+            validator.validate(runtime_param_dict)
+
+        if _isCacheableCall(service_def, method, input):
+            #
+            # The service declared that its results stay valid for a while.
+            # Identical calls are answered from the memo cache, without ever
+            # touching the component. Only successful, complete results are
+            # cached. Each call gets its own copy of the stored result, since
+            # the caller may add headers or modify the data. A new service
+            # plan (the resource was changed) makes all old results stale.
+            #
+            cache_def = service_def['cache']
+            key       = _serviceResultKey(resource_name, service_name,
+                                          runtime_param_dict, cache_def.get('vary'))
+            def compute():
+                result    = __callService(plan, complete_resource_def, service_name, stream_input,
+                                          runtime_param_dict, input, request, method)
+                entity    = result.getEntity()
+                cacheable = result.getStatus() == HTTP.OK  and  not isStreamedEntity(entity)  and \
+                            not isFileEntity(entity)
+                headers   = dict()
+                for name in result.getHeaders().keySet():
+                    headers[name] = result.getHeaders().get(name)
+                return (plan, result.getStatus(), entity, headers), cacheable
+            memo   = _SERVICE_RESULTS.call(key, cache_def['ttl'], compute, lambda memo: memo[0] is plan)
+            result = Result(memo[1], copy_struct(memo[2]))
+            for name, value in memo[3].items():
+                result.addHeader(name, value)
+            return result
+
+        return __callService(plan, complete_resource_def, service_name, stream_input,
+                             runtime_param_dict, input, request, method)
+    except RestxException, e:
+        if direct_call:
+            raise Exception(e.msg)
+        else:
+            raise e
+
+
+def __callService(plan, complete_resource_def, service_name, stream_input,
+                  runtime_param_dict, input, request, method):
+    """
+    Call a service method on a component instance of the resource.
+
+    The parameters have been checked already, see _accessComponentService().
+
+    @return                       HTTP result structure
+    @rtype                        Result
+
+    """
+    component, pooled = plan.acquireComponent()
+    try:
+        if hasattr(component, service_name):
             service_method = getattr(component, service_name)
             
-            # Get the parameters from the resource definition time
-            params = complete_resource_def['private']['params']
+            # Get the parameters from the resource definition time. We work on
+            # a copy, so that the resource definition itself is not modified.
+            params = dict(complete_resource_def['private']['params'])
 
             if runtime_param_dict:
                 # Merge the runtime parameters with the static parameters
@@ -184,7 +478,7 @@ def _accessComponentService(component, services, complete_resource_def, resource
             
             # A request header may tell us about the request body type. If it's
             # JSON then we first convert this to a plain object
-            if request:
+            if request  and  not stream_input:
                 req_headers = request.getRequestHeaders()
                 if req_headers:
                     ct = req_headers.get("Content-type")
@@ -193,15 +487,12 @@ def _accessComponentService(component, services, complete_resource_def, resource
                             input = json.loads(input)
 
             result = serviceMethodProxy(component, service_method, service_name, request,
-                                        input, params, method)
+                                        input, params, method, pooled)
             return result
         else:
             raise RestxException("Service '%s' is not exposed by this resource." % service_name)
-    except RestxException, e:
-        if direct_call:
-            raise Exception(e.msg)
-        else:
-            raise e
+    finally:
+        plan.releaseComponent(component, pooled)
 
 
 def _getResourceDetails(resource_name):
@@ -209,6 +500,10 @@ def _getResourceDetails(resource_name):
     Extract and compute a number of importants facts about a resource.
     
     The information is returned as a dictionary.
+
+    The resource definitions in the returned dictionary, including the
+    service definitions taken from the service plan, are a private copy
+    for the caller.
     
     @param resource_name:    The name of the resource.
     @type resource_name:     string
@@ -217,25 +512,26 @@ def _getResourceDetails(resource_name):
     @rtype:                  dict
     
     """
-    complete_resource_def  = retrieveResourceFromStorage(getResourceUri(resource_name))
-    if not complete_resource_def:
+    try:
+        shared_resource_def = loadResource(resource_name)
+    except Exception, e:
+        log("Malformed storage for resource '%s': %s" % (resource_name, str(e)), facility=LOGF_RESOURCES)
         raise RestxResourceNotFoundException("Unknown resource")
-    resource_home_uri      = getResourceUri(resource_name)
-    public_resource_def    = complete_resource_def['public']
-    
-    # Instantiate the component to get the exposed sub-services. Their info
-    # is added to the public information about the resource.
-    code_uri  = complete_resource_def['private']['code_uri']
-    component = restx.core.codebrowser.getComponentInstance(code_uri, resource_name)
-    services  = component._getServices(resource_home_uri)
-    services  = languageStructToPython(component, services)
-    public_resource_def['services'] = services
-    
+
+    code_uri = shared_resource_def['private']['code_uri']
+    plan     = _getServicePlan(shared_resource_def, code_uri, resource_name)
+
+    complete_resource_def = copy_struct(shared_resource_def)
+    public_resource_def   = complete_resource_def['public']
+    public_resource_def['services'] = copy_struct(plan.services)
+
+    # The component instance itself is only needed when a service is accessed.
+    # It is then taken from the plan (see _accessComponentService()).
     return dict(complete_resource_def = complete_resource_def,
-                resource_home_uri     = resource_home_uri,
+                resource_home_uri     = plan.resource_home_uri,
                 public_resource_def   = public_resource_def,
                 code_uri              = code_uri,
-                component             = component)
+                plan                  = plan)
 
      
 def accessResource(resource_uri, input=None, params=None, method=HTTP.GET):
@@ -258,7 +554,28 @@ def accessResource(resource_uri, input=None, params=None, method=HTTP.GET):
     
     @param method:           The HTTP method to be used.
     @type method:            HttpMethod
+
+    @return:                 Tuple of status and data. For services that stream their
+                             results the data is an iterator.
+    @rtype:                  tuple
     
+    """
+    return _accessResource(resource_uri, input, params, method, True)
+
+
+def _accessResource(resource_uri, input, params, method, direct_call):
+    """
+    Access a resource identified by its URI, see accessResource().
+
+    @param direct_call:      If set, exceptions are raised the same way as
+                             for calls from within a component. Otherwise,
+                             RestxExceptions are raised as they are, so that
+                             their status code is known.
+    @type direct_call:       boolean
+
+    @return:                 Tuple of status and data.
+    @rtype:                  tuple
+
     """
     if not resource_uri.startswith(settings.PREFIX_RESOURCE + "/"):
         raise Exception("Malformed resource name. Needs to be absolute or start with '%s'" % settings.PREFIX_RESOURCE)
@@ -279,9 +596,270 @@ def accessResource(resource_uri, input=None, params=None, method=HTTP.GET):
     if params is None:
         params = dict()
     
-    result = _accessComponentService(rinfo['component'], rinfo['public_resource_def']['services'],
+    result = _accessComponentService(rinfo['plan'],
                                      rinfo['complete_resource_def'], resource_name,
-                                     service_name, positional_params, params, input, None, method, True)
+                                     service_name, positional_params, params, input, None, method,
+                                     direct_call)
     return result.getStatus(), result.getEntity()
- 
- 
+
+
+class ResourceHandle(object):
+    """
+    A resolved resource, which can be accessed repeatedly at little cost.
+
+    accessResource() has to look up the resource definition and the service
+    plan of the resource for every call. A handle does this once and then
+    keeps them. They are only looked up again after a resource definition
+    was created, changed or deleted on this server (see getResourceGeneration()).
+
+    Obtain handles with getResourceHandle() or getServiceHandle().
+
+    """
+    def __init__(self, resource_name):
+        """
+        Resolve a resource.
+
+        @param resource_name:   Name of the resource.
+        @type  resource_name:   string
+
+        """
+        self.resource_name = resource_name
+        self.__state       = None
+        self.__resolve()
+
+    def __resolve(self):
+        """
+        Look up the resource definition and the service plan.
+
+        """
+        # Taken first, so that a change during the lookup is noticed next time
+        generation = getResourceGeneration()
+        try:
+            resource_def = loadResource(self.resource_name)
+        except Exception, e:
+            log("Malformed storage for resource '%s': %s" % (self.resource_name, str(e)), facility=LOGF_RESOURCES)
+            raise RestxResourceNotFoundException("Unknown resource")
+        plan         = _getServicePlan(resource_def, resource_def['private']['code_uri'], self.resource_name)
+        # Replaced as a whole, so that concurrent callers always see a consistent state
+        self.__state = (generation, resource_def, plan)
+
+    def __getState(self):
+        """
+        Return the current generation, resource definition and plan,
+        resolving the resource again if necessary.
+
+        """
+        state = self.__state
+        if state[0] != getResourceGeneration():
+            self.__resolve()
+            state = self.__state
+        return state
+
+    def getServiceNames(self):
+        """
+        Return the names of the services of the resource.
+
+        @return:    List of service names.
+        @rtype:     list
+
+        """
+        generation, resource_def, plan = self.__getState()
+        if not plan.services:
+            return list()
+        return plan.services.keys()
+
+    def getService(self, service_name, positional_params=None):
+        """
+        Return a callable for one of the services of the resource.
+
+        @param service_name:        Name of the service.
+        @type  service_name:        string
+
+        @param positional_params:   Positional parameters, which are passed
+                                    to the service with every call.
+        @type  positional_params:   list
+
+        @return:                    The service handle.
+        @rtype:                     ServiceHandle
+
+        """
+        return ServiceHandle(self, service_name, positional_params)
+
+    def call(self, service_name, params=None, input=None, method=HTTP.GET, positional_params=None):
+        """
+        Access a service of the resource.
+
+        The parameters and the return value are the same as for accessResource().
+
+        """
+        generation, resource_def, plan = self.__getState()
+        if params is None:
+            params = dict()
+        else:
+            # The caller's dictionary is not modified
+            params = dict(params)
+        result = _accessComponentService(plan, resource_def, self.resource_name, service_name,
+                                         positional_params or [], params, input, None, method, True)
+        return result.getStatus(), result.getEntity()
+
+
+class ServiceHandle(object):
+    """
+    A callable for a service of a resource.
+
+    Call it with the runtime parameters, the input and the method (all
+    optional). It returns status and data, just like accessResource():
+
+        search = getServiceHandle("/resource/MySearch/search")
+        status, data = search(params={ "query" : "mule" })
+
+    """
+    def __init__(self, resource_handle, service_name, positional_params=None):
+        self.resource_handle   = resource_handle
+        self.service_name      = service_name
+        self.positional_params = positional_params
+
+    def __call__(self, params=None, input=None, method=HTTP.GET):
+        return self.resource_handle.call(self.service_name, params, input, method, self.positional_params)
+
+
+#
+# Resource handles, keyed by resource name. Handles refresh themselves when
+# resources change, so they never become invalid in this cache.
+#
+_RESOURCE_HANDLES = LruCache(settings.RESOURCE_HANDLE_CACHE_SIZE, name="resource_handles")
+
+def __splitResourceUri(uri):
+    """
+    Return the path elements of a resource URI after the resource prefix.
+
+    """
+    if not uri.startswith(settings.PREFIX_RESOURCE + "/"):
+        raise Exception("Malformed resource name. Needs to be absolute or start with '%s'" % settings.PREFIX_RESOURCE)
+    return uri[len(settings.PREFIX_RESOURCE)+1:].split("/")
+
+def getResourceHandle(resource_uri):
+    """
+    Return a handle for a resource.
+
+    @param resource_uri:     The URI of the resource ("/resource/<name>").
+    @type resource_uri:      string
+
+    @return:                 The resource handle.
+    @rtype:                  ResourceHandle
+
+    """
+    resource_name = __splitResourceUri(resource_uri)[0]
+    handle        = _RESOURCE_HANDLES.get(resource_name)
+    if not handle:
+        handle = ResourceHandle(resource_name)
+        _RESOURCE_HANDLES.put(resource_name, handle)
+    return handle
+
+def getServiceHandle(service_uri):
+    """
+    Return a handle for a service of a resource.
+
+    @param service_uri:      The URI of the service, as for accessResource():
+                             Resource name, service name and any positional
+                             parameters.
+    @type service_uri:       string
+
+    @return:                 The service handle.
+    @rtype:                  ServiceHandle
+
+    """
+    path_components = __splitResourceUri(service_uri)
+    if len(path_components) < 2:
+        raise RestxBadRequestException("Service method missing")
+    handle = getResourceHandle(settings.PREFIX_RESOURCE + "/" + path_components[0])
+    return handle.getService(path_components[1], path_components[2:])
+
+
+#
+# The worker threads for accessResources()
+#
+_BATCH_WORKERS = WorkerPool(settings.BATCH_ACCESS_THREADS, name="batch_workers")
+
+def accessResources(access_requests, timeout=None):
+    """
+    Access several resources at the same time.
+
+    Each access request is processed as if accessResource() was called
+    for it, but the requests are processed concurrently by a bounded pool
+    of worker threads. The results are returned in the order of the
+    requests, once all of them are done (or have timed out).
+
+    A failure of one request doesn't affect the others: If an exception
+    is raised while processing a request, its result contains the status
+    code of the exception (for example 404 for an unknown resource, or 500)
+    and the error message.
+
+    The timeout applies to each request, counted from the time the batch was
+    submitted. If a request did not finish within the timeout, its status is
+    504 (gateway timeout). It may still complete in the background, but its
+    result is dropped. Requests that were not even started by then (because
+    all workers are busy) are cancelled.
+
+    Without a timeout, requests that have not been started by a worker are
+    processed by the calling thread, when we get to them. With a timeout,
+    all requests are processed by the workers, since a request run by the
+    calling thread could not be abandoned at the timeout.
+
+    Example:
+
+        results = accessResources([ "/resource/MyWeather/current",
+                                    ("/resource/MySearch/search", { "query" : "mule" }) ])
+        for status, data in results:
+            ...
+
+    @param access_requests:  List of access requests. Each one is either a
+                             resource URI or a tuple of URI and, optionally,
+                             params, input and method (in that order). Note
+                             that accessResource() takes input before params.
+    @type access_requests:   list
+
+    @param timeout:          Max. number of seconds to wait for each result,
+                             or None to wait as long as it takes.
+    @type timeout:           float
+
+    @return:                 List of status and data tuples.
+    @rtype:                  list
+
+    """
+    jobs = list()
+    for req in access_requests:
+        if type(req) in [ str, unicode ]:
+            req = (req,)
+        uri    = req[0]
+        params = len(req) > 1  and  req[1]  or  None
+        input  = len(req) > 2  and  req[2]  or  None
+        method = len(req) > 3  and  req[3]  or  HTTP.GET
+        jobs.append(_BATCH_WORKERS.submit(_accessResource, uri, input, params, method, False))
+
+    if timeout is not None:
+        deadline = time.time() + timeout
+    results = list()
+    for job in jobs:
+        if timeout is None:
+            # Jobs that have not been started by a worker yet are run in this
+            # thread, so that we make progress even if all workers are busy.
+            done = job.runOrWait()
+        else:
+            done = job.wait(max(0, deadline - time.time()))
+            if not done  and  job.claim():
+                # Not started yet: No worker will run it now
+                log("Batch access of '%s' cancelled, it was not started within %s seconds" % \
+                    (job.args[0], timeout), facility=LOGF_COMPONENTS)
+        if not done:
+            results.append((HTTP.GATEWAY_TIMEOUT, "Timed out after %s seconds" % timeout))
+        elif job.error:
+            e = job.error[1]
+            if isinstance(e, RestxException):
+                results.append((e.code, e.msg))
+            else:
+                log("Exception in batch access of '%s': %s" % (job.args[0], str(e)), facility=LOGF_COMPONENTS)
+                results.append((HTTP.INTERNAL_SERVER_ERROR, str(e)))
+        else:
+            results.append(job.result)
+    return results
@@ -38,6 +38,48 @@ STORAGEDB_LOCATION  = "storageDB/"
 CONF_LOCATION       = "conf/"
 ROOT_DIR            = ""
 
+RESOURCE_CACHE_SIZE = 1000             # Max. number of parsed resource definitions kept in memory
+SERVICE_PLAN_CACHE_SIZE = 1000         # Max. number of precomputed resource service plans
+COMPONENT_POOL_SIZE = 10               # Max. number of idle instances kept per resource for poolable components
+MAX_REQUEST_BODY_SIZE = 64*1024*1024   # Max. size of a request body in bytes (0 means: no limit)
+REQUEST_BODY_CHUNK_SIZE = 64*1024      # Request bodies are read in chunks of this size
+RESPONSE_CHUNK_SIZE = 64*1024          # Streamed responses are sent in chunks of (roughly) this size
+RESPONSE_CACHE_SIZE = 1000             # Max. number of rendered GET responses kept in memory (0 means: no caching)
+RESPONSE_CACHE_TTL = 60                # Seconds for which code, meta, static and resource descriptions are cached
+RESPONSE_COMPRESSION = True            # Compress responses for clients that accept gzip or deflate
+RESPONSE_COMPRESSION_LEVEL = 6         # zlib compression level (1: fastest ... 9: smallest)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024   # Smaller responses are sent uncompressed
+COMPRESSED_FILE_CACHE_SIZE = 200       # Max. number of compressed variants of files kept in memory
+COMPRESSED_FILE_MAX_SIZE = 1024*1024   # Larger files are sent uncompressed
+SERVICE_RESULT_CACHE_SIZE = 1000       # Max. number of memoized results of services that declare a 'cache' entry
+SERVICE_RESULT_WAIT_TIMEOUT = 10       # Seconds to wait for a concurrent call of a memoized service, then call it again
+HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST = 10  # Max. number of outgoing connections per host (httpGet/httpPost)
+HTTP_CLIENT_CONNECT_TIMEOUT = 10       # Seconds to wait for an outgoing connection
+HTTP_CLIENT_READ_TIMEOUT = 60          # Seconds to wait for data on an outgoing connection
+HTTP_CLIENT_IDLE_TIMEOUT = 30          # Idle outgoing connections are not reused after this many seconds
+DNS_CACHE_TTL = 300                    # Seconds for which resolved host names are kept
+BATCH_ACCESS_THREADS = 20              # Max. number of worker threads for accessResources()
+RESOURCE_HANDLE_CACHE_SIZE = 1000      # Max. number of resource handles kept for getResourceHandle()
+SERVER_EXECUTOR = "bounded"            # Request threads of the Jython server: "cached", "fixed" or "bounded"
+SERVER_THREADS = 50                    # Number of request threads ("fixed"/"bounded" executors, Python and async servers)
+SERVER_QUEUE_SIZE = 200                # Max. number of queued requests ("bounded" executor), others get a 503
+SERVER_BACKLOG = 128                   # Listen backlog of the server socket
+SERVER_RETRY_AFTER = 5                 # Seconds sent in the Retry-After header of 503 responses
+SERVER_PROCESSES = 1                   # Worker processes of the Python server (more than 1: pre-fork mode)
+SERVER_SHUTDOWN_TIMEOUT = 30           # Seconds a stopping worker process waits for running requests
+RESOURCE_SYNC_INTERVAL = 1             # Seconds between checks for resource changes by other processes (0: no checks)
+SERVER_KEEPALIVE_TIMEOUT = 15          # Seconds after which idle keep-alive connections are closed
+ASYNC_SERVER_MAX_CONNECTIONS = 10000   # Max. number of open connections of the async server
+ASYNC_SERVER_OUTPUT_BUFFER = 256*1024  # Bytes queued per connection before a streaming worker has to wait
+STORAGE_FSYNC = "never"                # Sync stored files to disk: "always", "periodic" or "never"
+STORAGE_FSYNC_INTERVAL = 5             # Seconds between syncs in "periodic" mode
+STORAGE_WRITE_BEHIND = False           # Queue stored files and write them in the background
+STORAGE_WRITE_BEHIND_DELAY = 0.5       # Seconds a queued file waits, so that rapid overwrites are coalesced
+STORAGE_LAYOUT = "flat"                # Layout of storageDB: "flat" or "sharded" (run migrate_storage.py when changing)
+STORAGE_BACKEND = "files"              # Storage of component data: "files" (see STORAGE_LAYOUT) or "log" (single file)
+STORAGE_LOG_COMPACT_RATIO = 0.5        # The "log" storage is compacted when this fraction of it is overwritten data
+STORAGE_LOG_MIN_SIZE = 4*1024*1024     # Bytes below which the "log" storage is never compacted
+
 DOC_FILE_NAME       = "DOC"
 VERSION_FILE_NAME   = "VERSION"
 
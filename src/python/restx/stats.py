@@ -0,0 +1,63 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Run-time statistics.
+
+Caches, pools and other parts of the server register a provider
+function here. The providers are called whenever someone asks for
+the current statistics, for example via the /meta/stats URI.
+
+"""
+
+_PROVIDERS = dict()
+
+def register_stats_provider(name, provider):
+    """
+    Register a function that returns statistics for a subsystem.
+
+    A provider registered under an existing name replaces the old one.
+
+    @param name:       Name under which the statistics are reported.
+    @type  name:       string
+
+    @param provider:   Function without arguments, which returns a
+                       dictionary with the current statistics.
+    @type  provider:   function
+
+    """
+    _PROVIDERS[name] = provider
+
+def get_stats():
+    """
+    Return the current statistics of all registered subsystems.
+
+    @return:    Dictionary keyed by subsystem name.
+    @rtype:     dict
+
+    """
+    out = dict()
+    for name, provider in _PROVIDERS.items():
+        try:
+            out[name] = provider()
+        except Exception, e:
+            out[name] = "Not available: %s" % str(e)
+    return out
+
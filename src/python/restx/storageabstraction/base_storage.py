@@ -54,6 +54,32 @@ class BaseStorage(object):
         """
         pass
 
+    def replaceFile(self, file_name, data):
+        """
+        Store the specified file, replacing any previous version atomically.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param data:         Buffer containing the file contents.
+        @type data:          string
+
+        """
+        pass
+
+    def storeFileFromStream(self, file_name, stream):
+        """
+        Store the data read from a stream in the specified file.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param stream:       File-like object from which the data is read.
+        @type stream:        RequestBodyReader (or any object with read())
+
+        """
+        pass
+
     def deleteFile(self, file_name):
         """
         Delete the specified file from storage.
@@ -88,6 +114,23 @@ class BaseStorage(object):
         """
         pass
 
+    def getResourceStamp(self, resource_name):
+        """
+        Return a stamp that changes whenever the stored resource changes.
+
+        Callers that cache a parsed resource definition can compare the
+        stamp to find out whether their copy is still current.
+
+        @param resource_name:    Name of the selected resource.
+        @type resource_name:     string
+
+        @return                  Some comparable value or None if the
+                                 storage cannot provide such a stamp.
+        @rtype                   object
+
+        """
+        pass
+
     def deleteResourceFromStorage(self, resource_name):
         """
         Delete the specified resource from storage.
@@ -108,6 +151,27 @@ class BaseStorage(object):
         """
         pass
 
+    def loadCatalog(self):
+        """
+        Load the resource catalog (see restx.resources.catalog).
+
+        @return                  The catalog or None if there is no
+                                 stored catalog.
+        @rtype                   dict
+
+        """
+        pass
+
+    def storeCatalog(self, catalog):
+        """
+        Store the resource catalog, replacing the previous one atomically.
+
+        @param catalog:          The catalog.
+        @type catalog:           dict
+
+        """
+        pass
+
     def writeResourceToStorage(self, resource_name, resource_def):
         """
         Store a resource definition.
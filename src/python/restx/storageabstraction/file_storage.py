@@ -1,41 +1,448 @@
 """
-RESTx: Sane, simple and effective data publishing and integration. 
-
-Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
-
-This program is free software: you can redistribute it and/or modify 
-it under the terms of the GNU General Public License as published by 
-the Free Software Foundation, either version 3 of the License, or 
-(at your option) any later version. 
-
-This program is distributed in the hope that it will be useful, 
-but WITHOUT ANY WARRANTY; without even the implied warranty of 
-MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
-GNU General Public License for more details. 
+Base class from which all storage abstractions derive.
 
-You should have received a copy of the GNU General Public License 
-along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+Files are written to a temporary file first, which is then renamed. That
+way, readers never see a partially written file. How much effort is spent
+to make sure that written data is on disk is controlled by STORAGE_FSYNC:
 
-"""
+    "always":   Data is synced to disk before the file is renamed.
+    "periodic": Written files are synced every STORAGE_FSYNC_INTERVAL seconds.
+    "never":    We leave it to the operating system.
 
-"""
-Base class from which all storage abstractions derive.
+Optionally (STORAGE_WRITE_BEHIND), storeFile() only queues the data, which
+is then written by a background thread after STORAGE_WRITE_BEHIND_DELAY
+seconds. Rapid overwrites of the same file are coalesced into a single
+write. Reads see the queued data. The queue is flushed when the process
+exits (or when flushWriteBehind() is called).
 
 """
 
 # Python imports
 import os
+import time
+import atexit
+import threading
 
 # RESTx imports
 import restx.settings as settings
+from restx.logger                     import *
+from restx.stats                      import register_stats_provider
+from restx.fileentity                 import FileEntity
 from org.mulesoft.restx.exception     import *
 from org.mulesoft.restx.component.api import FileStore
 
+
+_TEMP_COUNTER      = [ 0 ]
+_TEMP_COUNTER_LOCK = threading.Lock()
+
+def _makeTempName(name):
+    """
+    Return a unique name for the temporary file, from which 'name' is written.
+
+    The temporary file is in the same directory (rename() doesn't work across
+    file systems) and its name starts with a '.', so that it is not listed.
+
+    """
+    _TEMP_COUNTER_LOCK.acquire()
+    try:
+        _TEMP_COUNTER[0] += 1
+        count = _TEMP_COUNTER[0]
+    finally:
+        _TEMP_COUNTER_LOCK.release()
+    dir_name, base_name = os.path.split(name)
+    return os.path.join(dir_name, ".%s.%d.%d.tmp" % (base_name, os.getpid(), count))
+
+
+def _fsync(f):
+    """
+    Force the data of an open file to disk, if the platform allows it.
+
+    """
+    f.flush()
+    if hasattr(os, "fsync"):
+        try:
+            os.fsync(f.fileno())
+        except (OSError, AttributeError, ValueError):
+            pass
+
+
+class _PeriodicSyncer(object):
+    """
+    Syncs recently written files to disk, every STORAGE_FSYNC_INTERVAL seconds.
+
+    """
+    def __init__(self):
+        self.__lock   = threading.Lock()
+        self.__names  = set()
+        self.__thread = None
+
+    def add(self, name):
+        self.__lock.acquire()
+        try:
+            self.__names.add(name)
+            if not self.__thread:
+                self.__thread = threading.Thread(target=self.__run)
+                self.__thread.setDaemon(True)
+                self.__thread.start()
+        finally:
+            self.__lock.release()
+
+    def sync(self):
+        """
+        Sync all files that were written since the last sync.
+
+        """
+        self.__lock.acquire()
+        try:
+            names        = self.__names
+            self.__names = set()
+        finally:
+            self.__lock.release()
+        for name in names:
+            try:
+                f = open(name, "rb")
+                try:
+                    _fsync(f)
+                finally:
+                    f.close()
+            except IOError:
+                pass        # Deleted or replaced in the meantime
+
+    def __run(self):
+        while True:
+            time.sleep(settings.STORAGE_FSYNC_INTERVAL)
+            self.sync()
+
+_SYNCER = _PeriodicSyncer()
+
+
+def _replaceFile(tmp_name, name):
+    """
+    Rename a temporary file to its final name, replacing an existing file.
+
+    """
+    try:
+        os.rename(tmp_name, name)
+    except OSError:
+        # On Windows, rename() doesn't replace existing files
+        if os.path.exists(name):
+            os.remove(name)
+        os.rename(tmp_name, name)
+
+
+def _writeTempFile(name, data=None, stream=None):
+    """
+    Write new contents for a file into a temporary file next to it.
+
+    @param name:        The full name of the file.
+    @type name:         string
+
+    @param data:        Buffer containing the file contents.
+    @type data:         string
+
+    @param stream:      File-like object from which the contents are read
+                        (in chunks), if no data is specified.
+    @type stream:       RequestBodyReader (or any object with read())
+
+    @return:            Name of the temporary file.
+    @rtype:             string
+
+    """
+    tmp_name = _makeTempName(name)
+    try:
+        f = open(tmp_name, "wb")
+    except IOError, e:
+        # The directory may not exist yet (sharded layouts create them as needed)
+        dir_name = os.path.dirname(name)
+        if e.errno != 2  or  not dir_name  or  os.path.isdir(dir_name):
+            raise
+        try:
+            os.makedirs(dir_name)
+        except OSError:
+            # Maybe someone else was quicker
+            if not os.path.isdir(dir_name):
+                raise
+        f = open(tmp_name, "wb")
+    try:
+        try:
+            if stream is None:
+                f.write(data)
+            else:
+                while True:
+                    chunk = stream.read(settings.REQUEST_BODY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            if settings.STORAGE_FSYNC == "always":
+                _fsync(f)
+        finally:
+            f.close()
+    except:
+        _removeTempFile(tmp_name)
+        raise
+    return tmp_name
+
+
+def _removeTempFile(tmp_name):
+    """
+    Remove a temporary file that is not needed anymore.
+
+    """
+    try:
+        os.remove(tmp_name)
+    except OSError:
+        pass
+
+
+def _commitFile(tmp_name, name):
+    """
+    Give a temporary file (see _writeTempFile()) its final name.
+
+    """
+    try:
+        _replaceFile(tmp_name, name)
+    except:
+        _removeTempFile(tmp_name)
+        raise
+    if settings.STORAGE_FSYNC == "periodic":
+        _SYNCER.add(name)
+
+
+def _writeFile(name, data=None, stream=None):
+    """
+    Atomically replace a file with new contents.
+
+    @param name:        The full name of the file.
+    @type name:         string
+
+    @param data:        Buffer containing the file contents.
+    @type data:         string
+
+    @param stream:      File-like object from which the contents are read
+                        (in chunks), if no data is specified.
+    @type stream:       RequestBodyReader (or any object with read())
+
+    """
+    _commitFile(_writeTempFile(name, data, stream), name)
+
+
+class _WriteBehindQueue(object):
+    """
+    Files whose writing has been deferred.
+
+    A file stays in the queue until it has been written, so that readers
+    find the latest data either here or on disk. If a file is stored again
+    while it is waiting, only the latest data is written.
+
+    Queued data is written to a temporary file first. It only replaces the
+    file if it is still the latest version, which is checked under the same
+    lock that direct writes and deletes use for their rename or removal.
+    Therefore, a delayed write can never overwrite or resurrect a file that
+    was written directly or deleted in the meantime.
+
+    """
+    def __init__(self):
+        self.__cond    = threading.Condition()
+        self.__pending = dict()     # File name -> (data, version)
+        self.__version = 0
+        self.__thread  = None
+        self.writes    = 0          # Files that were written
+        self.coalesced = 0          # Writes that were saved
+
+    def put(self, name, data):
+        self.__cond.acquire()
+        try:
+            if name in self.__pending:
+                self.coalesced += 1
+            self.__version      += 1
+            self.__pending[name] = (data, self.__version)
+            if not self.__thread:
+                self.__thread = threading.Thread(target=self.__run)
+                self.__thread.setDaemon(True)
+                self.__thread.start()
+            self.__cond.notify()
+        finally:
+            self.__cond.release()
+
+    def get(self, name):
+        """
+        Return the queued data for a file, or None.
+
+        """
+        self.__cond.acquire()
+        try:
+            entry = self.__pending.get(name)
+        finally:
+            self.__cond.release()
+        if entry:
+            return entry[0]
+        return None
+
+    def writeNow(self, name, data=None, stream=None):
+        """
+        Write a file right away, replacing any queued version of it.
+
+        @param name:        The full name of the file.
+        @type name:         string
+
+        @param data:        Buffer containing the file contents.
+        @type data:         string
+
+        @param stream:      File-like object from which the contents are read,
+                            if no data is specified.
+        @type stream:       RequestBodyReader (or any object with read())
+
+        """
+        tmp_name = _writeTempFile(name, data, stream)
+        self.__cond.acquire()
+        try:
+            self.__pending.pop(name, None)
+            _commitFile(tmp_name, name)
+        finally:
+            self.__cond.release()
+
+    def delete(self, name):
+        """
+        Delete a file and any queued version of it.
+
+        Raises OSError if the file doesn't exist, unless it was queued.
+
+        @param name:        The full name of the file.
+        @type name:         string
+
+        """
+        self.__cond.acquire()
+        try:
+            queued = self.__pending.pop(name, None) is not None
+            try:
+                os.remove(name)
+            except OSError, e:
+                if e.errno != 2  or  not queued:
+                    raise
+                # It only existed in the write-behind queue
+        finally:
+            self.__cond.release()
+
+    def getStats(self):
+        return dict(queued    = len(self.__pending),
+                    writes    = self.writes,
+                    coalesced = self.coalesced)
+
+    def names(self):
+        self.__cond.acquire()
+        try:
+            return self.__pending.keys()
+        finally:
+            self.__cond.release()
+
+    def flush(self):
+        """
+        Write all queued files now.
+
+        """
+        self.__cond.acquire()
+        try:
+            items = self.__pending.items()
+        finally:
+            self.__cond.release()
+        for name, (data, version) in items:
+            self.__write(name, data, version)
+
+    def flushFile(self, name):
+        """
+        Write a queued file now, if it is in the queue.
+
+        """
+        self.__cond.acquire()
+        try:
+            entry = self.__pending.get(name)
+        finally:
+            self.__cond.release()
+        if entry:
+            self.__write(name, entry[0], entry[1])
+
+    def __write(self, name, data, version):
+        """
+        Write one version of a queued file, unless it has become outdated.
+
+        """
+        try:
+            tmp_name = _writeTempFile(name, data)
+        except Exception, e:
+            log("Cannot write file '%s': %s" % (name, str(e)))
+            tmp_name = None
+        self.__cond.acquire()
+        try:
+            if self.__pending.get(name, (None, None))[1] != version:
+                # Stored again, written directly or deleted in the meantime
+                if tmp_name:
+                    _removeTempFile(tmp_name)
+                return
+            del self.__pending[name]
+            if tmp_name:
+                try:
+                    _commitFile(tmp_name, name)
+                    self.writes += 1
+                except Exception, e:
+                    log("Cannot write file '%s': %s" % (name, str(e)))
+        finally:
+            self.__cond.release()
+
+    def __run(self):
+        while True:
+            self.__cond.acquire()
+            try:
+                while not self.__pending:
+                    self.__cond.wait()
+            finally:
+                self.__cond.release()
+            # Give further writes to the same files a chance to be coalesced
+            time.sleep(settings.STORAGE_WRITE_BEHIND_DELAY)
+            self.flush()
+
+_WRITE_BEHIND = _WriteBehindQueue()
+register_stats_provider("write_behind", _WRITE_BEHIND.getStats)
+
+def pageList(names, offset=0, limit=None):
+    """
+    Sort a list of file names and return the requested page of it.
+
+    @param names:       List of file names.
+    @type names:        list
+
+    @param offset:      Number of names to skip.
+    @type offset:       int
+
+    @param limit:       Max. number of names to return, or None for all.
+    @type limit:        int
+
+    @return:            The selected names.
+    @rtype:             list
+
+    """
+    names.sort()
+    if limit is None:
+        return names[offset:]
+    return names[offset:offset+limit]
+
+
+def flushWriteBehind():
+    """
+    Write all files that are waiting in the write-behind queue.
+
+    """
+    _WRITE_BEHIND.flush()
+
+atexit.register(flushWriteBehind)
+
+
 class FileStorage(FileStore):
     """
     Abstract implementation of the base storage methods.
 
     """
+    WRITE_BEHIND_ALLOWED = True     # Subclasses that need the files on disk right away set this to False
+
     def __init__(self, storage_location, unique_prefix=""):
         """
         The unique prefix is used to create a namespace in a flat bucket.
@@ -43,11 +450,12 @@ class FileStorage(FileStore):
         """
         self.storage_location = storage_location
         self.unique_prefix    = unique_prefix
+        self.write_behind     = settings.STORAGE_WRITE_BEHIND  and  self.WRITE_BEHIND_ALLOWED
 
     def _get_storage_location(self):
         return settings.get_root_dir()+self.storage_location
 
-    def __make_filename(self, file_name):
+    def _make_filename(self, file_name):
         if self.unique_prefix:
             name = "%s/%s__%s" % (self._get_storage_location(), self.unique_prefix, file_name)
         else:
@@ -71,18 +479,86 @@ class FileStorage(FileStore):
         @rtype               string
 
         """
+        name = self._make_filename(file_name)
+        if self.write_behind:
+            buf = _WRITE_BEHIND.get(name)
+            if buf is not None:
+                return buf
         try:
-            f   = open(self.__make_filename(file_name), "r")
+            f   = open(name, "r")
             buf = f.read()
             f.close()
         except Exception, e:
             raise RestxFileNotFoundException("File '%s' could not be found'" % (file_name))
         return buf
 
+    def loadFileEntity(self, file_name):
+        """
+        Return the specified file as a response entity.
+
+        The file is not read into memory. The HTTP backends send it
+        directly to the client.
+
+        @param file_name:    Name of the selected file.
+        @type file_name:     string
+
+        @return              The file entity.
+        @rtype               FileEntity
+
+        """
+        name = self._make_filename(file_name)
+        if self.write_behind:
+            # The entity needs the file on disk
+            _WRITE_BEHIND.flushFile(name)
+        try:
+            return FileEntity(name)
+        except Exception, e:
+            raise RestxFileNotFoundException("File '%s' could not be found'" % (file_name))
+
+    def getFileStamp(self, file_name):
+        """
+        Return modification time and size of the specified file.
+
+        @param file_name:    Name of the selected file.
+        @type file_name:     string
+
+        @return              Tuple of modification time and size or None
+                             if the file does not exist.
+        @rtype               tuple
+
+        """
+        try:
+            st = os.stat(self._make_filename(file_name))
+        except OSError, e:
+            return None
+        return (st.st_mtime, st.st_size)
+
     def storeFile(self, file_name, data):
         """
         Store the specified file in storage.
 
+        The previous version of the file is replaced atomically. With
+        write-behind, the file is written a little later.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param data:         Buffer containing the file contents.
+        @type data:          string
+
+        """
+        name = self._make_filename(file_name)
+        if self.write_behind:
+            _WRITE_BEHIND.put(name, data)
+        else:
+            _writeFile(name, data)
+
+    def replaceFile(self, file_name, data):
+        """
+        Store the specified file, replacing any previous version atomically.
+
+        Unlike storeFile(), this always writes the file right away.
+
         @param file_name:    Name of the file.
         @type file_name:     string
 
@@ -90,9 +566,25 @@ class FileStorage(FileStore):
         @type data:          string
 
         """
-        f = open(self.__make_filename(file_name), "w")
-        f.write(data)
-        f.close()
+        name = self._make_filename(file_name)
+        _WRITE_BEHIND.writeNow(name, data)
+
+    def storeFileFromStream(self, file_name, stream):
+        """
+        Store the data read from a stream in the specified file.
+
+        The data is copied in chunks, so that large files don't have
+        to be held in memory. Streamed data is always written right away.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param stream:       File-like object from which the data is read.
+        @type stream:        RequestBodyReader (or any object with read())
+
+        """
+        name = self._make_filename(file_name)
+        _WRITE_BEHIND.writeNow(name, stream=stream)
 
     def deleteFile(self, file_name):
         """
@@ -102,8 +594,9 @@ class FileStorage(FileStore):
         @type file_name:     string
 
         """
+        name = self._make_filename(file_name)
         try:
-            os.remove(self.__make_filename(file_name))
+            _WRITE_BEHIND.delete(name)
         except OSError, e:
             if e.errno == 2:
                 raise RestxFileNotFoundException(file_name)
@@ -114,23 +607,39 @@ class FileStorage(FileStore):
         except Exception, e:
             raise RestxException("Cannot delete file '%s' (%s)" % (file_name, str(e)))
 
-    def listFiles(self):
+    def listFiles(self, offset=0, limit=None):
         """
         Return list of all files in the storage.
 
+        The names are sorted, so that the list can be retrieved in pages.
+
+        @param offset:           Number of files to skip.
+        @type offset:            int
+
+        @param limit:            Max. number of files to return, or None for all.
+        @type limit:             int
+
         @return:                 List of file names.
         @rtype:                  list
 
         """
         try:
-            dir_list = os.listdir(self._get_storage_location())
+            # Temporary files (see _makeTempName()) start with a '.'
+            dir_list = [ name for name in os.listdir(self._get_storage_location()) if not name.startswith(".") ]
+            if self.write_behind:
+                # Files in the write-behind queue may not have been written yet
+                location = os.path.normpath(self._get_storage_location())
+                for name in _WRITE_BEHIND.names():
+                    dir_name, base_name = os.path.split(name)
+                    if os.path.normpath(dir_name) == location  and  base_name not in dir_list:
+                        dir_list.append(base_name)
             # Need to filter all those out, which are not part of our storage space
             if self.unique_prefix:
-                our_files = [ name for name in dir_list if name.startswith(self.unique_prefix) ]
+                our_files = [ name for name in dir_list if name.startswith(self.unique_prefix + "__") ]
             else:
                 our_files = dir_list
             no_prefix_dir_list = [ self.__remove_filename_prefix(name) for name in our_files ]
-            return no_prefix_dir_list
+            return pageList(no_prefix_dir_list, offset, limit)
         except Exception, e:
             raise RestxException("Problems getting file list from storage: " + str(e))
 
@@ -59,6 +59,60 @@ class GaeStorage(object):
         resource = resources[0]
         return json.loads(resource.data)
 
+    def getResourceStamp(self, resource_name):
+        """
+        Return a stamp that changes whenever the stored resource changes.
+
+        The datastore does not give us a cheap way to detect changes,
+        so resource definitions are never cached under GAE.
+
+        @param resource_name:    Name of the selected resource.
+        @type resource_name:     string
+
+        @return                  Always None.
+        @rtype                   None
+
+        """
+        return None
+
+    def getStorageStamp(self):
+        """
+        Return a stamp that changes whenever any stored resource changes.
+
+        Since resource definitions are never cached under GAE, we don't
+        need to detect any changes.
+
+        @return                  Always None.
+        @rtype                   None
+
+        """
+        return None
+
+    def loadCatalog(self):
+        """
+        Load the resource catalog (see restx.resources.catalog).
+
+        The catalog is not persisted under GAE, it is built from the
+        datastore when it is first needed.
+
+        @return                  Always None.
+        @rtype                   None
+
+        """
+        return None
+
+    def storeCatalog(self, catalog):
+        """
+        Store the resource catalog.
+
+        The catalog is not persisted under GAE.
+
+        @param catalog:          The catalog.
+        @type catalog:           dict
+
+        """
+        pass
+
     def listResourcesInStorage(self):
         """
         Return list of resources which we currently have in storage.
@@ -0,0 +1,537 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+File storage in a single, append-only log file.
+
+One file per stored item wastes disk space (and inodes) when components
+store many small items, and every access pays for opening and closing a
+file. LogStorage keeps all items of all storage spaces in one log file
+instead. Each write appends a record:
+
+    header:     record type, key length, value length and CRC32 of key and
+                value (4 unsigned bytes each, except for the type: 1 byte)
+    key:        '<unique prefix>\\0<file name>'
+    value:      the file contents (empty for deletions)
+
+An in-memory index, which is built by reading the log when it is first
+opened, maps each key to the position of its latest value. A record that
+was cut short by a crash is detected by its length or checksum and is
+removed from the end of the log.
+
+Overwritten and deleted items remain in the log as garbage. Once the
+garbage makes up more than STORAGE_LOG_COMPACT_RATIO of the log (and the
+log is larger than STORAGE_LOG_MIN_SIZE), the live items are
+copied into a new log file, which then replaces the old one.
+
+Since the index is kept in memory, only one server process may use the
+log file at a time (SERVER_PROCESSES must be 1).
+
+"""
+# Python imports
+import os
+import zlib
+import struct
+import tempfile
+import threading
+
+# RESTx imports
+import restx.settings as settings
+from restx.logger                          import *
+from restx.stats                           import register_stats_provider
+from restx.storageabstraction.file_storage import pageList, _makeTempName, _replaceFile, _fsync, _SYNCER
+from org.mulesoft.restx.exception          import *
+from org.mulesoft.restx.component.api      import FileStore
+
+
+_HEADER_FORMAT = ">BIII"
+_HEADER_SIZE   = struct.calcsize(_HEADER_FORMAT)
+_OP_STORE      = 1
+_OP_DELETE     = 2
+
+_COPY_CHUNK_SIZE = 64*1024
+
+
+def _makeKey(unique_prefix, file_name):
+    """
+    Return the key under which a file is stored in the log.
+
+    """
+    if isinstance(file_name, unicode):
+        file_name = file_name.encode("utf-8")
+    if isinstance(unique_prefix, unicode):
+        unique_prefix = unique_prefix.encode("utf-8")
+    return "%s\0%s" % (unique_prefix, file_name)
+
+
+class _StorageLog(object):
+    """
+    A log file and its index.
+
+    All LogStorage objects that use the same log file share one of these.
+
+    """
+    def __init__(self, name):
+        """
+        Open the log file, create it if it doesn't exist yet, and build the index.
+
+        Raises a RestxException if there is more than one server process.
+
+        @param name:    The full name of the log file.
+        @type name:     string
+
+        """
+        if settings.SERVER_PROCESSES > 1:
+            raise RestxException("The storage log '%s' can only be used by a single server process" % name)
+        self.name          = name
+        self.compactions   = 0
+        self.__lock        = threading.Lock()
+        self.__index       = dict()     # Unique prefix -> { file name : (value offset, value length, record length) }
+        self.__size        = 0          # End of the last complete record
+        self.__garbage     = 0          # Bytes used by overwritten or deleted records
+        self.__file        = None
+        dir_name = os.path.dirname(name)
+        if dir_name  and  not os.path.isdir(dir_name):
+            os.makedirs(dir_name)
+        if not os.path.exists(name):
+            open(name, "ab").close()
+        self.__file = open(name, "r+b")
+        self.__load()
+
+    def __load(self):
+        """
+        Read all records of the log into the index.
+
+        """
+        f      = self.__file
+        offset = 0
+        f.seek(0)
+        while True:
+            header = f.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE:
+                break
+            op, key_len, value_len, crc = struct.unpack(_HEADER_FORMAT, header)
+            if op not in (_OP_STORE, _OP_DELETE):
+                break
+            body = f.read(key_len + value_len)
+            if len(body) < key_len + value_len  or  zlib.crc32(body) & 0xffffffff != crc:
+                break
+            record_len = _HEADER_SIZE + key_len + value_len
+            self.__apply(op, body[:key_len], offset + _HEADER_SIZE + key_len, value_len, record_len)
+            offset += record_len
+        f.seek(0, 2)
+        if f.tell() > offset:
+            log("Storage log '%s': Removing %d bytes of incomplete records at the end" % \
+                                                            (self.name, f.tell() - offset), level=LOG_WARNING)
+            f.truncate(offset)
+        self.__size = offset
+
+    def __apply(self, op, key, value_offset, value_len, record_len):
+        """
+        Update the index with a record that was read or written.
+
+        """
+        unique_prefix, file_name = key.split("\0", 1)
+        space = self.__index.get(unique_prefix)
+        if space is None:
+            space = self.__index[unique_prefix] = dict()
+        old = space.pop(file_name, None)
+        if old:
+            self.__garbage += old[2]
+        if op == _OP_STORE:
+            space[file_name] = (value_offset, value_len, record_len)
+        else:
+            # The deletion record is garbage as soon as it is written
+            self.__garbage += record_len
+        if not space:
+            del self.__index[unique_prefix]
+
+    def __lookup(self, key):
+        unique_prefix, file_name = key.split("\0", 1)
+        return self.__index.get(unique_prefix, {}).get(file_name)
+
+    def read(self, key):
+        """
+        Return the value of a key.
+
+        @param key:     The key (see _makeKey()).
+        @type key:      string
+
+        @return:        The value or None if the key doesn't exist.
+        @rtype:         string
+
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__lookup(key)
+            if entry is None:
+                return None
+            self.__file.seek(entry[0])
+            return self.__file.read(entry[1])
+        finally:
+            self.__lock.release()
+
+    def stamp(self, key):
+        """
+        Return position and length of the value of a key.
+
+        The position changes whenever the key is written (or the log is
+        compacted).
+
+        @param key:     The key (see _makeKey()).
+        @type key:      string
+
+        @return:        Tuple of value offset and length or None if the
+                        key doesn't exist.
+        @rtype:         tuple
+
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__lookup(key)
+            if entry is None:
+                return None
+            return entry[:2]
+        finally:
+            self.__lock.release()
+
+    def names(self, unique_prefix):
+        """
+        Return the names of all files of a storage space.
+
+        @param unique_prefix:   The storage space.
+        @type unique_prefix:    string
+
+        @return:                List of file names.
+        @rtype:                 list
+
+        """
+        if isinstance(unique_prefix, unicode):
+            unique_prefix = unique_prefix.encode("utf-8")
+        self.__lock.acquire()
+        try:
+            return self.__index.get(unique_prefix, {}).keys()
+        finally:
+            self.__lock.release()
+
+    def write(self, key, data=None, stream=None, delete=False):
+        """
+        Append a record to the log.
+
+        A streamed value is first copied into a temporary file, so that a
+        slow client doesn't block other writers while it uploads.
+
+        @param key:     The key (see _makeKey()).
+        @type key:      string
+
+        @param data:    Buffer containing the value.
+        @type data:     string
+
+        @param stream:  File-like object from which the value is read (in
+                        chunks), if no data is specified.
+        @type stream:   RequestBodyReader (or any object with read())
+
+        @param delete:  Write a deletion record.
+        @type delete:   boolean
+
+        @return:        False if a deletion was requested for a key that
+                        doesn't exist, True otherwise.
+        @rtype:         boolean
+
+        """
+        spool = None
+        crc   = zlib.crc32(key)
+        if delete:
+            op        = _OP_DELETE
+            data      = ""
+            value_len = 0
+        elif stream is None:
+            op        = _OP_STORE
+            value_len = len(data)
+            crc       = zlib.crc32(data, crc)
+        else:
+            op        = _OP_STORE
+            value_len = 0
+            spool     = tempfile.TemporaryFile()
+            while True:
+                chunk = stream.read(settings.REQUEST_BODY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+                crc        = zlib.crc32(chunk, crc)
+                value_len += len(chunk)
+            spool.seek(0)
+        try:
+            self.__lock.acquire()
+            try:
+                if delete  and  self.__lookup(key) is None:
+                    return False
+                f = self.__file
+                try:
+                    f.seek(self.__size)
+                    f.write(struct.pack(_HEADER_FORMAT, op, len(key), value_len, crc & 0xffffffff))
+                    f.write(key)
+                    if spool is None:
+                        f.write(data)
+                    else:
+                        while True:
+                            chunk = spool.read(_COPY_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                    f.flush()
+                except:
+                    # Don't leave a partial record, later records would not be found
+                    f.truncate(self.__size)
+                    raise
+                if settings.STORAGE_FSYNC == "always":
+                    _fsync(f)
+                record_len   = _HEADER_SIZE + len(key) + value_len
+                self.__apply(op, key, self.__size + _HEADER_SIZE + len(key), value_len, record_len)
+                self.__size += record_len
+                if self.__garbage > self.__size * settings.STORAGE_LOG_COMPACT_RATIO  and  \
+                                                self.__size > settings.STORAGE_LOG_MIN_SIZE:
+                    try:
+                        self.__compact()
+                    except Exception, e:
+                        # The record has been stored, compaction is tried again with the next write
+                        log("Storage log '%s': Cannot compact (%s)" % (self.name, str(e)), level=LOG_WARNING)
+            finally:
+                self.__lock.release()
+        finally:
+            if spool is not None:
+                spool.close()
+        if settings.STORAGE_FSYNC == "periodic":
+            _SYNCER.add(self.name)
+        return True
+
+    def __compact(self):
+        """
+        Copy all live records into a new log file, which replaces the current one.
+
+        Called with the lock held.
+
+        """
+        tmp_name  = _makeTempName(self.name)
+        out       = open(tmp_name, "wb")
+        new_index = dict()
+        offset    = 0
+        try:
+            try:
+                for unique_prefix, space in self.__index.items():
+                    new_space = new_index[unique_prefix] = dict()
+                    for file_name, (value_offset, value_len, record_len) in space.items():
+                        key = "%s\0%s" % (unique_prefix, file_name)
+                        self.__file.seek(value_offset)
+                        value = self.__file.read(value_len)
+                        crc   = zlib.crc32(value, zlib.crc32(key)) & 0xffffffff
+                        out.write(struct.pack(_HEADER_FORMAT, _OP_STORE, len(key), value_len, crc))
+                        out.write(key)
+                        out.write(value)
+                        new_space[file_name] = (offset + _HEADER_SIZE + len(key), value_len, record_len)
+                        offset += record_len
+                # Losing the log would lose everything, so this is always synced
+                _fsync(out)
+            finally:
+                out.close()
+            self.__file.close()
+            _replaceFile(tmp_name, self.name)
+        except:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+            if self.__file.closed:
+                self.__file = open(self.name, "r+b")
+            raise
+        self.__file        = open(self.name, "r+b")
+        self.__index       = new_index
+        self.__size        = offset
+        self.__garbage     = 0
+        self.compactions  += 1
+
+    def getStats(self):
+        """
+        Return the statistics of this log.
+
+        @return:    Dictionary with counters.
+        @rtype:     dict
+
+        """
+        self.__lock.acquire()
+        try:
+            return dict(files       = sum([ len(space) for space in self.__index.values() ]),
+                        spaces      = len(self.__index),
+                        size        = self.__size,
+                        garbage     = self.__garbage,
+                        compactions = self.compactions)
+        finally:
+            self.__lock.release()
+
+
+_LOGS      = dict()
+_LOGS_LOCK = threading.Lock()
+
+def _getLog(name):
+    """
+    Return the log object for a log file, opening it if necessary.
+
+    """
+    _LOGS_LOCK.acquire()
+    try:
+        storage_log = _LOGS.get(name)
+        if storage_log is None:
+            storage_log = _LOGS[name] = _StorageLog(name)
+            register_stats_provider("storage_log", storage_log.getStats)
+        return storage_log
+    finally:
+        _LOGS_LOCK.release()
+
+
+class LogStorage(FileStore):
+    """
+    A file storage, which keeps all files in a single log file.
+
+    """
+    LOG_FILE_NAME = "_storage.log"
+
+    def __init__(self, storage_location, unique_prefix=""):
+        """
+        The unique prefix is used to create a namespace in the log.
+
+        """
+        self.storage_location = storage_location
+        self.unique_prefix    = unique_prefix
+        self.__log            = _getLog(os.path.join(settings.get_root_dir() + storage_location,
+                                                     self.LOG_FILE_NAME))
+
+    def loadFile(self, file_name):
+        """
+        Load the specified file from storage.
+
+        @param file_name:    Name of the selected file.
+        @type file_name:     string
+
+        @return              Buffer containing the file contents.
+        @rtype               string
+
+        """
+        try:
+            data = self.__log.read(_makeKey(self.unique_prefix, file_name))
+        except Exception, e:
+            raise RestxException("Cannot load file '%s' (%s)" % (file_name, str(e)))
+        if data is None:
+            raise RestxFileNotFoundException("File '%s' could not be found'" % (file_name))
+        return data
+
+    def getFileStamp(self, file_name):
+        """
+        Return a stamp, which changes whenever the file is written.
+
+        @param file_name:    Name of the selected file.
+        @type file_name:     string
+
+        @return              Tuple of position in the log and size or None
+                             if the file does not exist.
+        @rtype               tuple
+
+        """
+        return self.__log.stamp(_makeKey(self.unique_prefix, file_name))
+
+    def storeFile(self, file_name, data):
+        """
+        Store the specified file in storage.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param data:         Buffer containing the file contents.
+        @type data:          string
+
+        """
+        try:
+            self.__log.write(_makeKey(self.unique_prefix, file_name), data=data)
+        except Exception, e:
+            raise RestxException("Cannot store file '%s' (%s)" % (file_name, str(e)))
+
+    def replaceFile(self, file_name, data):
+        """
+        Atomically replace the specified file with new contents.
+
+        Every write to the log is atomic, so this is the same as storeFile().
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param data:         Buffer containing the file contents.
+        @type data:          string
+
+        """
+        self.storeFile(file_name, data)
+
+    def storeFileFromStream(self, file_name, stream):
+        """
+        Store the data from a file-like object, without reading it into memory.
+
+        @param file_name:    Name of the file.
+        @type file_name:     string
+
+        @param stream:       The source of the data, read in chunks.
+        @type stream:        RequestBodyReader (or any object with read())
+
+        """
+        try:
+            self.__log.write(_makeKey(self.unique_prefix, file_name), stream=stream)
+        except Exception, e:
+            raise RestxException("Cannot store file '%s' (%s)" % (file_name, str(e)))
+
+    def deleteFile(self, file_name):
+        """
+        Delete the specified file from storage.
+
+        @param file_name:    Name of the selected file.
+        @type file_name:     string
+
+        """
+        try:
+            deleted = self.__log.write(_makeKey(self.unique_prefix, file_name), delete=True)
+        except Exception, e:
+            raise RestxException("Cannot delete file '%s' (%s)" % (file_name, str(e)))
+        if not deleted:
+            raise RestxFileNotFoundException(file_name)
+
+    def listFiles(self, offset=0, limit=None):
+        """
+        Return list of all files in the storage.
+
+        The names are sorted, so that the list can be retrieved in pages.
+
+        @param offset:           Number of files to skip.
+        @type offset:            int
+
+        @param limit:            Max. number of files to return, or None for all.
+        @type limit:             int
+
+        @return:                 List of file names.
+        @rtype:                  list
+
+        """
+        return pageList(self.__log.names(self.unique_prefix), offset, limit)
+
@@ -22,6 +22,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Base class from which all storage abstractions derive.
 
 """
+import os
+
 import restxjson as json
 
 # RESTx imports
@@ -33,6 +35,9 @@ class ResourceStorage(FileStorage):
     Implementation of resource storage methods.
 
     """
+    CATALOG_FILE_NAME    = "_catalog"   # Names starting with '_' are not resources
+    WRITE_BEHIND_ALLOWED = False        # Resource stamps and the catalog need the files on disk
+
 
     def loadResourceFromStorage(self, resource_name):
         """
@@ -53,6 +58,52 @@ class ResourceStorage(FileStorage):
         obj = json.loads(buf)
         return obj
 
+    def getResourceStamp(self, resource_name):
+        """
+        Return a stamp that changes whenever the stored resource changes.
+
+        For us, that's the modification time and size of the file.
+
+        @param resource_name:    Name of the selected resource.
+        @type resource_name:     string
+
+        @return                  Tuple of modification time and size or
+                                 None if the resource does not exist.
+        @rtype                   tuple
+
+        """
+        return self.getFileStamp(resource_name)
+
+    def getStorageStamp(self):
+        """
+        Return a stamp that changes whenever any stored resource changes.
+
+        This is the modification time of the storage directory. Creating
+        and deleting files changes it anyway, and we explicitly touch the
+        directory after a resource was written (see __touchStorage()).
+        This way, other processes that serve the same resources can notice
+        our changes with a single stat() call.
+
+        @return                  Modification time of the storage location
+                                 or None if it can't be determined.
+        @rtype                   float
+
+        """
+        try:
+            return os.stat(self._get_storage_location()).st_mtime
+        except OSError:
+            return None
+
+    def __touchStorage(self):
+        """
+        Update the modification time of the storage directory.
+
+        """
+        try:
+            os.utime(self._get_storage_location(), None)
+        except OSError:
+            pass
+
     def deleteResourceFromStorage(self, resource_name):
         """
         Delete the specified resource from storage.
@@ -62,6 +113,7 @@ class ResourceStorage(FileStorage):
 
         """
         self.deleteFile(resource_name)
+        self.__touchStorage()
 
     def listResourcesInStorage(self):
         """
@@ -77,6 +129,37 @@ class ResourceStorage(FileStorage):
         except Exception, e:
             raise RestxException("Problems getting resource list from storage: " + str(e))
 
+    def loadCatalog(self):
+        """
+        Load the resource catalog (see restx.resources.catalog).
+
+        @return                  The catalog or None if there is no
+                                 (readable) stored catalog.
+        @rtype                   dict
+
+        """
+        try:
+            buf = self.loadFile(self.CATALOG_FILE_NAME)
+        except RestxFileNotFoundException, e:
+            return None
+        try:
+            return json.loads(buf)
+        except ValueError:
+            return None
+
+    def storeCatalog(self, catalog):
+        """
+        Store the resource catalog, replacing the previous one atomically.
+
+        @param catalog:          The catalog.
+        @type catalog:           dict
+
+        """
+        try:
+            self.replaceFile(self.CATALOG_FILE_NAME, json.dumps(catalog))
+        except Exception, e:
+            raise RestxException("Problems storing the resource catalog: " + str(e))
+
     def writeResourceToStorage(self, resource_name, resource_def):
         """
         Store a resource definition.
@@ -97,4 +180,5 @@ class ResourceStorage(FileStorage):
             self.storeFile(resource_name, buf)
         except Exception, e:
             raise RestxException("Problems storing new resource: " + str(e))
+        self.__touchStorage()
 
@@ -0,0 +1,89 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+File storage with one directory per storage space.
+
+The flat layout of FileStorage keeps all files in a single directory, which
+needs to be read completely whenever the files of a resource are listed.
+Here, each resource has its own directory, with the files spread over hash
+buckets (see restx.storageabstraction.sharding). Listing the files of a
+resource only reads its own directory.
+
+"""
+# Python imports
+import os
+
+# RESTx imports
+from restx.storageabstraction.sharding     import *
+from restx.storageabstraction.file_storage import FileStorage, pageList, _WRITE_BEHIND
+from org.mulesoft.restx.exception          import *
+
+
+class ShardedFileStorage(FileStorage):
+    """
+    A file storage, which uses the sharded directory layout.
+
+    """
+    def _get_space_location(self):
+        return spaceDirectory(self._get_storage_location(), self.unique_prefix)
+
+    def _make_filename(self, file_name):
+        return shardedFileName(self._get_storage_location(), self.unique_prefix, file_name)
+
+    def listFiles(self, offset=0, limit=None):
+        """
+        Return list of all files in the storage.
+
+        The names are sorted, so that the list can be retrieved in pages.
+
+        @param offset:           Number of files to skip.
+        @type offset:            int
+
+        @param limit:            Max. number of files to return, or None for all.
+        @type limit:             int
+
+        @return:                 List of file names.
+        @rtype:                  list
+
+        """
+        space_location = self._get_space_location()
+        try:
+            file_names = dict()
+            if os.path.isdir(space_location):
+                for bucket in os.listdir(space_location):
+                    bucket_location = os.path.join(space_location, bucket)
+                    if bucket.startswith(".")  or  not os.path.isdir(bucket_location):
+                        continue
+                    # Temporary files (see _makeTempName()) start with a '.'
+                    for name in os.listdir(bucket_location):
+                        if not name.startswith("."):
+                            file_names[name] = None
+            if self.write_behind:
+                # Files in the write-behind queue may not have been written yet
+                location = os.path.normpath(space_location)
+                for name in _WRITE_BEHIND.names():
+                    dir_name, base_name = os.path.split(name)
+                    if os.path.normpath(os.path.dirname(dir_name)) == location:
+                        file_names[base_name] = None
+            return pageList([ decodeName(name) for name in file_names.keys() ], offset, limit)
+        except Exception, e:
+            raise RestxException("Problems getting file list from storage: " + str(e))
+
@@ -0,0 +1,139 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+The sharded layout of a file storage.
+
+The files of each storage space (a resource, or a namespace within a
+resource) are kept in their own directory, which is spread over up to
+256 bucket sub-directories:
+
+    <storage location>/<storage space>/<bucket>/<file name>
+
+The bucket is taken from the hash of the file name. Directory and file
+names are URL-encoded, so that any name can be stored safely.
+
+This module has no dependencies on the rest of RESTx, so that offline
+tools (see migrate_storage.py) can use it as well.
+
+"""
+# Python imports
+import os
+import urllib
+import hashlib
+
+# Directory name of the storage space with an empty prefix. A URL-encoded
+# name can never be just a '%', so this doesn't clash with any other space.
+DEFAULT_SPACE_NAME = "%"
+
+
+def encodeName(name):
+    """
+    Turn a file or storage space name into a safe name on disk.
+
+    Names never start with a '.', since those are reserved for temporary
+    files and could be used to escape the storage directory.
+
+    @param name:    The name.
+    @type name:     string
+
+    @return:        The encoded name.
+    @rtype:         string
+
+    """
+    if isinstance(name, unicode):
+        name = name.encode("utf-8")
+    name = urllib.quote(name, safe="")
+    if name.startswith("."):
+        name = "%2E" + name[1:]
+    return name
+
+
+def decodeName(name):
+    """
+    Return the original name of an encoded name.
+
+    @param name:    The encoded name.
+    @type name:     string
+
+    @return:        The original name.
+    @rtype:         string
+
+    """
+    return urllib.unquote(name)
+
+
+def bucketName(name):
+    """
+    Return the name of the bucket directory in which a file is kept.
+
+    @param name:    The (not encoded) file name.
+    @type name:     string
+
+    @return:        Name of the bucket.
+    @rtype:         string
+
+    """
+    if isinstance(name, unicode):
+        name = name.encode("utf-8")
+    return hashlib.md5(name).hexdigest()[:2]
+
+
+def spaceDirectory(storage_location, unique_prefix):
+    """
+    Return the directory of a storage space.
+
+    @param storage_location:    The storage root directory.
+    @type storage_location:     string
+
+    @param unique_prefix:       The name of the storage space.
+    @type unique_prefix:        string
+
+    @return:                    Directory name.
+    @rtype:                     string
+
+    """
+    if unique_prefix:
+        space = encodeName(unique_prefix)
+    else:
+        space = DEFAULT_SPACE_NAME
+    return os.path.join(storage_location, space)
+
+
+def shardedFileName(storage_location, unique_prefix, file_name):
+    """
+    Return the full name of a file in the sharded layout.
+
+    @param storage_location:    The storage root directory.
+    @type storage_location:     string
+
+    @param unique_prefix:       The name of the storage space.
+    @type unique_prefix:        string
+
+    @param file_name:           The name of the file.
+    @type file_name:            string
+
+    @return:                    Full file name.
+    @rtype:                     string
+
+    """
+    return os.path.join(spaceDirectory(storage_location, unique_prefix),
+                        bucketName(file_name), encodeName(file_name))
+
@@ -0,0 +1,215 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+A bounded pool of worker threads.
+
+Jobs are queued and picked up by a fixed maximum number of threads, which
+are started as they are needed: Whenever there are more queued jobs than
+idle threads, another thread is started (up to the maximum). A job that has
+not been started by a worker yet can also be run by the thread that waits
+for it (see Job.runOrWait()), or it can be cancelled (see Job.claim()).
+That way, a thread that waits for jobs always makes progress, even if all
+workers are busy - for example with jobs that wait for other jobs themselves.
+
+"""
+# Python imports
+import sys
+import threading
+
+from restx.stats import register_stats_provider
+
+
+class Job(object):
+    """
+    A function call, which is run by a worker pool.
+
+    """
+    PENDING  = 0
+    RUNNING  = 1
+    DONE     = 2
+
+    def __init__(self, func, args):
+        self.func    = func
+        self.args    = args
+        self.result  = None
+        self.error   = None      # Exception info as returned by sys.exc_info()
+        self.__state = self.PENDING
+        self.__lock  = threading.Lock()
+        self.__done  = threading.Event()
+
+    def claim(self):
+        """
+        Mark the job as running, if no one else has started it yet.
+
+        A job that was claimed, but is not run, is cancelled: The workers
+        skip it.
+
+        @return:    True if the caller now owns the job and has to run it.
+        @rtype:     boolean
+
+        """
+        self.__lock.acquire()
+        try:
+            if self.__state != self.PENDING:
+                return False
+            self.__state = self.RUNNING
+            return True
+        finally:
+            self.__lock.release()
+
+    def run(self):
+        """
+        Run a claimed job and record its result or exception.
+
+        """
+        try:
+            try:
+                self.result = self.func(*self.args)
+            except:
+                self.error = sys.exc_info()
+        finally:
+            self.__state = self.DONE
+            self.__done.set()
+
+    def runOrWait(self, timeout=None):
+        """
+        Wait for the job to finish, running it in this thread if no worker
+        has started it yet.
+
+        @param timeout:     Max. number of seconds to wait for a job that is
+                            run by a worker, or None to wait forever.
+        @type  timeout:     float
+
+        @return:            True if the job is done.
+        @rtype:             boolean
+
+        """
+        if self.claim():
+            self.run()
+            return True
+        return self.wait(timeout)
+
+    def wait(self, timeout=None):
+        """
+        Wait for the job to be finished by a worker.
+
+        @param timeout:     Max. number of seconds to wait, or None to wait
+                            forever.
+        @type  timeout:     float
+
+        @return:            True if the job is done.
+        @rtype:             boolean
+
+        """
+        self.__done.wait(timeout)
+        return self.__done.isSet()
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of daemon worker threads.
+
+    """
+    def __init__(self, max_threads, name=None):
+        """
+        Create a new pool. Threads are only started when jobs are submitted.
+
+        @param max_threads:    Max. number of worker threads.
+        @type  max_threads:    int
+
+        @param name:           If specified, the statistics of this pool
+                               are reported under this name.
+        @type  name:           string
+
+        """
+        self.max_threads = max_threads
+        self.completed   = 0
+        self.__cond      = threading.Condition()
+        self.__queue     = list()
+        self.__threads   = 0
+        self.__idle      = 0
+        if name:
+            register_stats_provider(name, self.getStats)
+
+    def submit(self, func, *args):
+        """
+        Queue a function call.
+
+        @param func:    The function.
+        @type  func:    function
+
+        @param args:    Positional arguments for the function.
+
+        @return:        The job, which can be waited for.
+        @rtype:         Job
+
+        """
+        job = Job(func, args)
+        self.__cond.acquire()
+        try:
+            self.__queue.append(job)
+            # Idle threads that were notified already, but have not taken
+            # their job yet, are still counted as idle. Their jobs are still
+            # in the queue as well, so each queued job has its own thread.
+            if len(self.__queue) > self.__idle  and  self.__threads < self.max_threads:
+                self.__threads += 1
+                thread = threading.Thread(target=self.__work)
+                thread.setDaemon(True)
+                thread.start()
+            else:
+                self.__cond.notify()
+        finally:
+            self.__cond.release()
+        return job
+
+    def getStats(self):
+        """
+        Return the usage statistics of this pool.
+
+        @return:    Dictionary with thread and job counters.
+        @rtype:     dict
+
+        """
+        return dict(threads     = self.__threads,
+                    max_threads = self.max_threads,
+                    idle        = self.__idle,
+                    queued      = len(self.__queue),
+                    completed   = self.completed)
+
+    def __work(self):
+        """
+        Main loop of a worker thread.
+
+        """
+        while True:
+            self.__cond.acquire()
+            try:
+                while not self.__queue:
+                    self.__idle += 1
+                    self.__cond.wait()
+                    self.__idle -= 1
+                job = self.__queue.pop(0)
+            finally:
+                self.__cond.release()
+            # The job may have been taken over by the thread waiting for it
+            if job.claim():
+                job.run()
+                self.completed += 1
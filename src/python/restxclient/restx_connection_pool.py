@@ -0,0 +1,146 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Definition of the L{RestxConnectionPool} class.
+
+"""
+
+import time
+import httplib
+import threading
+
+class RestxConnectionPool(object):
+    """
+    A thread-safe pool of persistent (keep-alive) connections to one server.
+
+    Connections are handed out with get_connection() and have to be
+    returned with release_connection() once the response has been read.
+    At most 'max_connections' connections are open at the same time,
+    further requests wait for a connection to become available.
+
+    Clients should NOT use this class directly. Each L{RestxServer}
+    object keeps a pool for its server.
+
+    """
+    __host              = None   # Host name of the server
+    __port              = None   # Port of the server
+    __max_connections   = None   # Max. number of open connections
+    __idle_timeout      = None   # Connections that were idle for longer are not used again
+    __cond              = None   # Protects the pool's state
+    __idle              = None   # List of idle connections
+    __open              = 0      # Number of open connections (idle or in use)
+
+    def __init__(self, host, port, max_connections=4, idle_timeout=10):
+        """
+        Create a new, empty pool.
+
+        @param host:            Host name of the server.
+        @type host:             string
+
+        @param port:            Port of the server.
+        @type port:             int
+
+        @param max_connections: Max. number of connections that are open at
+                                the same time.
+        @type max_connections:  int
+
+        @param idle_timeout:    Number of seconds after which an idle connection
+                                is not used anymore. This should be less than the
+                                keep-alive timeout of the server, so that we don't
+                                use connections that the server is about to close.
+        @type idle_timeout:     float
+
+        """
+        self.__host            = host
+        self.__port            = port
+        self.__max_connections = max_connections
+        self.__idle_timeout    = idle_timeout
+        self.__cond            = threading.Condition()
+        self.__idle            = list()
+        self.__open            = 0
+
+    def get_connection(self):
+        """
+        Return a connection to the server.
+
+        Waits if the max. number of connections is in use already.
+
+        @return:        Tuple of the connection and a flag, which indicates
+                        whether this connection has been used before.
+        @rtype:         tuple
+
+        """
+        self.__cond.acquire()
+        try:
+            while True:
+                now = time.time()
+                while self.__idle:
+                    conn = self.__idle.pop()
+                    if now - conn.last_used < self.__idle_timeout:
+                        return conn, True
+                    conn.close()
+                    self.__open -= 1
+                if self.__open < self.__max_connections:
+                    self.__open += 1
+                    break
+                self.__cond.wait()
+        finally:
+            self.__cond.release()
+        return httplib.HTTPConnection(self.__host, self.__port), False
+
+    def release_connection(self, conn, reusable):
+        """
+        Return a connection to the pool.
+
+        @param conn:        The connection, which was obtained by get_connection().
+        @type conn:         httplib.HTTPConnection
+
+        @param reusable:    Flag indicating whether the connection can be used
+                            for further requests. If not, it is closed.
+        @type reusable:     bool
+
+        """
+        if not reusable:
+            conn.close()
+        self.__cond.acquire()
+        try:
+            if reusable:
+                conn.last_used = time.time()
+                self.__idle.append(conn)
+            else:
+                self.__open -= 1
+            self.__cond.notify()
+        finally:
+            self.__cond.release()
+
+    def close(self):
+        """
+        Close all idle connections.
+
+        """
+        self.__cond.acquire()
+        try:
+            for conn in self.__idle:
+                conn.close()
+                self.__open -= 1
+            self.__idle = list()
+        finally:
+            self.__cond.release()
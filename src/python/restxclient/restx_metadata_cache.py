@@ -0,0 +1,206 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration. 
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify 
+it under the terms of the GNU General Public License as published by 
+the Free Software Foundation, either version 3 of the License, or 
+(at your option) any later version. 
+
+This program is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the 
+GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License 
+along with this program.  If not, see <http://www.gnu.org/licenses/>. 
+
+"""
+
+"""
+Definition of the L{RestxMetadataCache} class.
+
+"""
+
+import re
+import time
+import threading
+
+class RestxMetadataCache(object):
+    """
+    A cache for the meta data (descriptions of resources, components, etc.)
+    that the client receives from the server.
+
+    Each entry is stored together with the ETag and Last-Modified headers
+    of the server's response. Once an entry is no longer fresh, it is
+    revalidated with a conditional GET request: If the meta data has not
+    changed, the server only responds with 304 (Not Modified) and the
+    cached data is used again.
+
+    Clients should NOT use this class directly. A L{RestxServer} object
+    uses such a cache if requested when it is created.
+
+    """
+    __MAX_AGE_REGEX     = re.compile(r"max-age\s*=\s*(\d+)")
+
+    __ttl               = None   # Seconds for which entries are fresh (None: as specified by the server)
+    __max_entries       = None   # Max. number of cached URIs
+    __lock              = None   # Protects the cache's state
+    __entries           = None   # Dictionary of URI -> entry
+
+    def __init__(self, ttl=None, max_entries=1000):
+        """
+        Create a new, empty cache.
+
+        @param ttl:         Number of seconds for which an entry is used without
+                            revalidation. If None, the max-age of the server's
+                            Cache-Control header is used. 0 means: always
+                            revalidate.
+        @type ttl:          int
+
+        @param max_entries: Max. number of cached URIs. The least recently
+                            used entries are dropped once this is exceeded.
+        @type max_entries:  int
+
+        """
+        self.__ttl         = ttl
+        self.__max_entries = max_entries
+        self.__lock        = threading.Lock()
+        self.__entries     = dict()
+        self.hits          = 0   # Served from the cache without a request
+        self.revalidated   = 0   # Served from the cache after a 304 response
+        self.misses        = 0   # Full responses received
+
+    def lookup(self, uri):
+        """
+        Return the cached data for a URI, if it is still fresh.
+
+        @param uri:     The URI of the meta data.
+        @type uri:      string
+
+        @return:        Tuple of a flag indicating whether the data is fresh,
+                        the data and a dictionary of headers for a conditional
+                        request. (False, None, {}) if nothing is cached.
+        @rtype:         tuple
+
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(uri)
+            if entry is None:
+                return False, None, dict()
+            entry['last_used'] = time.time()
+            if entry['expires'] > entry['last_used']:
+                self.hits += 1
+                return True, entry['data'], dict()
+            headers = dict()
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            return False, entry['data'], headers
+        finally:
+            self.__lock.release()
+
+    def store(self, uri, data, headers):
+        """
+        Store the data of a full response.
+
+        Nothing is stored if the response has neither an ETag nor a
+        Last-Modified header and the data would not be fresh for any time.
+
+        @param uri:     The URI of the meta data.
+        @type uri:      string
+
+        @param data:    The (deserialized) data of the response.
+        @type data:     object
+
+        @param headers: The headers of the response (lower case names).
+        @type headers:  dict
+
+        """
+        etag          = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        ttl           = self.__freshness(headers)
+        self.__lock.acquire()
+        try:
+            self.misses += 1
+            if not etag  and  not last_modified  and  not ttl:
+                self.__entries.pop(uri, None)
+                return
+            if uri not in self.__entries  and  len(self.__entries) >= self.__max_entries:
+                oldest = min(self.__entries.items(), key=lambda item : item[1]['last_used'])[0]
+                del self.__entries[oldest]
+            now = time.time()
+            self.__entries[uri] = dict(data          = data,
+                                       etag          = etag,
+                                       last_modified = last_modified,
+                                       expires       = now + ttl,
+                                       last_used     = now)
+        finally:
+            self.__lock.release()
+
+    def revalidated_entry(self, uri, headers):
+        """
+        Mark an entry as fresh again, after the server responded with 304.
+
+        @param uri:     The URI of the meta data.
+        @type uri:      string
+
+        @param headers: The headers of the 304 response (lower case names).
+        @type headers:  dict
+
+        @return:        The cached data.
+        @rtype:         object
+
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(uri)
+            if entry is None:
+                return None
+            self.revalidated += 1
+            entry['expires'] = time.time() + self.__freshness(headers)
+            if headers.get('etag'):
+                entry['etag'] = headers['etag']
+            return entry['data']
+        finally:
+            self.__lock.release()
+
+    def invalidate(self, uri):
+        """
+        Remove the entry for a URI.
+
+        @param uri:     The URI of the meta data.
+        @type uri:      string
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__entries.pop(uri, None)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Remove all entries.
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__entries = dict()
+        finally:
+            self.__lock.release()
+
+    def __freshness(self, headers):
+        """
+        Return the number of seconds for which a response is fresh.
+
+        """
+        if self.__ttl is not None:
+            return self.__ttl
+        m = self.__MAX_AGE_REGEX.search(headers.get('cache-control') or "")
+        if m:
+            return int(m.group(1))
+        return 0
@@ -164,6 +164,7 @@ class RestxResource(object):
 
         """
         self.__server._send(self.__uri, method="DELETE", status=200)
+        self.__server._invalidate_metadata(self.__uri)
 
     #
     # For convenience, we offer read access to several
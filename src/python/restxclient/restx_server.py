@@ -28,12 +28,17 @@ try:
 except:
     import simplejson as json
 
+import errno
+import socket
 import httplib
 import urlparse
+import threading
 
 from restxclient.restx_client_exception import RestxClientException
 from restxclient.restx_component        import RestxComponent
 from restxclient.restx_resource         import RestxResource
+from restxclient.restx_connection_pool  import RestxConnectionPool
+from restxclient.restx_metadata_cache   import RestxMetadataCache
 
 class RestxServer(object):
     """
@@ -43,6 +48,12 @@ class RestxServer(object):
     # These are the headers we use for each request
     __DEFAULT_REQ_HEADERS = dict(Accept="application/json")
 
+    # Requests which may be sent again if a stale connection failed
+    __RETRY_METHODS     = [ "GET", "HEAD", "DELETE" ]
+
+    # Errors with which a connection fails if the server has closed it already
+    __STALE_ERRNOS      = [ errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED ]
+
     # The keys to the server's meta data dictionary.
     __CODE_URI_KEY      = "code"
     __DOC_URI_KEY       = "doc"
@@ -63,6 +74,9 @@ class RestxServer(object):
     __doc               = None   # A cache for the servers's doc string
     __resources         = None   # A cache for the resource-name-plus dictionary
     __components        = None   # A cache for the component-name-plus dictionary
+    __pool              = None   # Persistent connections to the server
+    __max_connections   = None   # Max. number of connections to the server
+    __cache             = None   # Cache for meta data (RestxMetadataCache), if enabled
 
     def _send(self, url, data=None, method=None, status=None, headers=None):
         """
@@ -107,32 +121,75 @@ class RestxServer(object):
                 method = "POST"
             
         # Combine default headers with any additional headers
-        if not headers:
-            headers = self.__DEFAULT_REQ_HEADERS
-        else:
-            combined_headers = dict()
+        combined_headers = dict()
+        if headers:
             combined_headers.update(headers)
-            for name, value in self.__DEFAULT_REQ_HEADERS.items():
-                combined_headers[name] = value
-            headers = combined_headers
+        for name, value in self.__DEFAULT_REQ_HEADERS.items():
+            combined_headers[name] = value
+        headers = combined_headers
 
         if data:
             headers["Content-length"] = len(data)
 
-        server_conn = httplib.HTTPConnection(self.__host, self.__port)
-        server_conn.request(method, url, body=data, headers=headers)
-
-        r = server_conn.getresponse()
+        resp_status, resp_headers, resp = self.__request(url, data, method, headers)
 
         if status is not None:
-            if status != r.status:
-                r.read()    # Empty the input stream (if we don't do that the next request will be confused)
-                raise RestxClientException("Status code %s was expected for request to '%s'. Instead we received %s." % (status, url, r.status))
+            if status != resp_status:
+                raise RestxClientException("Status code %s was expected for request to '%s'. Instead we received %s." % (status, url, resp_status))
+
+        return resp_status, resp
 
-        data = r.read()
-        server_conn.close()
-        
-        return r.status, data
+    def __request(self, url, data, method, headers):
+        """
+        Send a request over one of our persistent connections.
+
+        Connections to the server are kept open and reused for further
+        requests. If the server has closed a reused connection in the
+        meantime, a GET, HEAD or DELETE request is sent again over a new
+        connection. That is only done if the request failed before a
+        response started (while sending, or without a status line). Other
+        requests (creating a resource, POST and PUT to services) might
+        have been processed already, so they are never sent twice.
+
+        Raises RestxClientException if the request fails.
+
+        @return:        Tuple of status, response headers (with lower
+                        case names) and the data of the response.
+        @rtype:         tuple
+
+        """
+        for attempt in [ 1, 2 ]:
+            server_conn, reused = self.__pool.get_connection()
+            reusable            = False
+            try:
+                sent = False
+                r    = None
+                try:
+                    server_conn.request(method, url, body=data, headers=headers)
+                    sent = True
+                    r    = server_conn.getresponse()
+                    # Always read the entire response (if we don't do that the next
+                    # request on this connection will be confused)
+                    resp = r.read()
+                except (socket.error, httplib.HTTPException), e:
+                    if r is None  and  reused  and  attempt == 1  and  \
+                                method in self.__RETRY_METHODS  and  self.__is_stale(sent, e):
+                        continue    # Stale connection, try again with a new one
+                    raise RestxClientException("Request to '%s' failed: %s" % (url, str(e) or e.__class__.__name__))
+                reusable = not r.will_close
+            finally:
+                self.__pool.release_connection(server_conn, reusable)
+            return r.status, dict(r.getheaders()), resp
+
+    def __is_stale(self, sent, e):
+        """
+        Return True if an error shows that the server had closed the connection
+        before it received the request.
+
+        """
+        if not sent  or  isinstance(e, httplib.BadStatusLine):
+            return True
+        return isinstance(e, socket.error)  and  len(e.args) > 0  and  e.args[0] in self.__STALE_ERRNOS
 
     def _json_send(self, url, data=None, method=None, status=None):
         """
@@ -169,12 +226,67 @@ class RestxServer(object):
         status, d = self._send(url, data=data, method=method, status=status, headers={"content-Type" : "application/json"})
         return status, json.loads(d)
 
+    def _json_get_metadata(self, url):
+        """
+        Get meta data (a JSON reply) from the server.
+
+        If the meta data cache is enabled then the cached data is used
+        while it is fresh. After that, it is revalidated with a conditional
+        request, so that unchanged data is not sent again.
+
+        Clients should not modify the returned data, since it may be
+        shared with other callers.
+
+        @param url:     Absolute URL of the meta data.
+        @type url:      string
+
+        @return:        The received (or cached) data.
+        @rtype:         object
+
+        """
+        if not self.__cache:
+            status, d = self._json_send(url, status=200)
+            return d
+
+        fresh, d, cond_headers = self.__cache.lookup(url)
+        if fresh:
+            return d
+        headers = dict(self.__DEFAULT_REQ_HEADERS)
+        headers.update(cond_headers)
+        status, resp_headers, resp = self.__request(url, None, "GET", headers)
+        if status == 304:
+            d = self.__cache.revalidated_entry(url, resp_headers)
+            if d is not None:
+                return d
+            # Evicted in the meantime, get it again
+            status, resp_headers, resp = self.__request(url, None, "GET", dict(self.__DEFAULT_REQ_HEADERS))
+        if status != 200:
+            self.__cache.invalidate(url)
+            raise RestxClientException("Status code 200 was expected for request to '%s'. Instead we received %s." % (url, status))
+        d = json.loads(resp)
+        self.__cache.store(url, d, resp_headers)
+        return d
+
+    def _invalidate_metadata(self, uri):
+        """
+        Remove cached meta data for a URI, for example after it was modified.
+
+        The cached list of resources is removed as well.
+
+        @param uri:     Absolute URL of the meta data.
+        @type uri:      string
+
+        """
+        if self.__cache:
+            self.__cache.invalidate(uri)
+            self.__cache.invalidate(self.__resource_uri)
+
 
     # --------------------------------------------
     # Public interface
     # --------------------------------------------
 
-    def __init__(self, server_uri):
+    def __init__(self, server_uri, max_connections=4, cache_metadata=False, cache_ttl=None):
         """
         Initialize the server class.
 
@@ -187,11 +299,36 @@ class RestxServer(object):
         information should subsequently change, this server
         object won't know about it.
 
+        A server object may be used by multiple threads at the
+        same time.
+
         @param server_uri:      The full URI of the server.
         @type server_uri:       string
 
+        @param max_connections: Max. number of connections to the server
+                                that are kept open at the same time. This
+                                is also the number of requests that
+                                access_many() sends in parallel.
+        @type max_connections:  int
+
+        @param cache_metadata:  If set, the descriptions of resources and
+                                components and the list of resources are
+                                cached. Cached data is revalidated with
+                                conditional requests, which are cheap if
+                                the data hasn't changed.
+        @type cache_metadata:   bool
+
+        @param cache_ttl:       Number of seconds for which cached meta data
+                                is used without revalidation. If None, the
+                                Cache-Control max-age sent by the server is
+                                used. 0 means: always revalidate.
+        @type cache_ttl:        int
+
         """
-        self.__server_uri    = server_uri
+        self.__server_uri      = server_uri
+        self.__max_connections = max_connections
+        if cache_metadata:
+            self.__cache = RestxMetadataCache(cache_ttl)
 
         #
         # Need to extract schema, hostname and port from URI
@@ -209,6 +346,7 @@ class RestxServer(object):
         else:
             self.__host = parse_result.netloc
             self.__port = 80
+        self.__pool = RestxConnectionPool(self.__host, self.__port, max_connections)
 
         #
         # Get meta info from server and perform some sanity checking
@@ -243,6 +381,7 @@ class RestxServer(object):
 
         """
         status, data = self._json_send(uri, rdict, status=201)
+        self._invalidate_metadata(self.__resource_uri)
         return data
 
     def get_server_uri(self):
@@ -308,13 +447,15 @@ class RestxServer(object):
         results in a request to the server.
 
         The information is NOT cached since resources can be
-        created frequently.
+        created frequently, unless the meta data cache was enabled
+        (see __init__()). In that case, it is revalidated with the
+        server.
 
         @return:        List of resource names.
         @rtype:         list
 
         """
-        status, self.__resources = self._json_send(self.__resource_uri, status=200)
+        self.__resources = self._json_get_metadata(self.__resource_uri)
         return self.__resources.keys()
 
     def get_all_resource_names_plus(self):
@@ -330,13 +471,15 @@ class RestxServer(object):
         and 'uri' element.
 
         The information is NOT cached since resources can be
-        created frequently.
+        created frequently, unless the meta data cache was enabled
+        (see __init__()). In that case, it is revalidated with the
+        server.
 
         @return:        Dictionary with high-level resource info.
         @rtype:         dict
 
         """
-        status, self.__resources = self._json_send(self.__resource_uri, status=200)
+        self.__resources = self._json_get_metadata(self.__resource_uri)
         return self.__resources
 
     def get_all_component_names(self):
@@ -396,7 +539,7 @@ class RestxServer(object):
         @rtype:         L{RestxComponent}
 
         """
-        status, d = self._json_send(self.__component_uri + "/" + name, status=200)
+        d = self._json_get_metadata(self.__component_uri + "/" + name)
         return RestxComponent(self, d)
 
     def get_resource(self, name):
@@ -410,9 +553,77 @@ class RestxServer(object):
         @rtype:         L{RestxResource}
 
         """
-        status, d = self._json_send(self.__resource_uri + "/" + name, status=200)
+        d = self._json_get_metadata(self.__resource_uri + "/" + name)
         return RestxResource(self, d)
 
+    def access_many(self, requests):
+        """
+        Send many service requests in parallel and return their results in order.
+
+        Up to 'max_connections' (see __init__()) requests are sent at the
+        same time.
+
+        Each request is either a L{RestxAccessibleService}, which is accessed
+        with the parameters and input that were set on it, or a tuple of
+        (service, params, input, method). Elements at the end of the tuple
+        may be omitted, parameters and input that are not specified are taken
+        from the service object. That way, the same service can be accessed
+        with different parameters:
+
+            s       = server.get_resource("MyGoogleSearch").get_service("search")
+            results = server.access_many([ (s, dict(query=q)) for q in queries ])
+
+        @param requests:    List of service requests.
+        @type requests:     list
+
+        @return:            List of status, data tuples for the server's responses,
+                            in the order of the requests. If a request fails with
+                            an exception, the exception is raised once all other
+                            requests are done.
+        @rtype:             list
+
+        """
+        prepared = list()
+        for req in requests:
+            if type(req) is tuple:
+                prepared.append(req[0]._prepare_access(*req[1:]))
+            else:
+                prepared.append(req._prepare_access())
+
+        results = [ None ] * len(prepared)
+        errors  = [ None ] * len(prepared)
+        lock    = threading.Lock()
+        pending = range(len(prepared))
+        pending.reverse()
+
+        def worker():
+            while True:
+                lock.acquire()
+                try:
+                    if not pending:
+                        return
+                    i = pending.pop()
+                finally:
+                    lock.release()
+                service, param_vals, input, method = prepared[i]
+                try:
+                    results[i] = service._access(param_vals, input, method)
+                except Exception, e:
+                    errors[i] = e
+
+        threads = [ threading.Thread(target=worker)
+                        for i in range(min(self.__max_connections, len(prepared))) ]
+        for t in threads:
+            t.setDaemon(True)
+            t.start()
+        for t in threads:
+            t.join()
+
+        for e in errors:
+            if e is not None:
+                raise e
+        return results
+
     #
     # For convenience, we offer read access to several
     # elements via properties.
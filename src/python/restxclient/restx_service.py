@@ -224,11 +224,18 @@ class RestxAccessibleService(RestxService):
         @return:            Reference to ourselves, so that set() calls can be chained
         @rtype:             L{RestxAccessibleService}
 
+        """
+        self.__param_vals[name] = self.__checked_value(name, value)
+        return self
+
+    def __checked_value(self, name, value):
+        """
+        Check a parameter value and return its string representation.
+
         """
         pdef = self.get_parameter(name)
         pdef.sanity_check(value)
-        self.__param_vals[name] = str(value)
-        return self
+        return str(value)
 
     def set_params(self, param_dict):
         """
@@ -274,22 +281,74 @@ class RestxAccessibleService(RestxService):
         @return:        A status, data tuple for the server's response.
         @rtype:         tuple
 
+        """
+        return self._access(self.__param_vals, self.__input_buf, method)
+
+    def _prepare_access(self, params=None, input=None, method=None):
+        """
+        Return the request for a service access with the specified values.
+
+        Parameters and input that were set on this service object are used,
+        unless other values are specified for them. The service object itself
+        is not modified, so this can be used by several threads at the same time.
+
+        Clients should NOT use this method directly. It is used by
+        L{RestxServer.access_many}.
+
+        @param params:  Dictionary with name/value pairs for the parameters.
+        @type params:   dict
+
+        @param input:   Content for the message body.
+        @type input:    string
+
+        @param method:  The HTTP request method (see access()).
+        @type method:   string
+
+        @return:        Tuple of the service, the parameter values and input
+                        to be used and the request method.
+        @rtype:         tuple
+
+        """
+        param_vals = dict(self.__param_vals)
+        if params:
+            for name, value in params.items():
+                param_vals[name] = self.__checked_value(name, value)
+        if input is None:
+            input = self.__input_buf
+        return self, param_vals, input, method
+
+    def _access(self, param_vals, input_buf, method=None):
+        """
+        Sends the service request with the specified values to the server.
+
+        @param param_vals:  Dictionary with the string values of the parameters.
+        @type param_vals:   dict
+
+        @param input_buf:   Content for the message body.
+        @type input_buf:    string
+
+        @param method:      The HTTP request method (see access()).
+        @type method:       string
+
+        @return:            A status, data tuple for the server's response.
+        @rtype:             tuple
+
         """
         # Check if all mandatory parameters have been set
         all_params = self.get_all_parameters()
         if all_params:
             for name, pdef in all_params.items():
                 if pdef.is_required():
-                    if name not in self.__param_vals:
+                    if name not in param_vals:
                         raise RestxClientException("Required parameter '%s' is missing." % name)
 
          # Assemble the request URI
-        qs = urllib.urlencode(self.__param_vals)
+        qs = urllib.urlencode(param_vals)
         uri = self.__resource.get_uri() + "/" + self.get_name() + (("?%s" % qs) if qs else "")
 
         if method is None:
             # Caller didn't specify method, so we set a default one.
-            if self.__input_buf:
+            if input_buf:
                 method = "POST"
             else:
                 method = "GET"
@@ -298,18 +357,18 @@ class RestxAccessibleService(RestxService):
             # Specifically: If an input was specified then the method must be
             # either POST or PUT
             method = method.upper()
-            if self.__input_buf:
+            if input_buf:
                 if method not in ["POST", "PUT"]:
                     raise RestxClientException("Request method must be POST or PUT, because a message body (input) was set.")
             else:
                 if method not in ["GET", "HEAD", "OPTIONS", "DELETE"]:
                     if method in ["POST", "PUT"]:
-                        raise RestxClientExcetion("Cannot specify POST or PUT request method without setting message body (input).")
+                        raise RestxClientException("Cannot specify POST or PUT request method without setting message body (input).")
                     else:
                         raise RestxClientException("Unknown request method '%s'." % method)
 
         server       = self.__resource.get_server()
-        status, data = server._json_send(uri, data=self.__input_buf, method=method)
+        status, data = server._json_send(uri, data=input_buf, method=method)
         return status, data
 
     #
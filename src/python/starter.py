@@ -66,12 +66,38 @@ Options:
 
         -r, --rootdir <dirname>
                 Root directory of the RESTx install
-"""
+
+        -e, --executor <cached|fixed|bounded>
+                How requests are assigned to threads: A new thread for every
+                request ('cached'), a fixed number of threads with an
+                unlimited queue ('fixed') or a fixed number of threads with
+                a limited queue ('bounded', the default). When the queue of
+                a 'bounded' executor is full, requests are answered with
+                '503 Service Unavailable'.
+
+        -t, --threads <num>
+                Number of request threads (default: %d).
+
+        -q, --queuesize <num>
+                Max. number of waiting requests (default: %d).
+
+        -b, --backlog <num>
+                Listen backlog of the server socket (default: %d).
+
+        -w, --workers <num>
+                Number of worker processes (only for the Python server). With
+                more than one, a supervisor process starts the workers and
+                replaces those that die. Send SIGHUP to the supervisor for a
+                graceful restart of all workers. Can't be used together
+                with the 'log' storage backend (see STORAGE_BACKEND).
+""" % (settings.SERVER_THREADS, settings.SERVER_QUEUE_SIZE, settings.SERVER_BACKLOG)
 
 
 if __name__ == '__main__':
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hl:P:p:r:", ["help", "logfile=", "port=", "pidfile=", "rootdir="])
+        opts, args = getopt.getopt(sys.argv[1:], "hl:P:p:r:e:t:q:b:w:",
+                                   ["help", "logfile=", "port=", "pidfile=", "rootdir=",
+                                    "executor=", "threads=", "queuesize=", "backlog=", "workers="])
     except getopt.GetoptError, err:
         # print help information and exit:
         print str(err) # will print something like "option -a not recognized"
@@ -96,6 +122,25 @@ if __name__ == '__main__':
             settings.set_root_dir(rootdir)
         elif o in ("-l", "--logfile"):
             logger.set_logfile(a)
+        elif o in ("-e", "--executor"):
+            if a not in ("cached", "fixed", "bounded"):
+                print "Unknown executor type '%s'" % a
+                print_help()
+                sys.exit(1)
+            settings.SERVER_EXECUTOR = a
+        elif o in ("-t", "--threads"):
+            settings.SERVER_THREADS = int(a)
+        elif o in ("-q", "--queuesize"):
+            settings.SERVER_QUEUE_SIZE = int(a)
+        elif o in ("-b", "--backlog"):
+            settings.SERVER_BACKLOG = int(a)
+        elif o in ("-w", "--workers"):
+            settings.SERVER_PROCESSES = int(a)
+
+    if settings.SERVER_PROCESSES > 1  and  settings.STORAGE_BACKEND == "log":
+        # The index of the storage log is kept in memory, each process would have its own
+        print "The 'log' storage backend can only be used by a single server process"
+        sys.exit(1)
             
     my_server = HttpServer(port, RequestDispatcher())
 
@@ -0,0 +1,283 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+#
+# Run this one with Jython
+#
+"""
+Socket level tests for the event loop based HTTP server (async_http_server).
+
+The server is started on a local port with a small stub request handler
+instead of the request dispatcher. No RESTx server needs to be running
+for these tests.
+
+"""
+import time
+import socket
+import string
+import httplib
+import datetime
+import threading
+
+import restx.settings as settings
+
+# Short timeouts and buffers, so that the tests don't take forever
+settings.SERVER_KEEPALIVE_TIMEOUT   = 2
+settings.ASYNC_SERVER_OUTPUT_BUFFER = 64*1024
+
+from restx.httpabstraction.async_http_server import AsyncHttpServer, MAX_HEADER_SIZE
+
+from org.mulesoft.restx.component.api import HTTP, Result
+
+SERVER_PORT = 8012
+
+STREAM_CHUNK = "x" * 1024
+PRODUCED     = [ 0 ]        # Number of chunks produced by the endless stream
+
+
+def _endless_stream():
+    while True:
+        PRODUCED[0] += 1
+        yield STREAM_CHUNK
+
+
+class _StubHandler(object):
+    """
+    Answers requests for a few fixed paths, in place of the request dispatcher.
+
+    """
+    def handle(self, request):
+        path = request.getRequestPath()
+        if path.startswith("/slow"):
+            time.sleep(0.5)
+            return Result(HTTP.OK, path)
+        elif path == "/stream":
+            return Result(HTTP.OK, (str(i) + "\n" for i in range(1000)))
+        elif path == "/endless":
+            return Result(HTTP.OK, _endless_stream())
+        elif path == "/notmodified":
+            result = Result(HTTP.NOT_MODIFIED, "")
+            result.addHeader("ETag", '"1"')
+            return result
+        elif path == "/body":
+            return Result(HTTP.OK, request.getRequestBody())
+        return Result(HTTP.OK, path)
+
+
+def _start_server():
+    thread = threading.Thread(target=AsyncHttpServer, args=(SERVER_PORT, _StubHandler()))
+    thread.setDaemon(True)
+    thread.start()
+    time.sleep(0.5)
+
+
+def _connect():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(("localhost", SERVER_PORT))
+    sock.settimeout(10)
+    return sock
+
+
+def _read_response(fp):
+    """
+    Read one response from a file object, return status, headers and body.
+
+    """
+    status  = int(fp.readline().split()[1])
+    headers = dict()
+    while True:
+        line = fp.readline().strip()
+        if not line:
+            break
+        name, value = line.split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        body = ""
+        while True:
+            size = int(fp.readline().strip(), 16)
+            data = fp.read(size + 2)[:-2]
+            if not size:
+                break
+            body += data
+    elif "content-length" in headers:
+        body = fp.read(int(headers["content-length"]))
+    else:
+        body = None
+    return status, headers, body
+
+
+def test_10_keep_alive():
+    """
+    Test that several requests are served on the same connection.
+
+    """
+    conn = httplib.HTTPConnection("localhost", SERVER_PORT)
+    for i in range(5):
+        conn.request("GET", "/hello/%d" % i)
+        resp = conn.getresponse()
+        assert(resp.status == 200)
+        assert(resp.read() == "/hello/%d" % i)
+        assert(not resp.will_close)
+    conn.request("POST", "/body", "some data")
+    assert(conn.getresponse().read() == "some data")
+    conn.close()
+
+
+def test_20_pipelining():
+    """
+    Test that pipelined requests are answered in order.
+
+    """
+    sock = _connect()
+    sock.sendall("GET /slow/1 HTTP/1.1\r\nHost: x\r\n\r\n"
+                 "GET /fast/2 HTTP/1.1\r\nHost: x\r\n\r\n"
+                 "POST /body HTTP/1.1\r\nHost: x\r\nContent-Length: 5\r\n\r\nabcde"
+                 "GET /fast/4 HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+    fp = sock.makefile("rb")
+    bodies = [ _read_response(fp)[2] for i in range(4) ]
+    assert(bodies == [ "/slow/1", "/fast/2", "abcde", "/fast/4" ])
+    assert(fp.read() == "")     # Closed after the last one
+    sock.close()
+
+
+def test_30_no_body():
+    """
+    Test that responses to HEAD requests and 304 responses have no body.
+
+    """
+    sock = _connect()
+    sock.sendall("HEAD /hello HTTP/1.1\r\nHost: x\r\n\r\n"
+                 "HEAD /stream HTTP/1.1\r\nHost: x\r\n\r\n"
+                 "GET /notmodified HTTP/1.1\r\nHost: x\r\n\r\n"
+                 "GET /last HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+    fp   = sock.makefile("rb")
+    data = fp.read()
+    sock.close()
+    # Each response consists only of its headers, except the last one
+    responses = data.split("\r\n\r\n")
+    assert(len(responses) == 5)
+    assert(responses[0].startswith("HTTP/1.1 200"))
+    assert("Content-Length: 6" in responses[0])
+    assert(responses[1].startswith("HTTP/1.1 200"))
+    assert(responses[2].startswith("HTTP/1.1 304"))
+    assert(responses[3].startswith("HTTP/1.1 200"))
+    assert(responses[4] == "/last")
+
+
+def test_40_chunked_streaming():
+    """
+    Test that streamed entities are sent with chunked transfer encoding to
+    HTTP/1.1 clients and until the connection is closed to HTTP/1.0 clients.
+
+    """
+    expected = "".join([ str(i) + "\n" for i in range(1000) ])
+    sock = _connect()
+    sock.sendall("GET /stream HTTP/1.1\r\nHost: x\r\n\r\nGET /after HTTP/1.1\r\nHost: x\r\n\r\n")
+    fp = sock.makefile("rb")
+    status, headers, body = _read_response(fp)
+    assert(headers["transfer-encoding"] == "chunked")
+    assert(body == expected)
+    assert(_read_response(fp)[2] == "/after")
+    sock.close()
+
+    sock = _connect()
+    sock.sendall("GET /stream HTTP/1.0\r\n\r\n")
+    fp = sock.makefile("rb")
+    status, headers, body = _read_response(fp)
+    assert(body is None)
+    assert(headers["connection"] == "close")
+    assert(fp.read() == expected)
+    sock.close()
+
+
+def test_50_header_too_large():
+    """
+    Test that requests with oversized headers are answered with 413.
+
+    """
+    sock = _connect()
+    sock.sendall("GET /hello HTTP/1.1\r\nX-Large: " + "x" * (MAX_HEADER_SIZE + 1024))
+    fp = sock.makefile("rb")
+    status, headers, body = _read_response(fp)
+    assert(status == 413)
+    assert(fp.read() == "")
+    sock.close()
+
+
+def test_60_backpressure_and_disconnect():
+    """
+    Test that a streaming worker waits for a slow client and stops once the
+    client goes away.
+
+    """
+    sock = _connect()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16*1024)
+    sock.sendall("GET /endless HTTP/1.1\r\nHost: x\r\n\r\n")
+    sock.recv(1024)
+    time.sleep(1)
+    # Without reading, only the socket buffers and the server's output
+    # buffer can be filled
+    produced = PRODUCED[0]
+    time.sleep(0.5)
+    assert(PRODUCED[0] == produced)
+    assert(produced < 10000)
+    sock.close()
+    time.sleep(1.5)
+    produced = PRODUCED[0]
+    time.sleep(1)
+    assert(PRODUCED[0] == produced)
+
+
+def test_70_idle_close():
+    """
+    Test that idle keep-alive connections are closed after the keep-alive timeout.
+
+    """
+    sock = _connect()
+    sock.sendall("GET /hello HTTP/1.1\r\nHost: x\r\n\r\n")
+    fp = sock.makefile("rb")
+    assert(_read_response(fp)[2] == "/hello")
+    start = time.time()
+    assert(fp.read() == "")
+    assert(time.time() - start < settings.SERVER_KEEPALIVE_TIMEOUT + 3)
+    sock.close()
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    _start_server()
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
@@ -0,0 +1,152 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+#
+# Run this one with Jython
+#
+"""
+Tests for the concurrent access of several resources (accessResources()).
+
+The resources used here exist only in memory: The resource definitions and
+the component are injected into the resource runner. No RESTx server needs
+to be running for these tests.
+
+"""
+import time
+import string
+import datetime
+
+import restx.settings as settings
+import restx.core.codebrowser
+import restx.resources.resource_runner as resource_runner
+
+from restx.components.api import *
+
+from org.mulesoft.restx.component.api import HTTP
+
+
+class _BatchTestComponent(BaseComponent):
+    NAME             = "BatchTestComponent"
+    DESCRIPTION      = "Services for the batch access tests"
+    DOCUMENTATION    = ""
+    PARAM_DEFINITION = {}
+    SERVICES         = {
+                           "echo" : {
+                               "desc"   : "Returns its parameter",
+                               "params" : {
+                                   "num" : ParameterDef(PARAM_NUMBER, "A number", required=True),
+                               }
+                           },
+                           "slow" : {
+                               "desc"   : "Returns after a while",
+                               "params" : {
+                                   "seconds" : ParameterDef(PARAM_NUMBER, "Seconds to sleep", required=False, default=2),
+                               }
+                           },
+                       }
+
+    def echo(self, method, input, num):
+        return Result.ok(num)
+
+    def slow(self, method, input, seconds):
+        time.sleep(seconds)
+        return Result.ok("done")
+
+
+def _loadResource(resource_name):
+    if resource_name != "batchtest":
+        raise Exception("Unknown resource: " + resource_name)
+    return { "public"  : { "name" : "batchtest", "uri" : "/resource/batchtest", "desc" : "" },
+             "private" : { "code_uri" : "/code/BatchTestComponent", "params" : {} } }
+
+resource_runner.loadResource                 = _loadResource
+restx.core.codebrowser.getComponentInstance = lambda code_uri, resource_name: _BatchTestComponent()
+
+
+def test_10_results_in_order():
+    """
+    Test that the results are returned in the order of the requests.
+
+    """
+    results = resource_runner.accessResources([ ("/resource/batchtest/echo", { "num" : i })
+                                                    for i in range(10) ])
+    assert(results == [ (HTTP.OK, i) for i in range(10) ])
+
+
+def test_20_partial_failure():
+    """
+    Test that failed requests report their own status codes.
+
+    """
+    results = resource_runner.accessResources([ ("/resource/batchtest/echo", { "num" : "1" }),
+                                                "/resource/unknown/echo",
+                                                "/resource/batchtest/echo",
+                                                ("/resource/batchtest/echo", { "num" : "many" }) ])
+    assert(results[0] == (HTTP.OK, 1))
+    assert(results[1][0] == HTTP.NOT_FOUND)
+    assert(results[2][0] == HTTP.BAD_REQUEST)
+    assert("Incompatible type" in results[3][1])
+
+
+def test_30_timeout():
+    """
+    Test that requests which take too long are reported as timed out.
+
+    """
+    results = resource_runner.accessResources([ ("/resource/batchtest/slow", { "seconds" : 0 }),
+                                                ("/resource/batchtest/slow", { "seconds" : 3 }) ],
+                                              timeout=1)
+    assert(results[0] == (HTTP.OK, "done"))
+    assert(results[1][0] == HTTP.GATEWAY_TIMEOUT)
+
+
+def test_40_timeout_all_workers_busy():
+    """
+    Test that the timeout applies to each request, even when all workers are busy.
+
+    """
+    num     = settings.BATCH_ACCESS_THREADS + 5
+    start   = time.time()
+    results = resource_runner.accessResources([ ("/resource/batchtest/slow", { "seconds" : 2 }) ] * num,
+                                              timeout=0.5)
+    assert(time.time() - start < 1.5)
+    assert([ status for status, data in results ] == [ HTTP.GATEWAY_TIMEOUT ] * num)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
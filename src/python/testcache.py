@@ -0,0 +1,169 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the in-memory caches (restx.cache).
+
+These run with plain Python or Jython. No RESTx server needs to be running.
+
+"""
+import time
+import string
+import datetime
+import threading
+
+from restx.cache import LruCache, MemoCache, copy_struct
+
+
+def test_10_lru_get_put():
+    """
+    Test storing, replacing and removing entries.
+
+    """
+    cache = LruCache(10)
+    assert(cache.get("a") is None)
+    cache.put("a", 1)
+    assert(cache.get("a") == 1)
+    cache.put("a", 2)
+    assert(cache.get("a") == 2)
+    cache.remove("a")
+    assert(cache.get("a") is None)
+    stats = cache.getStats()
+    assert(stats['hits'] == 2)
+    assert(stats['misses'] == 2)
+
+
+def test_20_lru_eviction():
+    """
+    Test that the least recently used entries are evicted, and only those are counted.
+
+    """
+    cache = LruCache(10)
+    for i in range(10):
+        cache.put(i, i)
+    cache.get(0)
+    # Replacing existing entries in a full cache evicts nothing
+    for i in range(10):
+        cache.put(i, i * 2)
+    assert(cache.getStats()['evictions'] == 0)
+    assert(cache.getStats()['size'] == 10)
+    cache.get(0)
+    cache.put(10, 10)
+    stats = cache.getStats()
+    assert(stats['evictions'] == 1)
+    assert(stats['size'] == 10)
+    assert(cache.get(0) == 0)
+    assert(cache.get(1) is None)
+
+
+def test_30_lru_is_valid():
+    """
+    Test that stale entries are removed, but not counted as evictions.
+
+    """
+    cache = LruCache(10)
+    cache.put("a", 1)
+    assert(cache.get("a", lambda value: value == 2) is None)
+    assert(cache.get("a") is None)
+    assert(cache.getStats()['evictions'] == 0)
+
+
+def test_40_copy_struct():
+    """
+    Test that dictionaries and lists are copied.
+
+    """
+    orig = { "a" : [ 1, { "b" : 2 } ], "c" : "x" }
+    copy = copy_struct(orig)
+    assert(copy == orig)
+    copy['a'][1]['b'] = 3
+    copy['a'].append(4)
+    assert(orig == { "a" : [ 1, { "b" : 2 } ], "c" : "x" })
+
+
+def _run_threads(func, num):
+    threads = [ threading.Thread(target=func) for i in range(num) ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_50_memo_single_flight():
+    """
+    Test that concurrent calls for the same key compute the result only once.
+
+    """
+    cache   = MemoCache(10)
+    calls   = list()
+    results = list()
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result", True
+    _run_threads(lambda: results.append(cache.call("key", 60, compute)), 10)
+    assert(len(calls) == 1)
+    assert(results == [ "result" ] * 10)
+    # Not cacheable: Every caller computes its own result
+    del calls[:]
+    _run_threads(lambda: cache.call("other", 60, lambda: (calls.append(1), False)), 5)
+    assert(len(calls) == 5)
+
+
+def test_60_memo_wait_timeout():
+    """
+    Test that callers don't wait for a hung call longer than the wait timeout.
+
+    """
+    cache   = MemoCache(10, wait_timeout=0.2)
+    release = threading.Event()
+    def hang():
+        release.wait()
+        return "late", True
+    leader = threading.Thread(target=cache.call, args=("key", 60, hang))
+    leader.start()
+    time.sleep(0.1)
+    start = time.time()
+    assert(cache.call("key", 60, lambda: ("direct", True)) == "direct")
+    assert(time.time() - start < 1)
+    release.set()
+    leader.join()
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
@@ -0,0 +1,194 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+#
+# Run this one with Jython
+#
+"""
+Tests for the pooling of component instances (see _ServicePlan in the
+resource runner).
+
+The components used here exist only in memory: They are injected into the
+code browser. No RESTx server needs to be running for these tests.
+
+"""
+import string
+import datetime
+
+import restx.settings as settings
+import restx.core.codebrowser
+import restx.resources.resource_runner as resource_runner
+
+from restx.components.api import *
+
+
+class _PoolTestComponent(BaseComponent):
+    NAME             = "PoolTestComponent"
+    DESCRIPTION      = "A poolable component for the pool tests"
+    DOCUMENTATION    = ""
+    POOLABLE         = True
+    PARAM_DEFINITION = {
+                           "greeting" : ParameterDef(PARAM_STRING, "The greeting", required=True),
+                       }
+    SERVICES         = {
+                           "hello" : {
+                               "desc"   : "Greets someone",
+                               "params" : {
+                                   "name" : ParameterDef(PARAM_STRING, "Who is greeted", required=True),
+                               }
+                           },
+                       }
+    instances        = 0
+
+    def __init__(self):
+        BaseComponent.__init__(self)
+        _PoolTestComponent.instances += 1
+
+    def hello(self, method, input, name):
+        return Result.ok("%s %s" % (self.greeting, name))
+
+
+class _UnpoolableComponent(_PoolTestComponent):
+    POOLABLE = False
+
+
+class _ClashingComponent(_PoolTestComponent):
+    # A runtime parameter with the name of a creation time parameter
+    SERVICES = {
+                   "hello" : {
+                       "desc"   : "Greets someone",
+                       "params" : {
+                           "greeting" : ParameterDef(PARAM_STRING, "Another greeting", required=True),
+                       }
+                   },
+               }
+
+
+_COMPONENT_CLASS = [ _PoolTestComponent ]
+
+restx.core.codebrowser.getComponentInstance = lambda code_uri, resource_name: _COMPONENT_CLASS[0]()
+
+
+def _makePlan(component_class):
+    """
+    Return the service plan for a resource of the specified component.
+
+    """
+    _COMPONENT_CLASS[0]          = component_class
+    _PoolTestComponent.instances = 0
+    resource_def = { "public"  : { "name" : "pooltest", "uri" : "/resource/pooltest", "desc" : "" },
+                     "private" : { "code_uri" : "/code/PoolTestComponent", "params" : { "greeting" : "Hello" } } }
+    return resource_runner._ServicePlan(resource_def, "/code/PoolTestComponent", "pooltest")
+
+
+def test_10_reuse():
+    """
+    Test that instances are reused, with the creation time parameters bound.
+
+    """
+    plan = _makePlan(_PoolTestComponent)
+    assert(plan.poolable)
+    component, pooled = plan.acquireComponent()
+    assert(pooled)
+    assert(component.greeting == "Hello")
+    plan.releaseComponent(component, pooled)
+    again, pooled = plan.acquireComponent()
+    assert(again is component)
+    plan.releaseComponent(again, pooled)
+    # The instance that was created for the plan is the only one
+    assert(_PoolTestComponent.instances == 1)
+
+
+def test_20_concurrent_use():
+    """
+    Test that an instance is used by only one request at a time, and the pool size is limited.
+
+    """
+    plan     = _makePlan(_PoolTestComponent)
+    old_size = settings.COMPONENT_POOL_SIZE
+    settings.COMPONENT_POOL_SIZE = 2
+    try:
+        components = [ plan.acquireComponent() for i in range(3) ]
+        assert(len(set([ id(c) for c, pooled in components ])) == 3)
+        for c, pooled in components:
+            assert(pooled)
+            assert(c.greeting == "Hello")
+        for c, pooled in components:
+            plan.releaseComponent(c, pooled)
+        first  = [ c for c, pooled in components ]
+        again  = [ plan.acquireComponent()[0] for i in range(3) ]
+        reused = [ c for c in again if c in first ]
+        assert(len(reused) == 2)
+        assert(_PoolTestComponent.instances == 4)
+    finally:
+        settings.COMPONENT_POOL_SIZE = old_size
+
+
+def test_30_reset():
+    """
+    Test that the per-request state is cleared when an instance goes back into the pool.
+
+    """
+    plan = _makePlan(_PoolTestComponent)
+    component, pooled = plan.acquireComponent()
+    component.setRequest("the request")
+    component.setBaseCapabilities("the capabilities")
+    plan.releaseComponent(component, pooled)
+    assert(component._BaseComponent__http_request is None)
+    assert(component._BaseComponent__base_capabilities is None)
+    assert(component.greeting == "Hello")
+
+
+def test_40_not_poolable():
+    """
+    Test that components which don't ask for it, or can't be pooled, get a new instance for every request.
+
+    """
+    for component_class in [ _UnpoolableComponent, _ClashingComponent ]:
+        plan = _makePlan(component_class)
+        assert(not plan.poolable)
+        first, pooled = plan.acquireComponent()
+        assert(not pooled)
+        assert(not hasattr(first, "greeting"))
+        plan.releaseComponent(first, pooled)
+        second, pooled = plan.acquireComponent()
+        assert(second is not first)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
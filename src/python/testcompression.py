@@ -0,0 +1,111 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the compression of responses (restx.core.compression).
+
+No RESTx server needs to be running.
+
+"""
+# Run this one with Jython
+
+import zlib
+import gzip
+import string
+import datetime
+import StringIO
+
+from restx.core.compression import compressData, compressStream
+
+_DATA = "".join([ "Line %d of the response\n" % i for i in range(1000) ])
+
+
+def _gunzip(data):
+    return gzip.GzipFile(fileobj=StringIO.StringIO(data)).read()
+
+
+def test_10_compress_data():
+    """
+    Test that compressed buffers can be decompressed with the standard tools.
+
+    """
+    data = compressData(_DATA, "gzip")
+    assert(len(data) < len(_DATA))
+    assert(_gunzip(data) == _DATA)
+    assert(zlib.decompress(compressData(_DATA, "deflate")) == _DATA)
+
+
+def test_20_compress_stream():
+    """
+    Test that compressed streams can be decompressed with the standard tools.
+
+    """
+    chunks = [ _DATA[i:i+1000] for i in range(0, len(_DATA), 1000) ] + [ u"\xe4" ]
+    data   = "".join(compressStream(iter(chunks), "gzip"))
+    assert(_gunzip(data) == _DATA + "\xc3\xa4")
+    data   = "".join(compressStream(iter(chunks), "deflate"))
+    assert(zlib.decompress(data) == _DATA + "\xc3\xa4")
+
+
+def test_30_stream_chunks_arrive():
+    """
+    Test that every chunk of a stream can be decompressed as soon as it has been sent.
+
+    """
+    for encoding, wbits, header in [ ("gzip", 16 + zlib.MAX_WBITS, True), ("deflate", zlib.MAX_WBITS, False) ]:
+        sent         = []
+        def source():
+            for i in range(5):
+                chunk = "Event %d\n" % i
+                sent.append(chunk)
+                yield chunk
+        decompressor = zlib.decompressobj(wbits)
+        received     = ""
+        stream       = compressStream(source(), encoding)
+        if header:
+            received += decompressor.decompress(stream.next())
+        for i in range(5):
+            received += decompressor.decompress(stream.next())
+            assert(received == "".join(sent))
+        for data in stream:
+            received += decompressor.decompress(data)
+        assert(received == "".join(sent))
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
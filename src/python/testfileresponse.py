@@ -0,0 +1,193 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for conditional and range requests of files (restx.core.fileresponse).
+
+These use a temporary directory. No RESTx server needs to be running.
+
+"""
+# Run this one with Jython
+
+import os
+import string
+import shutil
+import datetime
+import tempfile
+
+from restx.fileentity        import FileEntity, httpDate
+from restx.core.fileresponse import parseRange, prepareFileResponse
+
+from org.mulesoft.restx.component.api import HTTP, Result
+
+
+class _Request(object):
+    """
+    A GET request with the specified headers.
+
+    """
+    def __init__(self, **headers):
+        self.headers = dict()
+        for name, value in headers.items():
+            self.headers[name.replace("_", "-").capitalize()] = [ value ]
+
+    def getRequestMethod(self):
+        return "GET"
+
+    def getRequestHeaders(self):
+        return self.headers
+
+
+def _makeFile(dir_name, data):
+    name = os.path.join(dir_name, "file.bin")
+    tmp  = name + ".tmp"
+    f    = open(tmp, "wb")
+    f.write(data)
+    f.close()
+    # Replaced like the file storage does it
+    os.rename(tmp, name)
+    return name
+
+
+def _respond(name, **headers):
+    return prepareFileResponse(_Request(**headers), Result(HTTP.OK, FileEntity(name)))
+
+
+def test_10_parse_range():
+    """
+    Test parsing of Range headers.
+
+    """
+    assert(parseRange("bytes=0-499", 1000) == (0, 500))
+    assert(parseRange("bytes=500-", 1000) == (500, 500))
+    assert(parseRange("bytes=900-2000", 1000) == (900, 100))
+    assert(parseRange("bytes=-100", 1000) == (900, 100))
+    assert(parseRange("bytes=-2000", 1000) == (0, 1000))
+    assert(parseRange(" bytes = 10 - 19 ", 1000) is None)
+    assert(parseRange("bytes= 10 - 19 ", 1000) == (10, 10))
+    # Ignored: invalid, other units, multiple ranges
+    assert(parseRange("bytes=abc-", 1000) is None)
+    assert(parseRange("bytes=20-10", 1000) is None)
+    assert(parseRange("lines=0-10", 1000) is None)
+    assert(parseRange("bytes=0-1,5-6", 1000) is None)
+    assert(parseRange("bytes=5", 1000) is None)
+    # Not satisfiable
+    assert(parseRange("bytes=1000-", 1000) is False)
+    assert(parseRange("bytes=-0", 1000) is False)
+    assert(parseRange("bytes=-10", 0) is False)
+
+
+def test_20_ranges():
+    """
+    Test that ranges are answered with partial content, unless the client's copy is outdated.
+
+    """
+    dir_name = tempfile.mkdtemp()
+    name     = _makeFile(dir_name, "0123456789" * 100)
+    result   = _respond(name)
+    etag     = result.getHeaders().get("ETag")
+    result.getEntity().close()
+
+    result   = _respond(name, range="bytes=10-19")
+    assert(result.getStatus() == HTTP.PARTIAL_CONTENT)
+    assert(result.getHeaders().get("Content-Range") == "bytes 10-19/1000")
+    assert("".join(result.getEntity().chunks()) == "0123456789")
+
+    result   = _respond(name, range="bytes=-5", if_range=etag)
+    assert(result.getStatus() == HTTP.PARTIAL_CONTENT)
+    assert("".join(result.getEntity().chunks()) == "56789")
+
+    result   = _respond(name, range="bytes=10-19", if_range='"outdated"')
+    assert(result.getStatus() == HTTP.OK)
+    assert(len(result.getEntity()) == 1000)
+    result.getEntity().close()
+
+    result   = _respond(name, range="bytes=5000-")
+    assert(result.getStatus() == HTTP.REQUEST_RANGE_NOT_SATISFIED)
+    assert(result.getHeaders().get("Content-Range") == "bytes */1000")
+    shutil.rmtree(dir_name)
+
+
+def test_30_conditional():
+    """
+    Test revalidation with If-None-Match and If-Modified-Since.
+
+    """
+    dir_name = tempfile.mkdtemp()
+    name     = _makeFile(dir_name, "foo")
+    result   = _respond(name)
+    etag     = result.getHeaders().get("ETag")
+    modified = result.getHeaders().get("Last-Modified")
+    result.getEntity().close()
+    assert(_respond(name, if_none_match=etag).getStatus() == HTTP.NOT_MODIFIED)
+    assert(_respond(name, if_modified_since=modified).getStatus() == HTTP.NOT_MODIFIED)
+    result   = _respond(name, if_none_match='"other"')
+    assert(result.getStatus() == HTTP.OK)
+    result.getEntity().close()
+    result   = _respond(name, if_modified_since=httpDate(os.path.getmtime(name) - 60))
+    assert(result.getStatus() == HTTP.OK)
+    result.getEntity().close()
+    shutil.rmtree(dir_name)
+
+
+def test_40_etag_changes():
+    """
+    Test that the ETag changes when a file is replaced within the same second, even with the same size.
+
+    """
+    dir_name = tempfile.mkdtemp()
+    mtime    = int(os.path.getmtime(dir_name))
+    name     = _makeFile(dir_name, "aaa")
+    os.utime(name, (mtime, mtime))
+    result   = _respond(name)
+    etag     = result.getHeaders().get("ETag")
+    result.getEntity().close()
+    # Keep the old file alive, so that its inode can't be reused
+    keep     = open(name, "rb")
+    name     = _makeFile(dir_name, "bbb")
+    os.utime(name, (mtime, mtime + 0.5))
+    result   = _respond(name, if_none_match=etag)
+    assert(result.getStatus() == HTTP.OK)
+    assert(result.getHeaders().get("ETag") != etag)
+    assert("".join(result.getEntity().chunks()) == "bbb")
+    keep.close()
+    shutil.rmtree(dir_name)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
@@ -0,0 +1,299 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the pooled HTTP client, which components use for outgoing requests.
+
+A small stub server is started on a local port. It speaks HTTP/1.1 with
+keep-alive, so that we can see how well the client reuses its connections.
+No RESTx server needs to be running for these tests.
+
+"""
+import time
+import base64
+import socket
+import string
+import httplib
+import urllib2
+import datetime
+import threading
+import BaseHTTPServer
+import SocketServer
+
+from restx.httpclient import HttpClient
+
+STUB_PORT  = 8011
+STUB_URL   = "http://localhost:%d" % STUB_PORT
+PROXY_PORT = 8013
+
+# Proxies of the environment must not get in the way
+CLIENT = HttpClient(max_per_host=4, connect_timeout=5, read_timeout=5, idle_timeout=30, dns_ttl=60,
+                    proxies={})
+
+# Number of POST requests received by the stub server
+POSTS  = [ 0 ]
+
+
+class _StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Answers requests for a few fixed paths.
+
+    """
+    protocol_version = "HTTP/1.1"
+    wbufsize         = -1       # Send each response in one go (flushed after every request)
+
+    def __respond(self, code, body, headers=None):
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        if headers:
+            for name, value in headers.items():
+                self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("http://"):
+            # We are the proxy
+            self.__respond(200, "proxied " + self.path)
+        elif self.path == "/redirect":
+            self.__respond(302, "", { "Location" : "/hello" })
+        elif self.path == "/redirect-auth":
+            self.__respond(302, "", { "Location" : "/auth" })
+        elif self.path == "/redirect-other-host":
+            self.__respond(302, "", { "Location" : "http://127.0.0.1:%d/auth" % STUB_PORT })
+        elif self.path == "/drop":
+            # Closes the connection, without telling the client
+            self.__respond(200, "dropped")
+            self.close_connection = 1
+        elif self.path == "/missing":
+            self.__respond(404, "Not found")
+        elif self.path == "/close":
+            self.__respond(200, "bye", { "Connection" : "close" })
+            self.close_connection = 1
+        elif self.path == "/auth":
+            self.__respond(200, self.headers.get("Authorization", ""))
+        else:
+            self.__respond(200, "hello")
+
+    def do_POST(self):
+        POSTS[0] += 1
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.__respond(200, "%s|%s" % (self.headers.get("Content-Type"), body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads      = True
+    allow_reuse_address = True
+
+
+def _start_stub_server(port=STUB_PORT):
+    server = _StubServer(("localhost", port), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.setDaemon(True)
+    thread.start()
+    return server
+
+
+def test_10_get():
+    """
+    Test a simple GET request.
+
+    """
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/hello")
+    assert(status == 200)
+    assert(data == "hello")
+    assert(headers['content-length'] == "5")
+
+
+def test_20_connection_reuse():
+    """
+    Test that sequential requests to the same host reuse a single connection.
+
+    """
+    before = CLIENT.getStats()
+    for i in range(100):
+        status, headers, data = CLIENT.request("GET", STUB_URL + "/hello")
+        assert(data == "hello")
+    after   = CLIENT.getStats()
+    created = after['connections_created'] - before['connections_created']
+    reused  = after['connections_reused']  - before['connections_reused']
+    print "(reuse rate: %d of 100)" % reused,
+    assert(created <= 1)
+    assert(reused >= 99)
+
+
+def test_30_connection_close():
+    """
+    Test that connections closed by the server are not reused.
+
+    """
+    before = CLIENT.getStats()
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/close")
+    assert(data == "bye")
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/hello")
+    assert(data == "hello")
+    after = CLIENT.getStats()
+    assert(after['connections_created'] - before['connections_created'] == 1)
+
+
+def test_40_concurrent_requests():
+    """
+    Test that concurrent requests don't open more than the allowed number of connections.
+
+    """
+    errors = list()
+    def worker():
+        try:
+            for i in range(20):
+                status, headers, data = CLIENT.request("GET", STUB_URL + "/hello")
+                assert(data == "hello")
+        except Exception, e:
+            errors.append(e)
+    threads = [ threading.Thread(target=worker) for i in range(10) ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert(not errors)
+    assert(CLIENT.getStats()['open_connections'] <= 4)
+
+
+def test_50_redirect():
+    """
+    Test that redirects are followed.
+
+    """
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/redirect")
+    assert(status == 200)
+    assert(data == "hello")
+
+
+def test_60_http_error():
+    """
+    Test that error responses raise urllib2.HTTPError, same as urllib2 does.
+
+    """
+    try:
+        CLIENT.request("GET", STUB_URL + "/missing")
+        assert(False)
+    except urllib2.HTTPError, e:
+        assert(e.code == 404)
+        assert(e.read() == "Not found")
+
+
+def test_70_post_and_credentials():
+    """
+    Test POST requests and HTTP basic authentication.
+
+    """
+    status, headers, data = CLIENT.request("POST", STUB_URL + "/post", "a=1&b=2")
+    assert(data == "application/x-www-form-urlencoded|a=1&b=2")
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/auth", credentials=("joe", "secret"))
+    assert(data == "Basic " + base64.encodestring("joe:secret").strip())
+
+
+def test_80_stale_connection():
+    """
+    Test that only idempotent requests are sent again over a new connection, if the old one was closed.
+
+    """
+    client = HttpClient(max_per_host=1, connect_timeout=5, read_timeout=5, idle_timeout=30, dns_ttl=60,
+                        proxies={})
+    status, headers, data = client.request("GET", STUB_URL + "/drop")
+    assert(data == "dropped")
+    time.sleep(0.1)
+    status, headers, data = client.request("GET", STUB_URL + "/hello")
+    assert(data == "hello")
+    assert(client.getStats()['retries'] == 1)
+    # The server may have received a POST, so it is never sent twice
+    status, headers, data = client.request("GET", STUB_URL + "/drop")
+    time.sleep(0.1)
+    posts = POSTS[0]
+    try:
+        client.request("POST", STUB_URL + "/post", "a=1")
+        assert(False)
+    except (socket.error, httplib.HTTPException), e:
+        pass
+    assert(POSTS[0] == posts)
+    assert(client.getStats()['retries'] == 1)
+
+
+def test_85_redirect_credentials():
+    """
+    Test that credentials are sent after a redirect only if it stays on the same host.
+
+    """
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/redirect-auth", credentials=("joe", "secret"))
+    assert(data == "Basic " + base64.encodestring("joe:secret").strip())
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/redirect-other-host", credentials=("joe", "secret"))
+    assert(status == 200)
+    assert(data == "")
+    status, headers, data = CLIENT.request("GET", STUB_URL + "/redirect-other-host",
+                                           headers={ "Authorization" : "Basic Zm9vOmJhcg==" })
+    assert(data == "")
+
+
+def test_90_proxy():
+    """
+    Test that requests go through a configured proxy, except for the hosts in no_proxy.
+
+    """
+    proxy  = { "http" : "http://localhost:%d" % PROXY_PORT }
+    client = HttpClient(max_per_host=4, connect_timeout=5, read_timeout=5, idle_timeout=30, dns_ttl=60,
+                        proxies=proxy, no_proxy=[])
+    status, headers, data = client.request("GET", "http://example.invalid/hello")
+    assert(status == 200)
+    assert(data == "proxied http://example.invalid/hello")
+    assert(client.getStats()['proxied'] == 1)
+    client = HttpClient(max_per_host=4, connect_timeout=5, read_timeout=5, idle_timeout=30, dns_ttl=60,
+                        proxies=proxy, no_proxy=[ "localhost" ])
+    status, headers, data = client.request("GET", STUB_URL + "/hello")
+    assert(data == "hello")
+    assert(client.getStats()['proxied'] == 0)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    server = _start_stub_server()
+    proxy  = _start_stub_server(PROXY_PORT)
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
+    _log("Client statistics: %s" % CLIENT.getStats())
+    server.shutdown()
+    proxy.shutdown()
@@ -0,0 +1,216 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the log storage (restx.storageabstraction.log_storage).
+
+These use a temporary directory. No RESTx server needs to be running.
+
+"""
+# Run this one with Jython
+
+import os
+import string
+import shutil
+import datetime
+import tempfile
+import StringIO
+
+import restx.settings as settings
+from restx.storageabstraction import log_storage
+from restx.storageabstraction.log_storage import LogStorage
+
+from org.mulesoft.restx.exception import RestxException, RestxFileNotFoundException
+
+
+def _makeDir():
+    settings.STORAGE_FSYNC        = "never"
+    settings.STORAGE_LOG_MIN_SIZE = 10000
+    return tempfile.mkdtemp()
+
+
+def _reopen(location, unique_prefix):
+    """
+    Forget the open log, so that it is read again (as after a restart).
+
+    """
+    log_storage._LOGS.clear()
+    return LogStorage(location, unique_prefix)
+
+
+def _logName(location):
+    return os.path.join(location, LogStorage.LOG_FILE_NAME)
+
+
+def test_10_store_and_load():
+    """
+    Test storing, streaming, deleting and listing in separate storage spaces.
+
+    """
+    location = _makeDir()
+    a        = LogStorage(location, "a")
+    b        = LogStorage(location, "b")
+    a.storeFile("x", "1")
+    a.storeFile("y", "22")
+    b.storeFile("x", "other")
+    a.storeFileFromStream("s", StringIO.StringIO("streamed" * 1000))
+    assert(a.listFiles() == [ "s", "x", "y" ])
+    assert(b.listFiles() == [ "x" ])
+    assert(a.loadFile("x") == "1")
+    assert(b.loadFile("x") == "other")
+    assert(a.loadFile("s") == "streamed" * 1000)
+    stamp = a.getFileStamp("y")
+    a.storeFile("y", "33")
+    assert(a.getFileStamp("y") != stamp)
+    a.deleteFile("y")
+    assert(a.getFileStamp("y") is None)
+    for method, args in [ (a.deleteFile, ("y",)), (a.loadFile, ("y",)) ]:
+        try:
+            method(*args)
+            assert(False)
+        except RestxFileNotFoundException, e:
+            pass
+    assert(a.listFiles(offset=1, limit=1) == [ "x" ])
+    log_storage._LOGS.clear()
+    shutil.rmtree(location)
+
+
+def test_20_recovery():
+    """
+    Test that the log is read again after a restart, and an incomplete record at the end is removed.
+
+    """
+    location = _makeDir()
+    a        = LogStorage(location, "a")
+    a.storeFile("x", "1")
+    a.storeFile("y", "22")
+    a.deleteFile("y")
+    size     = os.path.getsize(_logName(location))
+    # A record that was cut short by a crash
+    f = open(_logName(location), "ab")
+    f.write("\x01\x00\x00\x00\x05\x00\x00")
+    f.close()
+    a = _reopen(location, "a")
+    assert(a.listFiles() == [ "x" ])
+    assert(a.loadFile("x") == "1")
+    assert(os.path.getsize(_logName(location)) == size)
+    # A complete record with a wrong checksum
+    a.storeFile("z", "333")
+    f = open(_logName(location), "r+b")
+    f.seek(-1, 2)
+    f.write("4")
+    f.close()
+    a = _reopen(location, "a")
+    assert(a.listFiles() == [ "x" ])
+    assert(os.path.getsize(_logName(location)) == size)
+    log_storage._LOGS.clear()
+    shutil.rmtree(location)
+
+
+def test_30_compaction():
+    """
+    Test that overwritten data is removed from the log, and the live data is kept.
+
+    """
+    location = _makeDir()
+    a        = LogStorage(location, "a")
+    a.storeFile("keep", "k" * 100)
+    for i in range(100):
+        a.storeFile("big", str(i % 10) * 1000)
+    stats = log_storage._getLog(_logName(location)).getStats()
+    assert(stats['compactions'] > 0)
+    assert(os.path.getsize(_logName(location)) < 20000)
+    assert(a.loadFile("keep") == "k" * 100)
+    assert(a.loadFile("big") == "9" * 1000)
+    a = _reopen(location, "a")
+    assert(a.listFiles() == [ "big", "keep" ])
+    assert(a.loadFile("big") == "9" * 1000)
+    log_storage._LOGS.clear()
+    shutil.rmtree(location)
+
+
+def test_40_compaction_failure():
+    """
+    Test that a failed compaction doesn't make a successful write fail.
+
+    """
+    location = _makeDir()
+    a        = LogStorage(location, "a")
+    def fail(tmp_name, name):
+        raise OSError(13, "Permission denied")
+    original = log_storage._replaceFile
+    log_storage._replaceFile = fail
+    try:
+        for i in range(30):
+            a.storeFile("big", str(i % 10) * 1000)
+    finally:
+        log_storage._replaceFile = original
+    assert(log_storage._getLog(_logName(location)).getStats()['compactions'] == 0)
+    assert(a.loadFile("big") == "9" * 1000)
+    # No temporary files are left behind
+    assert(os.listdir(location) == [ LogStorage.LOG_FILE_NAME ])
+    # The next write compacts the log
+    a.storeFile("big", "x")
+    assert(log_storage._getLog(_logName(location)).getStats()['compactions'] == 1)
+    a = _reopen(location, "a")
+    assert(a.loadFile("big") == "x")
+    log_storage._LOGS.clear()
+    shutil.rmtree(location)
+
+
+def test_50_single_process():
+    """
+    Test that the log can't be used with more than one server process.
+
+    """
+    location = _makeDir()
+    settings.SERVER_PROCESSES = 2
+    try:
+        try:
+            LogStorage(location, "a")
+            assert(False)
+        except RestxException, e:
+            pass
+    finally:
+        settings.SERVER_PROCESSES = 1
+    log_storage._LOGS.clear()
+    shutil.rmtree(location)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
@@ -0,0 +1,132 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+#
+# Run this one with Jython
+#
+"""
+Tests for the validation of runtime parameters (ParamValidator).
+
+The validator has to give the same results as paramSanityCheck(),
+fillDefaults() and convertTypes(), which it replaces. No RESTx server
+needs to be running for these tests.
+
+"""
+import string
+import datetime
+
+from restx.core.parameter import *
+from restx.resources      import ParamValidator, paramSanityCheck, fillDefaults, convertTypes
+
+from org.mulesoft.restx.exception import RestxException, RestxMandatoryParameterMissingException
+
+PARAM_DEFS = {
+    "name"    : ParameterDef(PARAM_STRING, "A name").as_dict(),
+    "count"   : ParameterDef(PARAM_NUMBER, "A number", required=False, default=10).as_dict(),
+    "verbose" : ParameterDef(PARAM_BOOL,   "A flag",   required=False, default="no").as_dict(),
+    "day"     : ParameterDef(PARAM_DATE,   "A date",   required=False, default="2010-04-01").as_dict(),
+}
+
+
+def _legacy(params):
+    """
+    Validate parameters the way it was done before ParamValidator.
+
+    """
+    paramSanityCheck(params, PARAM_DEFS, "params")
+    fillDefaults(PARAM_DEFS, params)
+    convertTypes(PARAM_DEFS, params)
+    return params
+
+
+def _expect_error(exception_class, params):
+    try:
+        ParamValidator(PARAM_DEFS, "params").validate(params)
+        assert(False)
+    except exception_class, e:
+        pass
+
+
+def test_10_conversion():
+    """
+    Test that values are converted and defaults filled in, same as before.
+
+    """
+    validator = ParamValidator(PARAM_DEFS, "params")
+    for params in [ { "name" : "foo" },
+                    { "name" : "foo", "count" : "12", "verbose" : "yes" },
+                    { "name" : "foo", "count" : "1.5", "day" : "2011-12-31" },
+                    { "name" : "foo", "count" : 7, "verbose" : True } ]:
+        expected = _legacy(dict(params))
+        result   = dict(params)
+        validator.validate(result)
+        assert(result == expected)
+    result = { "name" : "foo", "count" : "12" }
+    validator.validate(result)
+    assert(result['count'] == 12)
+    assert(result['verbose'] is False)
+
+
+def test_20_errors():
+    """
+    Test that invalid parameters are reported with the same exceptions as before.
+
+    """
+    _expect_error(RestxException, { "name" : "foo", "unknown" : "bar" })
+    _expect_error(RestxException, { "name" : "foo", "count" : "many" })
+    _expect_error(RestxException, [ "name" ])
+    _expect_error(RestxMandatoryParameterMissingException, { "count" : 1 })
+
+
+def test_30_defaults_not_shared():
+    """
+    Test that every request receives its own copy of mutable default values.
+
+    """
+    validator = ParamValidator(PARAM_DEFS, "params")
+    validator.defaults.append(("tags", [ "a" ], None))
+    first = { "name" : "foo" }
+    validator.validate(first)
+    first['tags'].append("b")
+    second = { "name" : "foo" }
+    validator.validate(second)
+    assert(second['tags'] == [ "a" ])
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
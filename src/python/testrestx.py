@@ -195,6 +195,18 @@ def test_18_meta_doc():
     assert("Welcome to RESTx!" in data)
 
 
+def test_19_meta_stats():
+    """
+    Test that the run-time statistics of the server can be received.
+
+    """
+    data, resp = _get_data("/meta/stats")
+    assert(resp.getStatus() == 200)
+    assert("resource_cache" in data)
+    for name in [ "size", "max_size", "hits", "misses", "evictions" ]:
+        assert(name in data['resource_cache'])
+
+
 def test_30_code():
     """
     Test that information about the installed components is returned correctly.
@@ -216,6 +228,22 @@ def test_30_code():
             assert(k in [ 'desc', 'uri' ])
 
 
+def test_31_code_etag():
+    """
+    Test that cached responses carry an ETag and that a conditional
+    request with that ETag is answered with '304 Not Modified'.
+
+    """
+    data, resp = _get_data("/code")
+    assert(resp.getStatus() == 200)
+    etag = resp.getHeaders().get("etag")
+    assert(etag)
+    resp = http.urlopen("GET", SERVER_URL + "/code",
+                        headers={"Accept" : "application/json", "If-None-Match" : etag})
+    assert(resp.getStatus() == 304)
+    assert(resp.read() == "")
+
+
 def test_40_twitter_code():
     """
     Test that information returned about the Twitter component is correct.
@@ -417,6 +445,28 @@ def test_70_positional_params():
     buf, resp = _delete(DOCROOT + "/resource/_test_foobarstorage/files/foo")
     assert(resp.getStatus() == 200)
 
+def test_80_resource_paging():
+    """
+    Test that pages of the resource list come in order, with paging information.
+
+    """
+    data, resp = _get_data("/resource?prefix=_test_&limit=1")
+    assert(resp.getStatus() == 200)
+    assert(data['total'] == 2)
+    assert(data['offset'] == 0)
+    assert([ r['name'] for r in data['resources'] ] == [ "_test_foobar" ])
+    assert(data['resources'][0]['uri'] == DOCROOT + "/resource/_test_foobar")
+    assert(data['next'])
+
+    data, resp = _get_data(data['next'][len(DOCROOT):])
+    assert(resp.getStatus() == 200)
+    assert([ r['name'] for r in data['resources'] ] == [ "_test_foobarstorage" ])
+    assert(data['next'] is None)
+
+    # Without offset or limit, the resources are listed by name
+    data, resp = _get_data("/resource?prefix=_test_")
+    assert(sorted(data.keys()) == [ "_test_foobar", "_test_foobarstorage" ])
+
 def test_999_cleanup():
     """
     Find all resources starting with "_test_" and delete them.
@@ -86,6 +86,13 @@ status, data = server.get_resource("MyGoogleSearch").get_service("search").set("
 
 print data
 
+
+print "\n\nSeveral accesses in parallel...\n\n"
+
+s = server.get_resource("MyGoogleSearch").get_service("search")
+for status, data in server.access_many([ (s, dict(query=q)) for q in [ "mulesoft", "restx", "jython" ] ]):
+    print status, data
+
 r.delete()
 
 
@@ -0,0 +1,220 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the file storage (restx.storageabstraction.file_storage).
+
+These use a temporary directory. No RESTx server needs to be running.
+
+"""
+# Run this one with Jython
+
+import os
+import time
+import string
+import shutil
+import datetime
+import tempfile
+import threading
+
+import restx.settings as settings
+from restx.storageabstraction import file_storage
+from restx.storageabstraction.file_storage import FileStorage, flushWriteBehind
+
+from org.mulesoft.restx.exception import RestxFileNotFoundException
+
+
+def _makeStorage(write_behind):
+    """
+    Return a storage object in a new temporary directory.
+
+    """
+    settings.STORAGE_WRITE_BEHIND       = write_behind
+    settings.STORAGE_WRITE_BEHIND_DELAY = 0.2
+    settings.STORAGE_FSYNC              = "never"
+    storage = FileStorage(tempfile.mkdtemp(), "test")
+    settings.STORAGE_WRITE_BEHIND       = False
+    return storage
+
+
+def _files(storage):
+    return sorted(os.listdir(storage._get_storage_location()))
+
+
+class _SlowWrites(object):
+    """
+    Delays the writing of temporary files while it is installed.
+
+    """
+    def __init__(self, delay):
+        self.delay    = delay
+        self.original = file_storage._writeTempFile
+        file_storage._writeTempFile = self
+
+    def __call__(self, name, data=None, stream=None):
+        time.sleep(self.delay)
+        return self.original(name, data, stream)
+
+    def remove(self):
+        file_storage._writeTempFile = self.original
+
+
+class _Stream(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, size):
+        chunk     = self.data[:size]
+        self.data = self.data[size:]
+        return chunk
+
+
+def test_10_atomic_writes():
+    """
+    Test that readers never see partially written files.
+
+    """
+    storage = _makeStorage(False)
+    storage.storeFile("big", "a" * 200000)
+    errors  = []
+    done    = threading.Event()
+    def reader():
+        while not done.isSet():
+            if len(storage.loadFile("big")) != 200000:
+                errors.append(1)
+    t = threading.Thread(target=reader)
+    t.start()
+    for i in range(50):
+        storage.storeFile("big", chr(97 + i % 20) * 200000)
+    done.set()
+    t.join()
+    assert(not errors)
+    # No temporary files are left behind
+    assert(_files(storage) == [ "test__big" ])
+    shutil.rmtree(storage._get_storage_location())
+
+
+def test_20_write_behind():
+    """
+    Test that queued files are visible right away, coalesced and written later.
+
+    """
+    storage = _makeStorage(True)
+    for i in range(10):
+        storage.storeFile("foo", "data %d" % i)
+    assert(storage.loadFile("foo") == "data 9")
+    assert(storage.listFiles() == [ "foo" ])
+    assert(_files(storage) == [])
+    flushWriteBehind()
+    assert(_files(storage) == [ "test__foo" ])
+    assert(open(os.path.join(storage._get_storage_location(), "test__foo")).read() == "data 9")
+    # A file that only exists in the queue can be deleted
+    storage.storeFile("bar", "x")
+    storage.deleteFile("bar")
+    flushWriteBehind()
+    assert(_files(storage) == [ "test__foo" ])
+    try:
+        storage.deleteFile("bar")
+        assert(False)
+    except RestxFileNotFoundException, e:
+        pass
+    shutil.rmtree(storage._get_storage_location())
+
+
+def test_30_delete_during_flush():
+    """
+    Test that a queued write which is in progress doesn't resurrect a deleted file.
+
+    """
+    storage = _makeStorage(True)
+    storage.storeFile("foo", "old")
+    slow    = _SlowWrites(0.5)
+    try:
+        flusher = threading.Thread(target=flushWriteBehind)
+        flusher.start()
+        time.sleep(0.2)
+        storage.deleteFile("foo")
+        flusher.join()
+    finally:
+        slow.remove()
+    assert(_files(storage) == [])
+    assert(storage.listFiles() == [])
+    shutil.rmtree(storage._get_storage_location())
+
+
+def test_40_store_during_flush():
+    """
+    Test that a queued write which is in progress doesn't overwrite newer data.
+
+    """
+    storage = _makeStorage(True)
+    storage.storeFile("foo", "old")
+    storage.storeFile("bar", "old")
+    slow    = _SlowWrites(0.5)
+    try:
+        flusher = threading.Thread(target=flushWriteBehind)
+        flusher.start()
+        time.sleep(0.2)
+        storage.storeFileFromStream("foo", _Stream("streamed"))
+        storage.replaceFile("bar", "replaced")
+        flusher.join()
+    finally:
+        slow.remove()
+    assert(storage.loadFile("foo") == "streamed")
+    assert(storage.loadFile("bar") == "replaced")
+    assert(_files(storage) == [ "test__bar", "test__foo" ])
+    shutil.rmtree(storage._get_storage_location())
+
+
+def test_50_file_entity():
+    """
+    Test that a queued file is written when it is needed on disk.
+
+    """
+    storage = _makeStorage(True)
+    storage.storeFile("foo", "queued")
+    entity  = storage.loadFileEntity("foo")
+    assert(len(entity) == len("queued"))
+    entity.close()
+    assert(_files(storage) == [ "test__foo" ])
+    assert(storage.loadFile("foo") == "queued")
+    shutil.rmtree(storage._get_storage_location())
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))
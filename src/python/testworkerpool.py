@@ -0,0 +1,134 @@
+"""
+RESTx: Sane, simple and effective data publishing and integration.
+
+Copyright (C) 2010   MuleSoft Inc.    http://www.mulesoft.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Tests for the bounded worker pool (restx.workerpool).
+
+These run with plain Python or Jython. No RESTx server needs to be running.
+
+"""
+import time
+import string
+import datetime
+import threading
+
+from restx.workerpool import WorkerPool
+
+
+def test_10_results_and_errors():
+    """
+    Test that results and exceptions of jobs are recorded.
+
+    """
+    pool = WorkerPool(4)
+    ok   = pool.submit(lambda x, y: x + y, 1, 2)
+    bad  = pool.submit(lambda: 1 / 0)
+    assert(ok.runOrWait(5))
+    assert(ok.result == 3  and  ok.error is None)
+    assert(bad.runOrWait(5))
+    assert(bad.error[0] is ZeroDivisionError)
+
+
+def test_20_burst_runs_concurrently():
+    """
+    Test that a burst of jobs gets its own threads, even if a worker is idle.
+
+    """
+    pool = WorkerPool(10)
+    # Leave one idle worker behind
+    pool.submit(lambda: None).wait(5)
+    time.sleep(0.1)
+    assert(pool.getStats()['idle'] == 1)
+    start = time.time()
+    jobs  = [ pool.submit(time.sleep, 0.5) for i in range(8) ]
+    for job in jobs:
+        assert(job.wait(5))
+    duration = time.time() - start
+    print "(8 jobs of 0.5s: %.2fs, %d threads)" % (duration, pool.getStats()['threads']),
+    assert(duration < 1.5)
+    assert(pool.getStats()['threads'] >= 8)
+
+
+def test_30_max_threads():
+    """
+    Test that the pool doesn't grow beyond its maximum size.
+
+    """
+    pool = WorkerPool(3)
+    jobs = [ pool.submit(time.sleep, 0.1) for i in range(12) ]
+    for job in jobs:
+        assert(job.wait(5))
+    assert(pool.getStats()['threads'] == 3)
+    assert(pool.getStats()['completed'] == 12)
+
+
+def test_40_run_or_wait():
+    """
+    Test that a waiting thread runs pending jobs itself when all workers are busy.
+
+    """
+    pool    = WorkerPool(1)
+    release = threading.Event()
+    blocker = pool.submit(release.wait)
+    job     = pool.submit(lambda: threading.currentThread())
+    assert(job.runOrWait(5))
+    assert(job.result is threading.currentThread())
+    release.set()
+    assert(blocker.wait(5))
+
+
+def test_50_cancel():
+    """
+    Test that a claimed job is not run by the workers.
+
+    """
+    pool    = WorkerPool(1)
+    release = threading.Event()
+    runs    = list()
+    blocker = pool.submit(release.wait)
+    job     = pool.submit(runs.append, 1)
+    assert(not job.wait(0.1))
+    assert(job.claim())
+    release.set()
+    assert(blocker.wait(5))
+    time.sleep(0.1)
+    assert(not runs)
+
+
+def _log(msg, eol=True):
+    if eol:
+        print msg
+    else:
+        print msg,
+
+
+if __name__ == '__main__':
+    #
+    # Collect the names of all test methods
+    #
+    test_methods = [ name for name in dir() if name.startswith("test_") ]
+    test_methods.sort()
+    for method_name in test_methods:
+        start_time = datetime.datetime.now()
+        _log("Executing: %s" % string.ljust(method_name, 30), eol=False)
+        method = globals()[method_name]
+        method()
+        end_time = datetime.datetime.now()
+        _log(" - Duration: %s - Ok" % (end_time - start_time))